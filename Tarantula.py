@@ -13,29 +13,77 @@ import sys
 import json
 import time
 import socket
-import requests
+import errno
 import subprocess
 import threading
 import hashlib
 import base64
 import ssl
 import sqlite3
-import urllib3
 import random
-from urllib.parse import urlparse, urljoin, quote
-from colorama import init, Fore, Back, Style
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import dns.resolver
+import shutil
+import mmap
+import gzip
+import codecs
+import struct
+import asyncio
+import itertools
+import math
+import collections
+import importlib
+import weakref
+from urllib.parse import urlparse, urljoin, quote, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import re
 from datetime import datetime
-import tempfile
-import yaml
+from xml.etree.ElementTree import XMLPullParser
 
-# Disable SSL warnings for testing
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+class LazyModule:
+    """Module proxy that performs the real import on first attribute access
+    
+    Third-party integrations are only loaded when a module that needs them
+    runs, which keeps interpreter start-up for short-lived scans cheap. A
+    missing package surfaces as ImportError at the point of use.
+    """
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+        
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load:
+                        self._on_load(module)
+                    self._module = module
+        return self._module
+        
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+        
+    @property
+    def loaded(self):
+        return self._module is not None
+
+def _disable_insecure_warnings(module):
+    # Disable SSL warnings for testing
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Initialize colorama
-init(autoreset=True)
+requests = LazyModule('requests', on_load=_disable_insecure_warnings)
+dns_resolver = LazyModule('dns.resolver')
+dns_query = LazyModule('dns.query')
+dns_zone = LazyModule('dns.zone')
+dns_message = LazyModule('dns.message')
+dns_rdatatype = LazyModule('dns.rdatatype')
+dns_rcode = LazyModule('dns.rcode')
+cloudscraper = LazyModule('cloudscraper')
+shodan = LazyModule('shodan')
+wafw00f_main = LazyModule('wafw00f.main')
+ipaddress = LazyModule('ipaddress')
 
 class NeonColors:
     CYAN = '\033[96m'
@@ -57,11 +105,2878 @@ class NeonColors:
     NEON_PURPLE = '\033[38;5;129m'
     NEON_ORANGE = '\033[38;5;208m'
 
-class TarantulaCore:
+class ResultRecord:
+    """Base for compact, __slots__-backed result records
+    
+    Records still answer record['field'] and record.get('field') so report,
+    export and database code written against the old plain-dict results
+    keeps working unchanged.
+    """
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+            
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+            
+    def __contains__(self, key):
+        return key in self.__slots__
+        
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+        
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+        
+class Subdomain(ResultRecord):
+    """ip is the first A record, kept for reports; ips holds all of them (round-robin, multi-homed)"""
+    __slots__ = ('subdomain', 'ip', 'source', 'ips')
+    
+    def __init__(self, subdomain, ip, source='bruteforce', ips=None):
+        self.subdomain = subdomain
+        self.ip = ip
+        self.source = source
+        self.ips = list(ips) if ips else [ip]
+        
+class Service(ResultRecord):
+    __slots__ = ('port', 'service', 'banner', 'version', 'state', 'ip', 'hostnames', 'tls', 'cpe', 'scripts')
+    
+    def __init__(self, port, service, banner, version, state='open', ip=None, hostnames=(), tls=None,
+                 cpe=(), scripts=None):
+        self.port = port
+        self.service = service
+        self.banner = banner
+        self.version = version
+        self.state = state
+        self.ip = ip
+        self.hostnames = list(hostnames)
+        self.tls = tls
+        self.cpe = list(cpe)
+        self.scripts = dict(scripts or {})
+        
+class Directory(ResultRecord):
+    """size is None when unknown; size_lower_bound then holds the bytes read before the body budget ran out"""
+    __slots__ = ('directory', 'url', 'status_code', 'size', 'protocol', 'headers', 'size_lower_bound')
+    
+    def __init__(self, directory, url, status_code, size, protocol, headers, size_lower_bound=None):
+        self.directory = directory
+        self.url = url
+        self.status_code = status_code
+        self.size = size
+        self.protocol = protocol
+        self.headers = headers
+        self.size_lower_bound = size_lower_bound
+        
+class Finding(ResultRecord):
+    """A vulnerability or misconfiguration; tool-specific extras go in details"""
+    __slots__ = ('type', 'target', 'severity', 'description', 'tool', 'occurrences', 'details')
+    
+    SEVERITY_RANK = {'Info': 0, 'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 4}
+    
+    def __init__(self, type, target, severity, description, tool='TARANTULA', **details):
+        self.type = type
+        self.target = target
+        self.severity = severity
+        self.description = description
+        self.tool = tool
+        self.occurrences = 1
+        self.details = details or None
+        
+    def __getitem__(self, key):
+        if key != 'details' and key in self.__slots__:
+            return getattr(self, key)
+        if self.details and key in self.details:
+            return self.details[key]
+        raise KeyError(key)
+        
+    def __contains__(self, key):
+        return (key != 'details' and key in self.__slots__) or bool(self.details and key in self.details)
+        
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.__slots__[:-1]}
+        if self.details:
+            data.update(self.details)
+        return data
+        
+    def fingerprint(self):
+        """Normalized (type, asset, evidence) digest used for deduplication
+        
+        The asset drops the URL scheme, default ports, case and trailing
+        slashes, so the same issue reported over http and https (or by two
+        tools) collapses into one finding.
+        """
+        asset = re.sub(r'^[a-z][a-z0-9+.-]*://', '', str(self.target).strip().lower())
+        asset = re.sub(r':(80|443)(?=/|$)', '', asset).rstrip('/')
+        evidence = ' '.join(str(self.description).lower().split())
+        key = '\x00'.join((self.type.strip().lower(), asset, evidence))
+        return hashlib.blake2b(key.encode('utf-8', 'replace'), digest_size=16).digest()
+        
+    def merge(self, other):
+        """Fold a duplicate hit into this finding"""
+        self.occurrences += other.occurrences
+        if self.SEVERITY_RANK.get(other.severity, 0) > self.SEVERITY_RANK.get(self.severity, 0):
+            self.severity = other.severity
+        if other.target != self.target or other.tool != self.tool:
+            if self.details is None:
+                self.details = {}
+            seen_on = self.details.setdefault('seen_on', [])
+            variant = other.target if other.tool == self.tool else f"{other.target} ({other.tool})"
+            if variant not in seen_on:
+                seen_on.append(variant)
+        
+class DNSAnswer(ResultRecord):
+    """Outcome of one (name, rdtype) lookup made by AsyncDNSEngine"""
+    __slots__ = ('name', 'rdtype', 'rcode', 'records', 'ttl', 'cnames', 'resolver')
+    
+    def __init__(self, name, rdtype, rcode, records=(), ttl=0, cnames=(), resolver=None):
+        self.name = name
+        self.rdtype = rdtype
+        self.rcode = rcode
+        self.records = list(records)
+        self.ttl = ttl
+        self.cnames = list(cnames)
+        self.resolver = resolver
+        
+    @property
+    def resolved(self):
+        return self.rcode == 'NOERROR' and bool(self.records)
+        
+def record_to_json(obj):
+    """json.dump default= hook for result records"""
+    if isinstance(obj, ResultRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+class ResultCollector:
+    """Thread-safe sink for typed result records
+    
+    Every append and counter update happens under one lock so the worker
+    pools can report concurrently without losing records or counts. The
+    record lists are the same objects stored in TarantulaCore.results, so
+    readers keep using results['subdomains'] and friends.
+    """
+    def __init__(self, results):
+        self.results = results
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.finding_index = {}
+        self.service_index = {}
+        
+    def add(self, kind, record):
+        with self.lock:
+            self.results[kind].append(record)
+        return record
+        
+    def add_unique_finding(self, finding):
+        """Insert a finding, or merge it into the existing one with the same fingerprint"""
+        key = finding.fingerprint()
+        with self.lock:
+            existing = self.finding_index.get(key)
+            if existing is not None:
+                existing.merge(finding)
+                return existing
+            self.finding_index[key] = finding
+            self.results['vulnerabilities'].append(finding)
+        return finding
+        
+    def add_subdomain(self, subdomain, ip, source='bruteforce', ips=None):
+        return self.add('subdomains', Subdomain(subdomain, ip, source, ips))
+        
+    def add_service(self, port, service, banner, version, state='open', ip=None, hostnames=(), tls=None):
+        record = Service(port, service, banner, version, state, ip, hostnames, tls)
+        with self.lock:
+            self.results['ports'].append(record)
+            self.service_index[(ip, port)] = record
+        return record
+        
+    def merge_service(self, ip, port, service, version, cpe=(), scripts=None, hostnames=()):
+        """Fold detail from a later scanner into the ip:port record; returns (record, created)"""
+        with self.lock:
+            record = self.service_index.get((ip, port))
+            if record is None:
+                record = Service(port, service or 'Unknown', '', version or 'Version Unknown', ip=ip,
+                                 hostnames=hostnames, cpe=cpe, scripts=scripts)
+                self.results['ports'].append(record)
+                self.service_index[(ip, port)] = record
+                return record, True
+            if service and record.service == 'Unknown':
+                record.service = service
+            if version:
+                record.version = version
+            record.cpe.extend(entry for entry in cpe if entry not in record.cpe)
+            record.scripts.update(scripts or {})
+        return record, False
+        
+    def add_directory(self, directory, url, status_code, size, protocol, headers, size_lower_bound=None):
+        return self.add('directories', Directory(directory, url, status_code, size, protocol, headers,
+                                                 size_lower_bound))
+        
+    def add_finding(self, type, target, severity, description, tool='TARANTULA', **details):
+        return self.add_unique_finding(Finding(type, target, severity, description, tool, **details))
+        
+    def reset(self, kind):
+        """Empty a record list in place before a module re-runs"""
+        with self.lock:
+            del self.results[kind][:]
+            if kind == 'vulnerabilities':
+                self.finding_index.clear()
+            elif kind == 'ports':
+                self.service_index.clear()
+            
+    def increment(self, counter, amount=1):
+        with self.lock:
+            value = self.counters.get(counter, 0) + amount
+            self.counters[counter] = value
+        return value
+        
+    def reset_counter(self, counter):
+        with self.lock:
+            self.counters[counter] = 0
+            
+    def count(self, counter):
+        with self.lock:
+            return self.counters.get(counter, 0)
+            
+class ToolProbeCache:
+    """Resolved tool paths and versions, persisted in the workspace
+    
+    Entries are keyed by the resolved binary path and are only trusted while
+    the binary's mtime and size are unchanged, so `<tool> --version` is
+    spawned again after an install or upgrade and never otherwise. Only a
+    clean exit is stored: a probe that failed or timed out may just have
+    been slow, so it is retried on the next lookup instead of hiding the
+    tool until the binary changes.
+    """
+    VERSION_FLAGS = {
+        'nuclei': ['-version'],
+        'nmap': ['--version'],
+        'wafw00f': ['--version'],
+        'sqlmap': ['--version'],
+        'wpscan': ['--version']
+    }
+    
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.entries = self.load()
+        
+    def load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+            
+    def save(self):
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_file, self.cache_file)
+        
+    def probe(self, tool, path):
+        """Return {'path', 'version', 'available', ...} or None if not installed"""
+        resolved = shutil.which(path)
+        if not resolved:
+            return None
+            
+        resolved = os.path.realpath(resolved)
+        try:
+            stat = os.stat(resolved)
+        except OSError:
+            return None
+            
+        with self.lock:
+            entry = self.entries.get(resolved)
+            if (entry and entry.get('available') and entry['mtime'] == stat.st_mtime_ns and
+                    entry['size'] == stat.st_size):
+                return entry
+                
+        try:
+            result = subprocess.run([resolved] + self.VERSION_FLAGS.get(tool, ['--version']),
+                                    capture_output=True, text=True, timeout=30)
+            available = result.returncode == 0
+            output = (result.stdout or result.stderr).strip()
+        except (OSError, subprocess.TimeoutExpired):
+            available = False
+            output = ''
+            
+        entry = {
+            'tool': tool,
+            'path': resolved,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'available': available,
+            'version': output.splitlines()[0] if output else 'Unknown',
+            'probed_at': datetime.now().isoformat()
+        }
+        
+        if not available:
+            return entry
+            
+        with self.lock:
+            self.entries[resolved] = entry
+            try:
+                self.save()
+            except OSError:
+                pass
+                
+        return entry
+        
+class DNSCache:
+    """Process-wide TTL-aware cache of DNS answers
+    
+    Shared by AsyncDNSEngine and the blocking lookups made from module
+    threads. Positive answers live for their record TTL (clamped to
+    MAX_TTL); NXDOMAIN and empty NOERROR answers are cached for NEGATIVE_TTL.
+    Timeouts and server failures from blocking lookups are cached for the
+    much shorter FAILURE_TTL, so connections to a host whose DNS is down
+    fail fast instead of each waiting out the lookup again. Entries are
+    stored as plain tuples, so callers always get a fresh DNSAnswer they
+    may mutate.
+    """
+    NEGATIVE_TTL = 300
+    FAILURE_TTL = 30
+    MAX_TTL = 86400
+    MAX_ENTRIES = 200000
+    LIFETIME = 10
+    CACHEABLE_RCODES = ('NOERROR', 'NXDOMAIN')
+    FAILURE_RCODES = ('TIMEOUT', 'SERVFAIL')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        
+    @staticmethod
+    def key(name, rdtype):
+        return f"{name.lower().rstrip('.')}|{rdtype}"
+        
+    def get(self, name, rdtype='A'):
+        """Cached DNSAnswer with its remaining TTL, or None"""
+        key = self.key(name, rdtype)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] <= time.time():
+                del self.entries[key]
+                entry = None
+            self.stats['hits' if entry else 'misses'] += 1
+        if not entry:
+            return None
+        expires, rcode, records, cnames = entry
+        return DNSAnswer(name, rdtype, rcode, records, int(expires - time.time()), cnames, 'cache')
+        
+    def put(self, answer):
+        if answer.rcode in self.FAILURE_RCODES:
+            ttl = self.FAILURE_TTL
+        elif answer.rcode not in self.CACHEABLE_RCODES:
+            return
+        else:
+            ttl = min(answer.ttl, self.MAX_TTL) if answer.records else self.NEGATIVE_TTL
+        if ttl <= 0:
+            return
+        entry = (time.time() + ttl, answer.rcode, tuple(answer.records), tuple(answer.cnames))
+        with self.lock:
+            if len(self.entries) >= self.MAX_ENTRIES:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[self.key(answer.name, answer.rdtype)] = entry
+            
+    def resolve(self, name, rdtype='A', lifetime=None):
+        """Blocking cached lookup for thread-pool callers; never raises
+        
+        lifetime bounds the whole lookup (default LIFETIME seconds).
+        """
+        answer = self.get(name, rdtype)
+        if answer:
+            return answer
+            
+        lifetime = self.LIFETIME if lifetime is None else lifetime
+        try:
+            result = dns_resolver.resolve(name, rdtype, lifetime=lifetime)
+            cnames = [] if result.canonical_name == result.qname else [result.canonical_name.to_text().rstrip('.')]
+            answer = DNSAnswer(name, rdtype, 'NOERROR', [rdata.to_text() for rdata in result],
+                               result.rrset.ttl, cnames)
+        except dns_resolver.NXDOMAIN:
+            answer = DNSAnswer(name, rdtype, 'NXDOMAIN')
+        except dns_resolver.NoAnswer:
+            answer = DNSAnswer(name, rdtype, 'NOERROR')
+        except dns_resolver.LifetimeTimeout:
+            answer = DNSAnswer(name, rdtype, 'TIMEOUT')
+        except Exception:
+            answer = DNSAnswer(name, rdtype, 'SERVFAIL')
+            
+        self.put(answer)
+        return answer
+        
+    def address(self, host, timeout=None):
+        """An IPv4 address for host from the cache (resolving on a miss); host itself when DNS has none
+        
+        timeout is the caller's connect timeout; the lookup never takes longer.
+        """
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        lifetime = self.LIFETIME
+        if isinstance(timeout, (int, float)) and not isinstance(timeout, bool):
+            lifetime = max(0.1, min(lifetime, timeout))
+        answer = self.resolve(host, 'A', lifetime)
+        # Nothing in DNS (an /etc/hosts name, IPv6 only...): leave it to getaddrinfo
+        return answer.records[0] if answer.records else host
+        
+    def load(self, cache_file):
+        """Merge unexpired entries from a previous run"""
+        try:
+            with open(cache_file, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+            
+        now = time.time()
+        with self.lock:
+            for key, (expires, rcode, records, cnames) in stored.items():
+                if expires > now and key not in self.entries:
+                    self.entries[key] = (expires, rcode, tuple(records), tuple(cnames))
+                    
+    def save(self, cache_file):
+        now = time.time()
+        with self.lock:
+            live = {key: entry for key, entry in self.entries.items() if entry[0] > now}
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(live, f)
+        os.replace(tmp_file, cache_file)
+        
+DNS_CACHE = DNSCache()
+
+class WordlistSource:
+    """Lazy word iterator over built-in words plus memory-mapped wordlist files
+    
+    Files are read line by line through mmap, so memory stays flat whatever
+    their size. With a state_key, the byte offset reached in each file is
+    checkpointed to the workspace state file and the next run resumes from
+    there. The checkpoint trails the read position by checkpoint_lag words,
+    so words still in flight in a worker queue are retried rather than lost.
+    A file that is read to the end has its checkpoint removed.
+    """
+    state_lock = threading.Lock()
+    
+    def __init__(self, builtin=(), paths=(), state_file=None, state_key=None,
+                 checkpoint_lag=1000, checkpoint_every=5000):
+        self.builtin = builtin
+        self.paths = paths
+        self.state_file = state_file
+        self.state_key = state_key
+        self.checkpoint_lag = checkpoint_lag
+        self.checkpoint_every = checkpoint_every
+        
+    def __iter__(self):
+        for word in self.builtin:
+            yield word
+        for path in self.paths:
+            yield from self.read_file(path)
+            
+    def read_file(self, path):
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return
+            
+        with f:
+            stat = os.fstat(f.fileno())
+            if not stat.st_size:
+                return
+            key = f"{self.state_key}:{os.path.realpath(path)}" if self.state_key else None
+            offset = self.load_offset(key, stat)
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                mapped.seek(offset)
+                recent = collections.deque(maxlen=self.checkpoint_lag)
+                count = 0
+                finished = False
+                try:
+                    for line in iter(mapped.readline, b''):
+                        recent.append(offset)
+                        offset += len(line)
+                        word = line.strip().decode('utf-8', 'ignore')
+                        if word and not word.startswith('#'):
+                            yield word
+                        count += 1
+                        if key and count % self.checkpoint_every == 0:
+                            self.save_offset(key, stat, recent[0])
+                    finished = True
+                finally:
+                    if key:
+                        self.save_offset(key, stat, None if finished else (recent[0] if recent else offset))
+                        
+    def load_offset(self, key, stat):
+        if not key or not self.state_file:
+            return 0
+        with self.state_lock:
+            entry = self.read_state().get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return min(entry['offset'], stat.st_size)
+        return 0
+        
+    def save_offset(self, key, stat, offset):
+        if not self.state_file:
+            return
+        with self.state_lock:
+            state = self.read_state()
+            if offset is None:
+                state.pop(key, None)
+            else:
+                state[key] = {'offset': offset, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_file, self.state_file)
+            
+    def read_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+            
+class BloomFilter:
+    """Fixed-size probabilistic set over a bytearray
+    
+    Sized for `capacity` items at `error_rate` false positives; the k bit
+    positions come from one blake2b digest by double hashing. Memory is
+    about 1.8 bytes per item at the default 0.1% error rate.
+    """
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8', 'ignore'), digest_size=16).digest()
+        first, second = struct.unpack('>QQ', digest)
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+        
+    def add(self, item):
+        """Add item; returns True if it was (probably) not present before"""
+        added = False
+        for position in self.positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        return added
+        
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+        
+PERMUTATION_WORDS = [
+    'dev', 'develop', 'staging', 'stage', 'stg', 'test', 'qa', 'uat', 'prod', 'preprod',
+    'int', 'internal', 'api', 'admin', 'beta', 'demo', 'old', 'new', 'v1', 'v2', 'sandbox',
+    'backup', 'mgmt', 'vpn', 'portal', 'app', 'cdn', 'static', 'www', 'mail'
+]
+
+def subdomain_permutations(known, apex, words=PERMUTATION_WORDS, seen=None):
+    """Lazily yield alteration candidates for already-known names under apex
+    
+    Derives e.g. dev-api, api-dev, devapi, api2, api.dev, dev.api and
+    api.staging style names. Candidates, and the known names themselves,
+    pass through the `seen` BloomFilter so each is yielded once.
+    """
+    apex = apex.lower().rstrip('.')
+    prefixes = []
+    for name in known:
+        name = name.lower().rstrip('.').lstrip('*.')
+        if name.endswith(f".{apex}"):
+            prefixes.append(name[:-len(apex) - 1])
+            
+    if seen is None:
+        seen = BloomFilter(max(100000, len(prefixes) * len(words) * 8))
+    for prefix in prefixes:
+        seen.add(f"{prefix}.{apex}")
+        
+    def alterations(prefix):
+        first, _, rest = prefix.partition('.')
+        tail = f".{rest}" if rest else ''
+        
+        # Number bumps: api -> api1..api3, api2 -> api1/api3
+        digits = re.search(r'(\d+)$', first)
+        if digits:
+            number = int(digits.group(1))
+            stem = first[:digits.start()]
+            for bump in (number - 1, number + 1, number + 2):
+                if bump >= 0:
+                    yield f"{stem}{bump}{tail}"
+        else:
+            for number in (1, 2, 3):
+                yield f"{first}{number}{tail}"
+                yield f"{first}-{number}{tail}"
+                
+        for word in words:
+            if word == first:
+                continue
+            yield f"{word}-{first}{tail}"
+            yield f"{first}-{word}{tail}"
+            yield f"{word}{first}{tail}"
+            yield f"{first}{word}{tail}"
+            yield f"{first}.{word}{tail}"
+            yield f"{word}.{prefix}"
+            
+    for prefix in prefixes:
+        for candidate in alterations(prefix):
+            name = f"{candidate}.{apex}"
+            if seen.add(name):
+                yield name
+                
+def iter_json_array(chunks):
+    """Yield the elements of a top-level JSON array as its bytes arrive
+    
+    Only the current partial element is buffered, so arbitrarily large
+    responses are parsed in constant memory. chunks is read to its end
+    after the closing bracket, so a source that only caches complete
+    downloads (ResponseCache.stream) gets to finish.
+    """
+    chunks = iter(chunks)
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')('replace')
+    buffer = ''
+    started = False
+    
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('expected a JSON array')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                for _ in chunks:
+                    pass
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                break
+            # A scalar running into the end of the buffer may still be growing
+            if end == len(buffer) and not isinstance(item, (dict, list)):
+                break
+            yield item
+            position = end
+        buffer = buffer[position:]
+        
+_CACHED_DNS_POOLS = {}
+
+def cached_dns_pool_classes():
+    """urllib3 pool classes whose connections take their address from DNS_CACHE
+    
+    Only the address connected to changes: Host header, SNI and certificate
+    checks still see the hostname. Built on first use, as urllib3 is only
+    imported once requests is. This overrides the host/_dns_host attributes
+    urllib3 1.26 and 2.x connections share (tests/test_dns_cache.py checks
+    it against the installed urllib3).
+    """
+    if not _CACHED_DNS_POOLS:
+        import urllib3.connection
+        import urllib3.connectionpool
+        
+        def cached(connection_class):
+            class CachedDNSConnection(connection_class):
+                @property
+                def host(self):
+                    return self._hostname.rstrip('.')
+                    
+                @host.setter
+                def host(self, value):
+                    self._hostname = value
+                    
+                @property
+                def _dns_host(self):
+                    # self.timeout is the connect timeout (None or a sentinel when unset)
+                    return DNS_CACHE.address(self._hostname.rstrip('.'), getattr(self, 'timeout', None))
+                    
+                @_dns_host.setter
+                def _dns_host(self, value):
+                    self._hostname = value
+                    
+            return CachedDNSConnection
+            
+        _CACHED_DNS_POOLS['http'] = type('CachedDNSHTTPConnectionPool', (urllib3.connectionpool.HTTPConnectionPool,),
+                                         {'ConnectionCls': cached(urllib3.connection.HTTPConnection)})
+        _CACHED_DNS_POOLS['https'] = type('CachedDNSHTTPSConnectionPool',
+                                          (urllib3.connectionpool.HTTPSConnectionPool,),
+                                          {'ConnectionCls': cached(urllib3.connection.HTTPSConnection)})
+    return _CACHED_DNS_POOLS
+    
+class HTTPClient:
+    """Shared keep-alive HTTP client used by every module
+    
+    One requests Session with a pooled HTTPAdapter: connections to a host
+    are kept alive and reused, at most per_host of them at once (a thread
+    wanting another waits for one to free up rather than opening a new
+    socket). Connections look their host up in DNS_CACHE rather than
+    through getaddrinfo on every connect. Cookies are refused, as they were
+    with bare requests.get, so one module's session state never leaks into
+    another's. With http2=True
+    and httpx[http2] installed, everything but streamed downloads goes
+    through httpx instead, and concurrent requests to a host share one
+    multiplexed connection.
+    Cloudflare-facing modules share one cloudscraper session.
+    """
+    def __init__(self, per_host=40, hosts=100, http2=False):
+        self.per_host = per_host
+        self.hosts = hosts
+        self.http2 = http2
+        self.lock = threading.Lock()
+        self._session = None
+        self._h2_clients = {}
+        self._scraper = None
+        
+    @property
+    def session(self):
+        with self.lock:
+            if self._session is None:
+                import http.cookiejar
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=self.hosts, pool_maxsize=self.per_host,
+                                                        pool_block=True)
+                adapter.poolmanager.pool_classes_by_scheme = dict(cached_dns_pool_classes())
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                self._session = session
+            return self._session
+            
+    @property
+    def scraper(self):
+        """Shared cloudscraper session; raises ImportError when cloudscraper is missing"""
+        with self.lock:
+            if self._scraper is None:
+                self._scraper = cloudscraper.create_scraper()
+            return self._scraper
+            
+    def h2_client(self, verify):
+        """httpx client with HTTP/2 for this verify setting, or None when httpx/h2 are missing"""
+        with self.lock:
+            if verify not in self._h2_clients:
+                try:
+                    import httpx
+                    import h2  # noqa: F401 - httpx needs it for http2=True
+                    limits = httpx.Limits(max_connections=self.hosts * self.per_host,
+                                          max_keepalive_connections=self.hosts)
+                    self._h2_clients[verify] = httpx.Client(http2=True, verify=verify, limits=limits)
+                except ImportError:
+                    self._h2_clients[verify] = None
+            return self._h2_clients[verify]
+            
+    def request(self, method, url, **kwargs):
+        if self.http2 and not kwargs.get('stream'):
+            client = self.h2_client(kwargs.pop('verify', True))
+            if client is not None:
+                kwargs['follow_redirects'] = kwargs.pop('allow_redirects', method != 'HEAD')
+                return client.request(method, url, **kwargs)
+        return self.session.request(method, url, **kwargs)
+        
+    def get(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('GET', url, **kwargs)
+        
+    def head(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+        
+HTTP_CLIENT = HTTPClient()
+
+class LivenessCache:
+    """Which schemes and ports answer HTTP on each host, probed once per host
+    
+    The first caller asking about a host probes every (scheme, port) in
+    endpoints with one unfollowed GET whose body is never read; concurrent
+    callers for the same host wait for that probe instead of repeating it.
+    Any HTTP answer counts as live, whatever its status. When plain http
+    only redirects to https and https answers, bases() leaves http out, so
+    modules request each path once rather than once per scheme, and hosts
+    where nothing answers get no requests at all. Web services on other
+    ports (8080, 8443, ...) are added with add_endpoints() as the port scan
+    finds them: a host's first probe includes them, and a host that was
+    already probed gets just the new ones probed and merged into its record.
+    
+    Records are plain dicts kept in the records mapping (the scan's
+    results['web_endpoints']), so they go out with the rest of the results.
+    """
+    ENDPOINTS = (('https', 443), ('http', 80))
+    DEFAULT_PORTS = {'http': 80, 'https': 443}
+    
+    def __init__(self, records=None, endpoints=ENDPOINTS, timeout=5):
+        self.records = records if records is not None else {}
+        self.endpoints = endpoints
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.extra = {}
+        self.probed = {}
+        
+    @staticmethod
+    def service_endpoint(port, service, banner='', tls=None):
+        """(scheme, port) when a port-scan service speaks HTTP, else None"""
+        name = str(service or '').lower()
+        if 'http' not in name and not (banner or '').startswith('HTTP/'):
+            return None
+        return ('https' if tls or 'https' in name or 'ssl' in name else 'http'), port
+        
+    def add_endpoints(self, host, endpoints, client=None):
+        """Also probe these (scheme, port) pairs on host, e.g. web services found by the port scan
+        
+        With a client, a host that was already probed (or is being probed)
+        has the pairs it has not seen probed now and merged into its record.
+        """
+        host = host.lower().rstrip('.')
+        with self.lock:
+            self.extra.setdefault(host, set()).update(endpoints)
+            waiter = self.pending.get(host)
+            known = host in self.records
+        if client is None or (waiter is None and not known):
+            return
+        if waiter is not None:
+            waiter.wait()
+            
+        with self.lock:
+            record = self.records.get(host)
+            probed = self.probed.setdefault(host, set())
+            new = sorted(self.extra[host] - probed)
+            probed.update(new)
+        if record is None or not new:
+            return
+        found, https_redirect = self.probe_endpoints(host, new, client)
+        with self.lock:
+            record['endpoints'].extend(found)
+            record['live'] = bool(record['endpoints'])
+            record['https_redirect'] = record['https_redirect'] or https_redirect
+            
+    def base_url(self, scheme, host, port):
+        if port == self.DEFAULT_PORTS.get(scheme):
+            return f"{scheme}://{host}"
+        return f"{scheme}://{host}:{port}"
+        
+    def probe(self, host, client):
+        with self.lock:
+            pairs = list(self.endpoints) + sorted(self.extra.get(host, set()) - set(self.endpoints))
+            self.probed[host] = set(pairs)
+        endpoints, https_redirect = self.probe_endpoints(host, pairs, client)
+        return {'host': host, 'live': bool(endpoints), 'https_redirect': https_redirect, 'endpoints': endpoints}
+        
+    def probe_endpoints(self, host, pairs, client):
+        """(endpoint records that answered, whether http redirected to https) for (scheme, port) pairs"""
+        endpoints = []
+        https_redirect = False
+        for scheme, port in pairs:
+            url = self.base_url(scheme, host, port)
+            try:
+                response = client.get(url, timeout=self.timeout, allow_redirects=False, stream=True, verify=False)
+                response.close()
+            except Exception:
+                continue
+            location = response.headers.get('Location', '')
+            endpoints.append({'scheme': scheme, 'port': port, 'url': url, 'status': response.status_code,
+                              'server': response.headers.get('Server', ''), 'location': location})
+            if scheme == 'http' and 300 <= response.status_code < 400 and location.lower().startswith('https://'):
+                https_redirect = True
+        return endpoints, https_redirect
+        
+    def check(self, host, client):
+        """Liveness record for host, probing it on first use"""
+        host = host.lower().rstrip('.')
+        with self.lock:
+            record = self.records.get(host)
+            if record is not None:
+                return record
+            waiter = self.pending.get(host)
+            owner = waiter is None
+            if owner:
+                waiter = self.pending[host] = threading.Event()
+                
+        if not owner:
+            waiter.wait()
+            with self.lock:
+                return self.records.get(host) or {'host': host, 'live': False, 'https_redirect': False,
+                                                  'endpoints': []}
+                
+        record = {'host': host, 'live': False, 'https_redirect': False, 'endpoints': []}
+        try:
+            record = self.probe(host, client)
+        finally:
+            # Waiters must never be left hanging, even when the probe blew up
+            with self.lock:
+                self.records[host] = record
+                del self.pending[host]
+            waiter.set()
+        return record
+        
+    def check_all(self, hosts, client, workers=20):
+        """Probe many hosts concurrently; returns {host: record}"""
+        hosts = list(dict.fromkeys(host.lower().rstrip('.') for host in hosts))
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(hosts)))) as executor:
+            return dict(zip(hosts, executor.map(lambda host: self.check(host, client), hosts)))
+            
+    def bases(self, host, client):
+        """Base URLs answering on host, https first; http is dropped when it just redirects to https"""
+        record = self.check(host, client)
+        endpoints = record['endpoints']
+        if record['https_redirect'] and any(endpoint['scheme'] == 'https' for endpoint in endpoints):
+            endpoints = [endpoint for endpoint in endpoints
+                         if not (endpoint['scheme'] == 'http' and endpoint['port'] == 80)]
+        return [endpoint['url'] for endpoint in endpoints]
+        
+    def reset(self):
+        with self.lock:
+            self.records.clear()
+            self.extra.clear()
+            self.probed.clear()
+
+class HTTPResult:
+    """Status, headers and body of one AsyncHTTPEngine request
+    
+    content holds at most the engine's body budget (nothing for HEAD);
+    length is the full size the server reported, from Content-Range or
+    Content-Length, or the bytes seen when it reported neither - or None
+    when the body was cut off at the budget and its size is unknown.
+    """
+    __slots__ = ('url', 'status_code', 'headers', 'content', 'length', 'truncated')
+    
+    def __init__(self, url, status_code, headers, content, length=None, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.truncated = truncated
+        self.length = None if truncated else len(content) if length is None else length
+        
+    @property
+    def size_lower_bound(self):
+        """Bytes read of a body cut off at the budget (its size is at least that), else None"""
+        return len(self.content) if self.truncated else None
+        
+    def header(self, name, default=None):
+        """Case-insensitive header lookup"""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return default
+        
+class SoftNotFoundFilter:
+    """Per-directory soft-404 baselines for AsyncHTTPEngine
+    
+    The first time a directory of a host is seen, a few random paths inside
+    it are requested (apps often answer /admin/* differently from /*) and
+    each response is reduced to a fingerprint: status, a length bucket
+    (quarter-octave steps) and a 64-bit SimHash of the body and Location
+    header, with the requested path and any digit-bearing tokens taken out. A later response whose status
+    and length bucket match a baseline is SimHashed too, and counts as a
+    soft-404 when it is within MAX_DISTANCE bits - catch-all pages, login
+    redirects and custom error pages that answer 200 or 302 for anything.
+    
+    A baseline whose probes all failed is tried again by the next request
+    into that directory, up to ATTEMPTS times; after that the directory is
+    left unfiltered and listed in self.unavailable.
+    """
+    PROBES = ('{token}', '{token}.php', '{token}.txt', '.{token}')
+    MAX_DISTANCE = 6
+    BODY_LIMIT = 65536
+    ATTEMPTS = 3
+    TOKEN = re.compile(r'[a-z]{3,}')
+    VOLATILE = re.compile(r'[a-z]*\d[a-z0-9]*')
+    
     def __init__(self):
+        self.baselines = {}
+        self.attempts = collections.Counter()
+        self.unavailable = set()
+        
+    @staticmethod
+    def directory_key(url):
+        """(scheme, netloc, parent directory path) of url"""
+        parsed = urlparse(url)
+        return parsed.scheme, parsed.netloc, (parsed.path or '/').rsplit('/', 1)[0] + '/'
+        
+    def normalized(self, result):
+        """Response text without the requested path or ids, timestamps and hashes that differ per response"""
+        path = urlparse(result.url).path
+        text = result.content[:self.BODY_LIMIT].decode('utf-8', 'ignore')
+        text = f"{text} {result.header('location', '')}".lower()
+        for echo in sorted({path, unquote(path), quote(unquote(path))}, key=len, reverse=True):
+            if len(echo) > 1:
+                text = text.replace(echo.lower(), ' ')
+        return self.VOLATILE.sub(' ', text)
+        
+    @staticmethod
+    def length_bucket(length):
+        return int(math.log2(length + 1) * 4)
+        
+    def simhash(self, text):
+        weights = collections.Counter(self.TOKEN.findall(text))
+        vector = [0] * 64
+        for token, weight in weights.items():
+            value = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+            for bit in range(64):
+                vector[bit] += weight if value >> bit & 1 else -weight
+        return sum(1 << bit for bit in range(64) if vector[bit] > 0)
+        
+    def fingerprint(self, result):
+        text = self.normalized(result)
+        return result.status_code, self.length_bucket(len(text)), self.simhash(text)
+        
+    async def baseline(self, engine, url):
+        """Fingerprints of random-path responses in url's directory, probed once per directory"""
+        key = self.directory_key(url)
+        future = self.baselines.get(key)
+        if future is None:
+            future = self.baselines[key] = asyncio.get_running_loop().create_future()
+            base = f"{key[0]}://{key[1]}{key[2]}"
+            fingerprints = []
+            try:
+                for probe in self.PROBES:
+                    token = ''.join(random.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=16))
+                    try:
+                        fingerprints.append(self.fingerprint(await engine.fetch(base + probe.format(token=token))))
+                    except engine.FETCH_ERRORS:
+                        pass
+            finally:
+                # Workers waiting on this directory must never be left hanging
+                future.set_result(fingerprints)
+                if not fingerprints:
+                    self.attempts[key] += 1
+                    if self.attempts[key] < self.ATTEMPTS:
+                        del self.baselines[key]
+                    else:
+                        self.unavailable.add(base)
+        return await future
+        
+    async def matches(self, engine, result):
+        """True when result looks like the host's answer for a path that does not exist"""
+        fingerprints = await self.baseline(engine, result.url)
+        text = None
+        for status, bucket, simhash in fingerprints:
+            if status != result.status_code:
+                continue
+            text = text if text is not None else self.normalized(result)
+            if abs(self.length_bucket(len(text)) - bucket) > 1:
+                continue
+            if bin(self.simhash(text) ^ simhash).count('1') <= self.MAX_DISTANCE:
+                return True
+        return False
+        
+
+class AsyncHTTPEngine:
+    """asyncio HTTP/1.1 client and shared worker pool for path discovery
+    
+    This is the one place that does not go through HTTPClient: requests is
+    blocking, so a thread per request cannot keep thousands of discovery
+    probes in flight, and httpx's async client is an optional dependency
+    (--http2) that is not there on most installs. The engine keeps to the
+    shared client's rules instead - at most per_host requests in flight to
+    a host, addresses from DNS_CACHE, and the same http_proxy/https_proxy/
+    no_proxy environment requests honours (plain http proxies: absolute-form
+    requests for http, a CONNECT tunnel for https). It always speaks
+    HTTP/1.1 on keep-alive connections pooled per (scheme, host, port),
+    --http2 or not.
+    
+    run() hands items to workers as they free up: seeds are pulled lazily
+    from an iterator, and the handler may return an iterable of follow-up
+    items for any response, pulled the same way ahead of further seeds -
+    directory hits, the files inside them and backup variants all share
+    the workers instead of serialising inside the one that found the hit,
+    and no more items exist at once than there are workers.
+    
+    Items are tuples whose first element is the URL; handler(item, result)
+    gets result None when the request failed, or when a SoftNotFoundFilter
+    recognised the response as the host's soft-404, so no follow-up work is
+    ever queued for those.
+    
+    Bodies are capped at body_budget bytes: GETs ask for that much with a
+    Range header, and a server that ignores it is read only up to the
+    budget, with the rest drained when small or the connection dropped.
+    Queue items are probed with HEAD where the host answers it, so a miss
+    costs headers only and the size comes from Content-Length.
+    """
+    HEADER_LIMIT = 65536
+    DRAIN_LIMIT = 65536
+    FETCH_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError)
+    CONTENT_RANGE = re.compile(r'bytes\s+(?:\d+-\d+|\*)/(\d+)')
+    
+    def __init__(self, concurrency=200, per_host=20, timeout=8.0, user_agents=None, soft_not_found=None,
+                 body_budget=65536, use_head=True, proxies=None):
+        import urllib.request
+        
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.user_agents = user_agents or ['Mozilla/5.0']
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        self.soft_not_found = soft_not_found
+        self.body_budget = body_budget
+        self.use_head = use_head
+        self.head_support = {}
+        self.addresses = {}
+        self.idle = {}
+        self.host_limits = {}
+        self.stats = {'requests': 0, 'errors': 0, 'connections': 0, 'soft_404': 0, 'body_bytes': 0}
+        
+        self.tls_context = ssl.create_default_context()
+        self.tls_context.check_hostname = False
+        self.tls_context.verify_mode = ssl.CERT_NONE
+        
+    async def address(self, host):
+        """host's address from DNS_CACHE, looked up once per engine off the event loop"""
+        lookup = self.addresses.get(host)
+        if lookup is None:
+            loop = asyncio.get_running_loop()
+            lookup = self.addresses[host] = loop.run_in_executor(None, DNS_CACHE.address, host, self.timeout)
+        return await lookup
+        
+    def proxy_for(self, scheme, host):
+        """(host, port, Proxy-Authorization or None) of the http proxy for scheme://host, or None"""
+        import urllib.request
+        
+        proxy = self.proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        parsed = urlparse(proxy if '://' in proxy else f"http://{proxy}")
+        if parsed.scheme != 'http':
+            raise ValueError(f"unsupported proxy {proxy} - only http:// proxies are supported")
+        authorization = None
+        if parsed.username:
+            credentials = f"{unquote(parsed.username)}:{unquote(parsed.password or '')}"
+            authorization = f"Basic {base64.b64encode(credentials.encode('utf-8')).decode('ascii')}"
+        return parsed.hostname, parsed.port or 80, authorization
+        
+    def tunnel(self, proxy, host, port):
+        """Blocking CONNECT to host:port through proxy; returns the tunnelled socket"""
+        proxy_host, proxy_port, authorization = proxy
+        sock = socket.create_connection((proxy_host, proxy_port), timeout=self.timeout)
+        try:
+            request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            if authorization:
+                request += f"Proxy-Authorization: {authorization}\r\n"
+            sock.sendall((request + '\r\n').encode('latin-1'))
+            response = b''
+            while b'\r\n\r\n' not in response:
+                chunk = sock.recv(4096)
+                if not chunk or len(response) > self.HEADER_LIMIT:
+                    raise ConnectionError(f"proxy closed the CONNECT to {host}:{port}")
+                response += chunk
+            status = response.split(b' ', 2)[1]
+            if status != b'200':
+                raise ConnectionError(f"proxy refused CONNECT to {host}:{port} ({status.decode('latin-1')})")
+            return sock
+        except BaseException:
+            sock.close()
+            raise
+            
+    async def connect(self, scheme, host, port):
+        self.stats['connections'] += 1
+        proxy = self.proxy_for(scheme, host)
+        if proxy is not None:
+            if scheme == 'https':
+                sock = await asyncio.get_running_loop().run_in_executor(None, self.tunnel, proxy, host, port)
+                return await asyncio.open_connection(sock=sock, ssl=self.tls_context, server_hostname=host,
+                                                     limit=self.HEADER_LIMIT)
+            return await asyncio.open_connection(proxy[0], proxy[1], limit=self.HEADER_LIMIT)
+        address = await self.address(host)
+        if scheme == 'https':
+            return await asyncio.open_connection(address, port, ssl=self.tls_context, server_hostname=host,
+                                                 limit=self.HEADER_LIMIT)
+        return await asyncio.open_connection(address, port, limit=self.HEADER_LIMIT)
+        
+    async def fetch(self, url, method='GET', headers=None):
+        """One request on a pooled connection; raises OSError, asyncio or ValueError errors on failure"""
+        parsed = urlparse(url)
+        scheme = parsed.scheme
+        host = parsed.hostname
+        port = parsed.port or (443 if scheme == 'https' else 80)
+        target = parsed.path or '/'
+        if parsed.query:
+            target += f"?{parsed.query}"
+        key = (scheme, host, port)
+        
+        limit = self.host_limits.get(key)
+        if limit is None:
+            limit = self.host_limits[key] = asyncio.Semaphore(self.per_host)
+            
+        request = [f"{method} {target} HTTP/1.1", f"Host: {parsed.netloc}",
+                   f"User-Agent: {random.choice(self.user_agents)}", "Accept: */*", "Connection: keep-alive"]
+        # Plain http through a proxy: absolute-form request line on the proxy connection
+        proxy = self.proxy_for(scheme, host) if scheme == 'http' else None
+        if proxy is not None:
+            request[0] = f"{method} {scheme}://{parsed.netloc}{target} HTTP/1.1"
+            if proxy[2]:
+                request.append(f"Proxy-Authorization: {proxy[2]}")
+        request.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        ranged = method == 'GET' and bool(self.body_budget) and not any(
+            name.lower() == 'range' for name in (headers or {}))
+        if ranged:
+            request.append(f"Range: bytes=0-{self.body_budget - 1}")
+        payload = ('\r\n'.join(request) + '\r\n\r\n').encode('latin-1')
+        
+        async with limit:
+            self.stats['requests'] += 1
+            idle = self.idle.setdefault(key, [])
+            # A pooled connection may have been closed by the server meanwhile: retry once on a new one
+            for reused in ((True, False) if idle else (False,)):
+                reader, writer = idle.pop() if reused and idle else await asyncio.wait_for(
+                    self.connect(scheme, host, port), self.timeout)
+                try:
+                    writer.write(payload)
+                    result, reusable = await asyncio.wait_for(self.read_response(reader, url, method, ranged),
+                                                            self.timeout)
+                except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                        ValueError):
+                    writer.close()
+                    if reused:
+                        continue
+                    raise
+                if reusable and len(idle) < self.per_host:
+                    idle.append((reader, writer))
+                else:
+                    writer.close()
+                return result
+            raise ConnectionError(f"no connection to {host}:{port}")
+            
+    async def read_response(self, reader, url, method, ranged=False):
+        """(HTTPResult, connection reusable) for the next response on reader, body capped at body_budget"""
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        version, status = lines[0].split(' ', 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip()] = value.strip()
+        lowered = {name.lower(): value.lower() for name, value in headers.items()}
+        status = int(status)
+        reusable = lowered.get('connection') != 'close' and (version != 'HTTP/1.0' or
+                                                              lowered.get('connection') == 'keep-alive')
+                                                              
+        budget = self.body_budget or float('inf')
+        length = None
+        truncated = False
+        
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+            if method == 'HEAD' and lowered.get('content-length', '').isdigit():
+                length = int(lowered['content-length'])
+        elif 'chunked' in lowered.get('transfer-encoding', ''):
+            parts = []
+            received = 0
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+                if size == 0:
+                    while (await reader.readuntil(b'\r\n')) != b'\r\n':
+                        pass
+                    break
+                # Never more than the budget of a chunk, however large the server made it
+                wanted = min(size, budget - received)
+                if wanted:
+                    parts.append(await reader.readexactly(wanted))
+                    received += wanted
+                if wanted < size:
+                    # Over budget with the stream still open: give up on the connection
+                    reusable = False
+                    truncated = True
+                    break
+                await reader.readexactly(2)
+            body = b''.join(parts)
+            length = received
+        elif 'content-length' in lowered:
+            length = int(lowered['content-length'])
+            body = await reader.readexactly(min(length, budget))
+            rest = length - len(body)
+            if 0 < rest <= self.DRAIN_LIMIT:
+                await reader.readexactly(rest)
+                self.stats['body_bytes'] += rest
+            elif rest:
+                reusable = False
+        else:
+            parts = []
+            received = 0
+            # Read to the close; stopping at the budget first leaves the size unknown
+            truncated = True
+            while received < budget:
+                chunk = await reader.read(min(budget - received, 65536))
+                if not chunk:
+                    truncated = False
+                    break
+                parts.append(chunk)
+                received += len(chunk)
+            body = b''.join(parts)
+            reusable = False
+            
+        # The Range header is ours: report the resource, not the slice of it
+        total = self.CONTENT_RANGE.match(lowered.get('content-range', ''))
+        if total:
+            length = int(total.group(1))
+            truncated = False
+        if ranged and (status == 206 or (status == 416 and length == 0)):
+            status = 200
+        self.stats['body_bytes'] += len(body)
+        return HTTPResult(url, status, headers, body, length, truncated), reusable
+        
+    async def probe(self, url):
+        """Status, headers and size of url for as few body bytes as possible
+        
+        HEAD first while the host answers it; a 405/501 turns HEAD off for the
+        host. Hits still get a budgeted GET when the soft-404 filter needs a
+        body to compare, or when HEAD gave no Content-Length. Hosts whose
+        soft-404 baseline is not a plain 404 answer everything, so HEAD would
+        only double their requests. A HEAD that fails or times out falls back
+        to the GET, and HEAD is turned off for a host whose GET then works.
+        """
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        if self.use_head and self.head_support.get(key, True):
+            head_ok = True
+            if self.soft_not_found is not None:
+                baseline = await self.soft_not_found.baseline(self, url)
+                head_ok = all(status == 404 for status, _, _ in baseline)
+            if head_ok:
+                try:
+                    result = await self.fetch(url, 'HEAD')
+                except self.FETCH_ERRORS:
+                    result = await self.fetch(url)
+                    self.head_support[key] = False
+                    return result
+                if result.status_code in (405, 501):
+                    self.head_support[key] = False
+                elif (result.status_code == 404 or
+                      (self.soft_not_found is None and result.header('content-length') is not None)):
+                    return result
+        return await self.fetch(url)
+        
+    async def run_queue(self, seeds, handler):
+        seeds = iter(seeds)
+        follow_ups = collections.deque()
+        changed = asyncio.Condition()
+        busy = 0
+        
+        def take():
+            """Next item, follow-ups first; None when nothing is waiting"""
+            while follow_ups:
+                for item in follow_ups[0]:
+                    return item
+                follow_ups.popleft()
+            return next(seeds, None)
+            
+        async def worker():
+            nonlocal busy
+            while True:
+                async with changed:
+                    item = take()
+                    # Out of items: wait while busy workers may still hand back follow-ups
+                    while item is None and busy:
+                        await changed.wait()
+                        item = take()
+                    if item is None:
+                        return
+                    busy += 1
+                try:
+                    try:
+                        result = await self.probe(item[0])
+                    except self.FETCH_ERRORS:
+                        self.stats['errors'] += 1
+                        result = None
+                    if (result is not None and result.status_code != 404 and self.soft_not_found is not None and
+                            await self.soft_not_found.matches(self, result)):
+                        self.stats['soft_404'] += 1
+                        result = None
+                    more = handler(item, result)
+                    if more:
+                        follow_ups.append(iter(more))
+                except Exception:
+                    self.stats['errors'] += 1
+                finally:
+                    async with changed:
+                        busy -= 1
+                        changed.notify_all()
+                        
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            for connections in self.idle.values():
+                for _, writer in connections:
+                    writer.close()
+            self.idle.clear()
+            self.host_limits.clear()
+            self.addresses.clear()
+            
+    def run(self, seeds, handler):
+        """Blocking wrapper for module threads"""
+        asyncio.run(self.run_queue(seeds, handler))
+        
+class ResponseCache:
+    """Gzip-compressed on-disk cache for large HTTP response bodies
+    
+    stream(url) yields body chunks - from the cache while an entry is
+    younger than max_age, otherwise from the network while the body is
+    written to the cache. A download that is not read to the end is
+    discarded rather than cached.
+    """
+    CHUNK_SIZE = 65536
+    
+    def __init__(self, cache_dir, max_age=86400, client=None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.client = client or HTTP_CLIENT
+        os.makedirs(cache_dir, exist_ok=True)
+        
+    def path(self, url):
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.gz")
+        
+    def stream(self, url, timeout=60, headers=None):
+        path = self.path(url)
+        try:
+            if time.time() - os.path.getmtime(path) < self.max_age:
+                with gzip.open(path, 'rb') as f:
+                    yield from iter(lambda: f.read(self.CHUNK_SIZE), b'')
+                return
+        except OSError:
+            pass
+            
+        response = self.client.get(url, stream=True, timeout=timeout, headers=headers)
+        tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        complete = False
+        try:
+            if response.status_code != 200:
+                return
+            with gzip.open(tmp_file, 'wb') as f:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            response.close()
+            if complete:
+                os.replace(tmp_file, path)
+            elif os.path.exists(tmp_file):
+                os.remove(tmp_file)
+                
+CT_NAME_PATTERN = re.compile(rb'(?:[a-z0-9_-]+\.)+[a-z][a-z0-9-]*[a-z0-9]')
+# Every byte that cannot appear in a host name becomes a separator
+CT_NAME_SEPARATORS = bytes(c if chr(c).isascii() and (chr(c).isalnum() or chr(c) in '_-.') else 32 for c in range(256))
+
+# Bytes a dump may be cut at: never part of a host name, and never the second
+# byte of a JSON escape, so the literal \n between crt.sh names is not split
+CT_CUT_BYTES = b'",[]{} \t\r\n'
+CT_CUT_PATTERN = re.compile(b'[' + re.escape(CT_CUT_BYTES) + b']')
+
+def _ct_aligned(blocks):
+    """Re-cut a stream of blocks so every piece ends just before a cut byte"""
+    tail = b''
+    for block in blocks:
+        block = tail + block
+        cut = max(block.rfind(CT_CUT_BYTES[i:i + 1]) for i in range(len(CT_CUT_BYTES)))
+        if cut <= 0:
+            # No cut byte at all: names are at most 253 bytes, so this costs one name at worst
+            cut = len(block)
+        yield block[:cut]
+        tail = block[cut:]
+    if tail:
+        yield tail
+        
+def _ct_extract_chunk(job):
+    """Pool worker: reversed-label keys for every name in one piece of a dump
+    
+    The piece is either a byte range of an uncompressed file or data already
+    decompressed by the parent.
+    """
+    path, start, end, data = job
+    keys = set()
+    
+    def scan(data):
+        # Split at C speed, then validate the dotted tokens; the literal \n
+        # escape between crt.sh names must not glue an 'n' onto the next name
+        tokens = data.replace(b'\\n', b' ').translate(CT_NAME_SEPARATORS).lower().split()
+        for token in tokens:
+            if b'.' in token:
+                token = token.strip(b'.')
+                if CT_NAME_PATTERN.fullmatch(token):
+                    keys.add('.'.join(reversed(token.decode('ascii').split('.'))) + '.')
+                    
+    if data is not None:
+        scan(data)
+    else:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = [end - start]
+            
+            def read():
+                block = f.read(min(1 << 22, remaining[0]))
+                remaining[0] -= len(block)
+                return block
+                
+            for piece in _ct_aligned(iter(read, b'')):
+                scan(piece)
+    return path, start, sorted(keys)
+    
+class CTIndex:
+    """SQLite index of certificate names keyed by reversed labels
+    
+    'www.example.com' is stored as 'com.example.www.', so every name under
+    a domain is one contiguous key range. Dumps of any text format (crt.sh
+    JSON, Censys exports, plain lists) are imported by pattern-matching
+    host names out of byte ranges in a process pool; each finished range is
+    recorded, so an interrupted import resumes where it stopped. Ranges are
+    cut at JSON punctuation or whitespace rather than at newlines, so a
+    crt.sh dump that is one long line still spreads over every worker.
+    Gzip dumps cannot be seeked: the parent streams them through the
+    decompressor and hands the pieces to the workers, at most WINDOW
+    pieces per worker in flight.
+    """
+    CHUNK_SIZE = 32 * 1024 * 1024
+    WINDOW = 2
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE IF NOT EXISTS names (rkey TEXT PRIMARY KEY) WITHOUT ROWID')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS imported_chunks (
+                path TEXT,
+                size INTEGER,
+                mtime INTEGER,
+                start INTEGER,
+                PRIMARY KEY (path, size, mtime, start)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+        
+    @staticmethod
+    def reverse_key(domain):
+        return '.'.join(reversed(domain.lower().strip('.').split('.'))) + '.'
+        
+    def names_under(self, domain):
+        """All indexed names equal to or below domain"""
+        prefix = self.reverse_key(domain)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('SELECT rkey FROM names WHERE rkey >= ? AND rkey < ?',
+                                (prefix, prefix[:-1] + '/')).fetchall()
+        finally:
+            conn.close()
+        return ['.'.join(reversed(rkey.rstrip('.').split('.'))) for (rkey,) in rows]
+        
+    def chunks(self, path, size):
+        """(path, start, end, None) ranges of an uncompressed dump, each starting at a cut byte"""
+        starts = [0]
+        with open(path, 'rb') as f:
+            for position in range(self.CHUNK_SIZE, size, self.CHUNK_SIZE):
+                offset = max(position, starts[-1])
+                f.seek(offset)
+                while True:
+                    window = f.read(65536)
+                    match = CT_CUT_PATTERN.search(window)
+                    if match or not window:
+                        break
+                    offset += len(window)
+                if not match:
+                    break
+                if offset + match.start() > starts[-1]:
+                    starts.append(offset + match.start())
+        return [(path, start, end, None) for start, end in zip(starts, starts[1:] + [size])]
+        
+    def gzip_chunks(self, path, done):
+        """(path, offset, end, data) pieces of a gzip dump, offsets counted in decompressed bytes"""
+        with gzip.open(path, 'rb') as f:
+            offset = 0
+            for piece in _ct_aligned(iter(lambda: f.read(self.CHUNK_SIZE), b'')):
+                if offset not in done:
+                    yield (path, offset, offset + len(piece), piece)
+                offset += len(piece)
+                
+
+    def import_dumps(self, paths, workers=None, progress=None):
+        """Import dump files; returns the number of new names"""
+        import multiprocessing
+        
+        conn = sqlite3.connect(self.db_path)
+        jobs = []
+        streams = []
+        for path in paths:
+            path = os.path.realpath(path)
+            stat = os.stat(path)
+            done = {start for (start,) in conn.execute(
+                'SELECT start FROM imported_chunks WHERE path = ? AND size = ? AND mtime = ?',
+                (path, stat.st_size, stat.st_mtime_ns))}
+            if path.endswith('.gz'):
+                streams.append(self.gzip_chunks(path, done))
+            else:
+                jobs.extend(job for job in self.chunks(path, stat.st_size) if job[1] not in done)
+        # Gzip piece counts are only known once decompressed
+        total = None if streams else len(jobs)
+        
+        added = 0
+        workers = workers or os.cpu_count() or 1
+        try:
+            with multiprocessing.Pool(workers) as pool:
+                # apply_async with a bounded window rather than imap: imap's feeder
+                # would decompress whole gzip dumps into the task queue up front
+                def extracted(job_source):
+                    in_flight = collections.deque()
+                    for job in job_source:
+                        in_flight.append(pool.apply_async(_ct_extract_chunk, (job,)))
+                        while in_flight and (len(in_flight) >= workers * self.WINDOW or in_flight[0].ready()):
+                            yield in_flight.popleft().get()
+                    while in_flight:
+                        yield in_flight.popleft().get()
+                        
+                for completed, (path, start, keys) in enumerate(extracted(itertools.chain(jobs, *streams)), 1):
+                    stat = os.stat(path)
+                    before = conn.total_changes
+                    conn.executemany('INSERT OR IGNORE INTO names (rkey) VALUES (?)', ((key,) for key in keys))
+                    added += conn.total_changes - before
+                    # Names and the chunk marker commit together, so a resumed
+                    # import never skips a range whose names were lost
+                    conn.execute('INSERT OR IGNORE INTO imported_chunks VALUES (?, ?, ?, ?)',
+                                 (path, stat.st_size, stat.st_mtime_ns, start))
+                    conn.commit()
+                    if progress:
+                        progress(completed, total, added)
+        finally:
+            conn.close()
+        return added
+        
+PUBLIC_RESOLVERS = ['1.1.1.1', '8.8.8.8', '9.9.9.9', '1.0.0.1', '8.8.4.4']
+
+def system_resolvers(resolv_conf='/etc/resolv.conf'):
+    """Nameservers the system is configured with, as AsyncDNSEngine resolver strings"""
+    nameservers = []
+    try:
+        with open(resolv_conf, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == 'nameserver':
+                    nameservers.append(fields[1])
+    except OSError:
+        pass
+    if not nameservers:
+        # No resolv.conf (e.g. Windows): dnspython knows where else to look
+        try:
+            nameservers = [str(nameserver) for nameserver in dns_resolver.Resolver().nameservers]
+        except Exception:
+            pass
+    return nameservers
+    
+class _ResolverEndpoint(asyncio.DatagramProtocol):
+    """One UDP socket per resolver; replies are matched to queries by DNS id and question
+    
+    Ids are 16 bits and get reused once a query times out, so a reply is only
+    accepted when it also echoes the pending query's name, type and class - a
+    late answer for an earlier query or a spoofed packet is dropped instead of
+    being credited to another name.
+    """
+    RECEIVE_BUFFER = 4 * 1024 * 1024
+    
+    def __init__(self, address, rate_limit):
+        self.address = address
+        self.rate_limit = rate_limit
+        self.tokens = float(rate_limit)
+        self.last_refill = None
+        self.transport = None
+        self.pending = {}
+        
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RECEIVE_BUFFER)
+            except OSError:
+                pass
+                
+    def datagram_received(self, data, addr):
+        if len(data) < 12 or data[4:6] != b'\x00\x01':
+            return
+        query_id = int.from_bytes(data[:2], 'big')
+        pending = self.pending.get(query_id)
+        if pending is None:
+            return
+        future, question = pending
+        # Names compare case-insensitively (resolvers may echo 0x20-mixed case); type and class exactly
+        echoed = data[12:12 + len(question)]
+        if echoed[:-4].lower() != question[:-4].lower() or echoed[-4:] != question[-4:]:
+            return
+        del self.pending[query_id]
+        if not future.done():
+            future.set_result(data)
+            
+    def error_received(self, exc):
+        pass
+        
+    async def acquire(self):
+        """Token bucket: at most rate_limit queries per second to this resolver"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self.last_refill is not None:
+                self.tokens = min(self.rate_limit, self.tokens + (now - self.last_refill) * self.rate_limit)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate_limit)
+            
+    def new_query_id(self):
+        while True:
+            query_id = random.getrandbits(16)
+            if query_id not in self.pending:
+                return query_id
+                
+    @staticmethod
+    def question(wire):
+        """Question section (name, type, class) of a single-question wire message"""
+        end = 12
+        while wire[end]:
+            end += wire[end] + 1
+        return wire[12:end + 5]
+                
+class WildcardFilter:
+    """Detects wildcard zones and drops the names they fake
+    
+    Each zone between a candidate and the apex is probed once with random
+    labels. A zone whose random labels resolve is a wildcard; its answer
+    set (IP pool) and response fingerprint (CNAME targets) are remembered,
+    and any later answer that matches either is discarded in the resolver
+    pipeline, before takeover checks or other follow-up work see it.
+    """
+    PROBES = 3
+    
+    def __init__(self, apex):
+        self.apex = apex.lower().rstrip('.')
+        self.zones = {}
+        self.probing = weakref.WeakKeyDictionary()
+        
+    def parent_zones(self, name):
+        labels = name.lower().rstrip('.').split('.')
+        apex_depth = len(self.apex.split('.'))
+        zones = []
+        for i in range(1, len(labels)):
+            zone = '.'.join(labels[i:])
+            if len(labels) - i < apex_depth:
+                break
+            zones.append(zone)
+            if zone == self.apex or not zone.endswith(f".{self.apex}"):
+                break
+        return zones
+        
+    async def probe(self, zone, engine):
+        labels = [''.join(random.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=16))
+                  for _ in range(self.PROBES)]
+        answers = await asyncio.gather(*(engine.query(f"{label}.{zone}") for label in labels))
+        hits = [answer for answer in answers if answer.resolved]
+        if not hits:
+            return None
+        return {
+            'ips': {ip for answer in hits for ip in answer.records},
+            'cnames': {cname for answer in hits for cname in answer.cnames}
+        }
+        
+    async def fingerprint(self, zone, engine):
+        if zone in self.zones:
+            return self.zones[zone]
+            
+        # In-flight probes are per event loop; engines on other threads share
+        # only the finished fingerprints
+        probing = self.probing.setdefault(asyncio.get_running_loop(), {})
+        if zone not in probing:
+            probing[zone] = asyncio.ensure_future(self.probe(zone, engine))
+        fingerprint = await probing[zone]
+        self.zones[zone] = fingerprint
+        return fingerprint
+        
+    async def is_wildcard(self, answer, engine):
+        for zone in self.parent_zones(answer.name):
+            fingerprint = await self.fingerprint(zone, engine)
+            if not fingerprint:
+                continue
+            if answer.cnames and fingerprint['cnames'] and set(answer.cnames) <= fingerprint['cnames']:
+                return True
+            if set(answer.records) <= fingerprint['ips']:
+                return True
+        return False
+        
+    @property
+    def wildcard_zones(self):
+        return sorted(zone for zone, fingerprint in self.zones.items() if fingerprint)
+        
+class AsyncDNSEngine:
+    """asyncio DNS engine that spreads queries over a set of resolvers
+    
+    Queries go out over one UDP endpoint per resolver, so thousands of
+    lookups can be in flight without a thread each. Every resolver has its
+    own rate limit; timeouts and SERVFAIL/REFUSED answers are retried on the
+    next resolver. Resolvers are given as 'ip' or 'ip:port'.
+    
+    A/AAAA/CNAME lookups - the brute-force hot path - are encoded and decoded
+    directly on the wire format; every other record type goes through
+    dnspython's message API.
+    """
+    RETRY_RCODES = ('SERVFAIL', 'REFUSED')
+    RETRY_PASS_CONCURRENCY = 50
+    RCODES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+    FAST_TYPES = {'A': 1, 'AAAA': 28, 'CNAME': 5}
+    
+    def __init__(self, resolvers, rate_limit=500, concurrency=1000, timeout=2.0, retries=2,
+                 wildcard_filter=None, cache=DNS_CACHE):
+        self.resolvers = [self.parse_resolver(resolver) for resolver in resolvers]
+        self.rate_limit = rate_limit
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.wildcard_filter = wildcard_filter
+        self.cache = cache
+        self.endpoints = []
+        self.stats = {'queries': 0, 'retries': 0, 'timeouts': 0, 'wildcard': 0, 'deferred': 0, 'lost': 0}
+        
+    @staticmethod
+    def parse_resolver(resolver):
+        host, _, port = resolver.rpartition(':') if resolver.count(':') == 1 else (resolver, '', '')
+        return (host, int(port)) if port else (resolver, 53)
+        
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        for address in self.resolvers:
+            _, endpoint = await loop.create_datagram_endpoint(
+                lambda address=address: _ResolverEndpoint(address, self.rate_limit),
+                remote_addr=address)
+            self.endpoints.append(endpoint)
+        self._next_endpoint = itertools.cycle(self.endpoints)
+        
+    def close(self):
+        for endpoint in self.endpoints:
+            if endpoint.transport:
+                endpoint.transport.close()
+        self.endpoints = []
+        
+    @staticmethod
+    def encode_query(name, qtype):
+        """Wire-format question with id 0 and RD set, or None if the name needs dnspython"""
+        try:
+            labels = [label.encode('ascii') for label in name.rstrip('.').split('.')]
+        except UnicodeEncodeError:
+            return None
+        if not all(0 < len(label) < 64 for label in labels) or len(name) > 253:
+            return None
+        qname = b''.join(bytes((len(label),)) + label for label in labels) + b'\x00'
+        return b'\x00\x00\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00' + qname + struct.pack('>HH', qtype, 1)
+        
+    @staticmethod
+    def read_name(data, offset):
+        """Decode a possibly compressed name; returns (name, offset after it)"""
+        labels = []
+        end = None
+        for _ in range(128):
+            length = data[offset]
+            if length >= 0xC0:
+                if end is None:
+                    end = offset + 2
+                offset = ((length & 0x3F) << 8) | data[offset + 1]
+            elif length:
+                labels.append(data[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+                offset += length + 1
+            else:
+                return '.'.join(labels), end if end is not None else offset + 1
+        raise ValueError('DNS name compression loop')
+        
+    def parse_fast(self, data, qtype):
+        """Minimal reply parser for A/AAAA/CNAME: (rcode, records, ttl, cnames)"""
+        rcode = self.RCODES.get(data[3] & 0x0F, str(data[3] & 0x0F))
+        qdcount, ancount = struct.unpack_from('>HH', data, 4)
+        offset = 12
+        for _ in range(qdcount):
+            offset = self.read_name(data, offset)[1] + 4
+            
+        records = []
+        cnames = []
+        ttls = []
+        for _ in range(ancount):
+            offset = self.read_name(data, offset)[1]
+            rtype, _, ttl, rdlength = struct.unpack_from('>HHIH', data, offset)
+            offset += 10
+            rdata = data[offset:offset + rdlength]
+            if rtype == qtype == 1 and rdlength == 4:
+                records.append(socket.inet_ntoa(rdata))
+                ttls.append(ttl)
+            elif rtype == qtype == 28 and rdlength == 16:
+                records.append(socket.inet_ntop(socket.AF_INET6, rdata))
+                ttls.append(ttl)
+            elif rtype == 5:
+                target = self.read_name(data, offset)[0]
+                (records if qtype == 5 else cnames).append(target)
+                ttls.append(ttl)
+            offset += rdlength
+        return rcode, records, min(ttls) if ttls else 0, cnames
+        
+    @staticmethod
+    def parse_message(data, wanted):
+        """dnspython reply parser for every other record type"""
+        reply = dns_message.from_wire(data)
+        records = []
+        cnames = []
+        ttls = []
+        for rrset in reply.answer:
+            if rrset.rdtype == wanted:
+                records.extend(rdata.to_text() for rdata in rrset)
+                ttls.append(rrset.ttl)
+            elif rrset.rdtype == dns_rdatatype.CNAME:
+                cnames.extend(rdata.to_text().rstrip('.') for rdata in rrset)
+                ttls.append(rrset.ttl)
+        return dns_rcode.to_text(reply.rcode()), records, min(ttls) if ttls else 0, cnames
+        
+    async def query(self, name, rdtype='A'):
+        """Resolve one name; never raises, failures come back as rcode TIMEOUT/BADNAME"""
+        if self.cache is not None:
+            cached = self.cache.get(name, rdtype)
+            # A blocking lookup's recent failure is no reason not to ask again here
+            if cached and cached.rcode not in DNSCache.FAILURE_RCODES:
+                return cached
+                
+        loop = asyncio.get_running_loop()
+        qtype = self.FAST_TYPES.get(rdtype)
+        wire = self.encode_query(name, qtype) if qtype else None
+        
+        if wire is None:
+            try:
+                wanted = dns_rdatatype.from_text(rdtype)
+                wire = dns_message.make_query(name, wanted).to_wire()
+            except Exception:
+                return DNSAnswer(name, rdtype, 'BADNAME')
+            qtype = None
+            
+        question = _ResolverEndpoint.question(wire)
+        for attempt in range(self.retries + 1):
+            endpoint = next(self._next_endpoint)
+            await endpoint.acquire()
+            
+            query_id = endpoint.new_query_id()
+            future = loop.create_future()
+            endpoint.pending[query_id] = (future, question)
+            endpoint.transport.sendto(query_id.to_bytes(2, 'big') + wire[2:])
+            self.stats['queries'] += 1
+            if attempt:
+                self.stats['retries'] += 1
+                
+            try:
+                data = await asyncio.wait_for(future, self.timeout)
+                if qtype:
+                    rcode, records, ttl, cnames = self.parse_fast(data, qtype)
+                else:
+                    rcode, records, ttl, cnames = self.parse_message(data, wanted)
+            except asyncio.TimeoutError:
+                endpoint.pending.pop(query_id, None)
+                self.stats['timeouts'] += 1
+                continue
+            except Exception:
+                continue
+                
+            if rcode in self.RETRY_RCODES:
+                continue
+                
+            answer = DNSAnswer(name, rdtype, rcode, records, ttl, cnames,
+                               f"{endpoint.address[0]}:{endpoint.address[1]}")
+            if self.cache is not None:
+                self.cache.put(answer)
+            return answer
+            
+        return DNSAnswer(name, rdtype, 'TIMEOUT')
+        
+    async def resolve_stream(self, names, rdtype='A'):
+        """Async generator yielding a DNSAnswer per name as replies arrive
+        
+        names may be any iterable, including a lazy generator - it is only
+        pulled as fast as workers free up, so huge candidate sets never sit
+        in memory. Items may also be (name, rdtype) pairs to mix record
+        types in one batch.
+        
+        Names that time out on every resolver during the main pass - usually
+        replies dropped in a burst - are set aside and tried once more at
+        RETRY_PASS_CONCURRENCY after it drains. Only names that fail that
+        pass too come back as TIMEOUT, counted in stats['lost'].
+        """
+        if not self.endpoints:
+            await self.open()
+            
+        names = iter(names)
+        results = asyncio.Queue(maxsize=self.concurrency)
+        finished = object()
+        
+        deferred = []
+        
+        async def worker(source, final):
+            for name in source:
+                if isinstance(name, tuple):
+                    answer = await self.query(*name)
+                else:
+                    answer = await self.query(name, rdtype)
+                if answer.rcode == 'TIMEOUT':
+                    if not final:
+                        deferred.append(name)
+                        self.stats['deferred'] += 1
+                        continue
+                    self.stats['lost'] += 1
+                if (answer.resolved and self.wildcard_filter and answer.rdtype in ('A', 'AAAA')
+                        and await self.wildcard_filter.is_wildcard(answer, self)):
+                    answer.rcode = 'WILDCARD'
+                    self.stats['wildcard'] += 1
+                await results.put(answer)
+                
+        async def supervise():
+            try:
+                await asyncio.gather(*workers)
+                if deferred:
+                    retry = iter(deferred)
+                    await asyncio.gather(*(worker(retry, True)
+                                           for _ in range(min(len(deferred), self.RETRY_PASS_CONCURRENCY))))
+            finally:
+                await results.put(finished)
+                
+        workers = [asyncio.ensure_future(worker(names, False)) for _ in range(self.concurrency)]
+        supervisor = asyncio.ensure_future(supervise())
+        
+        try:
+            while True:
+                answer = await results.get()
+                if answer is finished:
+                    break
+                yield answer
+            supervisor.result()
+        finally:
+            for task in workers + [supervisor]:
+                task.cancel()
+                
+    def resolve_all(self, names, rdtype='A', callback=None):
+        """Blocking wrapper for thread-pool callers
+        
+        Runs a private event loop; callback(answer) is invoked for every
+        answer as it arrives. Returns the list of resolved answers.
+        """
+        async def run():
+            resolved = []
+            try:
+                async for answer in self.resolve_stream(names, rdtype):
+                    if callback:
+                        callback(answer)
+                    if answer.resolved:
+                        resolved.append(answer)
+            finally:
+                self.close()
+            return resolved
+            
+        return asyncio.run(run())
+        
+class _ProbeProtocol(asyncio.Protocol):
+    """Buffers whatever a probed service sends back"""
+    def __init__(self):
+        self.buffer = bytearray()
+        self.closed = False
+        self.waiter = None
+        
+    def connection_made(self, transport):
+        self.transport = transport
+        
+    def wake(self):
+        if self.waiter and not self.waiter.done():
+            self.waiter.set_result(None)
+            
+    def data_received(self, data):
+        self.buffer += data
+        self.wake()
+        
+    def eof_received(self):
+        self.closed = True
+        self.wake()
+        
+    def connection_lost(self, exc):
+        self.closed = True
+        self.wake()
+        
+    async def read(self, timeout, linger=0.3, limit=4096):
+        """Wait up to timeout for a reply, then up to linger for the rest of it"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while len(self.buffer) < limit and not self.closed:
+            if self.buffer:
+                deadline = min(deadline, loop.time() + linger)
+                if b'\r\n\r\n' in self.buffer:
+                    break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self.waiter = loop.create_future()
+            timer = loop.call_later(remaining, self.wake)
+            try:
+                await self.waiter
+            finally:
+                timer.cancel()
+                self.waiter = None
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+        
+class ServiceProber:
+    """Probe pipeline run on the connection that found a port open
+    
+    TLS ports get a TLS handshake first (certificate names, protocol and
+    cipher are recorded), web ports an HTTP request, and everything else
+    the null probe - waiting for a server-first greeting - followed by an
+    HTTP request on the same connection if the service stays silent.
+    """
+    TLS_PORTS = {443, 465, 563, 636, 853, 989, 990, 992, 993, 994, 995, 2376, 2379, 4443, 5061,
+                 5986, 6443, 8443, 8883, 9443, 10250}
+    HTTP_PORTS = {80, 81, 591, 2375, 3000, 3001, 4000, 5000, 5001, 5601, 7000, 7001, 8000, 8001, 8008,
+                  8009, 8010, 8080, 8081, 8082, 8083, 8088, 8089, 8090, 8091, 8092, 8888, 9000, 9001,
+                  9090, 9200, 10255}
+    # TLS services that greet first instead of waiting for a request
+    SERVER_FIRST_TLS_PORTS = {465, 563, 636, 989, 990, 992, 993, 994, 995, 5061}
+    
+    def __init__(self, server_names=None, timeout=5.0, null_timeout=2.0):
+        self.server_names = server_names or {}
+        self.timeout = timeout
+        self.null_timeout = null_timeout
+        self.tls_context = ssl.create_default_context()
+        self.tls_context.check_hostname = False
+        self.tls_context.verify_mode = ssl.CERT_NONE
+        try:
+            # Old and weak servers are exactly the ones worth identifying
+            self.tls_context.minimum_version = ssl.TLSVersion.TLSv1
+            self.tls_context.set_ciphers('ALL:@SECLEVEL=0')
+        except (ValueError, ssl.SSLError):
+            pass
+            
+    def http_request(self, host):
+        return (f"GET / HTTP/1.1\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\n"
+                f"Accept: */*\r\nConnection: close\r\n\r\n").encode()
+                
+    async def run(self, sock, host, port):
+        """Probe an already connected socket; returns {'banner', 'tls', 'probes'}"""
+        loop = asyncio.get_running_loop()
+        server_name = self.server_names.get(host, host)
+        result = {'banner': '', 'tls': None, 'probes': []}
+        transport, protocol = await loop.create_connection(_ProbeProtocol, sock=sock)
+        try:
+            if port in self.TLS_PORTS:
+                result['probes'].append('tls')
+                sni = None if re.match(r'^[\d.:]+$', server_name) else server_name
+                transport = await loop.start_tls(transport, protocol, self.tls_context, server_hostname=sni,
+                                                 ssl_handshake_timeout=self.timeout)
+                result['tls'] = self.tls_details(transport.get_extra_info('ssl_object'))
+                
+            if port in self.HTTP_PORTS or (result['tls'] and port not in self.SERVER_FIRST_TLS_PORTS):
+                data = b''
+            else:
+                result['probes'].append('null')
+                data = await protocol.read(self.null_timeout)
+                
+            if not data and not protocol.closed:
+                result['probes'].append('http')
+                transport.write(self.http_request(server_name))
+                data = await protocol.read(self.timeout)
+                
+            result['banner'] = data[:2048].decode('utf-8', errors='ignore').strip()
+        except (OSError, ssl.SSLError, asyncio.TimeoutError):
+            pass
+        finally:
+            transport.close()
+        return result
+        
+    @staticmethod
+    def der_length(data, offset):
+        length = data[offset]
+        if length < 0x80:
+            return length, offset + 1
+        count = length & 0x7F
+        return int.from_bytes(data[offset + 1:offset + 1 + count], 'big'), offset + 1 + count
+        
+    @classmethod
+    def certificate_names(cls, der):
+        """(subject CN, DNS SANs) pulled straight from a DER certificate"""
+        common_name = None
+        # Subject follows issuer, so the last commonName is the subject's
+        for match in re.finditer(rb'\x06\x03\x55\x04\x03[\x0c\x13\x16]', der):
+            length, start = cls.der_length(der, match.end())
+            common_name = der[start:start + length].decode('utf-8', 'ignore')
+            
+        names = []
+        match = re.search(rb'\x06\x03\x55\x1d\x11', der)
+        if match:
+            offset = match.end()
+            if der[offset] == 0x01:
+                offset += 3
+            if der[offset] == 0x04:
+                _, offset = cls.der_length(der, offset + 1)
+                length, offset = cls.der_length(der, offset + 1)
+                end = offset + length
+                while offset < end:
+                    tag = der[offset]
+                    length, offset = cls.der_length(der, offset + 1)
+                    if tag == 0x82:
+                        names.append(der[offset:offset + length].decode('ascii', 'ignore'))
+                    offset += length
+        return common_name, names
+        
+    @classmethod
+    def tls_details(cls, ssl_object):
+        if ssl_object is None:
+            return None
+        details = {'version': ssl_object.version(), 'cipher': (ssl_object.cipher() or [None])[0]}
+        der = ssl_object.getpeercert(binary_form=True)
+        if der:
+            try:
+                details['subject_cn'], details['san'] = cls.certificate_names(der)
+            except IndexError:
+                pass
+            details['sha256'] = hashlib.sha256(der).hexdigest()
+        return details
+        
+class AsyncPortScanner:
+    """asyncio TCP connect scanner
+    
+    Connections are opened on non-blocking sockets straight from the event
+    loop; a semaphore caps how many are in flight. The connect timeout of
+    each host follows its measured round-trip time (smoothed RTT plus four
+    deviations, as in TCP's own retransmission timer), so responsive hosts
+    are scanned with short timeouts and slow links get longer ones. Refused
+    connections count as RTT samples too. Only a refusal (RST) makes a port
+    closed; ports that never answered, or whose SYN came back unreachable or
+    prohibited, are filtered and kept per host in self.filtered.
+    
+    Ports are given as a profile name (PROFILES) or a spec like
+    '22,80,8000-8100'. With a ServiceProber, each open port is probed on the
+    connection that found it open.
+    """
+    PROFILES = {
+        # nmap's most frequently open TCP ports (nmap-services frequencies)
+        'top-100': (
+            '7,9,13,21-23,25-26,37,53,79-81,88,106,110-111,113,119,135,139,143-144,179,199,389,427,443-445,'
+            '465,513-515,543-544,548,554,587,631,646,873,990,993,995,1025-1029,1110,1433,1720,1723,1755,1900,'
+            '2000-2001,2049,2121,2717,3000,3128,3306,3389,3986,4899,5000,5009,5051,5060,5101,5190,5357,5432,'
+            '5631,5666,5800,5900,6000-6001,6646,7070,8000,8008-8009,8080-8081,8443,8888,9100,9999-10000,32768,'
+            '49152-49157'
+        ),
+        'top-1000': (
+            '1,3-4,6-7,9,13,17,19-26,30,32-33,37,42-43,49,53,70,79-85,88-90,99-100,106,109-111,113,119,125,'
+            '135,139,143-144,146,161,163,179,199,211-212,222,254-256,259,264,280,301,306,311,340,366,389,'
+            '406-407,416-417,425,427,443-445,458,464-465,481,497,500,512-515,524,541,543-545,548,554-555,563,'
+            '587,593,616-617,625,631,636,646,648,666-668,683,687,691,700,705,711,714,720,722,726,749,765,777,'
+            '783,787,800-801,808,843,873,880,888,898,900-903,911-912,981,987,990,992-993,995,999-1002,1007,'
+            '1009-1011,1021-1100,1102,1104-1108,1110-1114,1117,1119,1121-1124,1126,1130-1132,1137-1138,1141,'
+            '1145,1147-1149,1151-1152,1154,1163-1166,1169,1174-1175,1183,1185-1187,1192,1198-1199,1201,1213,'
+            '1216-1218,1233-1234,1236,1244,1247-1248,1259,1271-1272,1277,1287,1296,1300-1301,1309-1311,1322,'
+            '1328,1334,1352,1417,1433-1434,1443,1455,1461,1494,1500-1501,1503,1521,1524,1533,1556,1580,1583,'
+            '1594,1600,1641,1658,1666,1687-1688,1700,1717-1721,1723,1755,1761,1782-1783,1801,1805,1812,'
+            '1839-1840,1862-1864,1875,1900,1914,1935,1947,1971-1972,1974,1984,1998-2010,2013,2020-2022,2030,'
+            '2033-2035,2038,2040-2043,2045-2049,2065,2068,2099-2100,2103,2105-2107,2111,2119,2121,2126,2135,'
+            '2144,2160-2161,2170,2179,2190-2191,2196,2200,2222,2251,2260,2288,2301,2323,2366,2381-2383,'
+            '2393-2394,2399,2401,2492,2500,2522,2525,2557,2601-2602,2604-2605,2607-2608,2638,2701-2702,2710,'
+            '2717-2718,2725,2800,2809,2811,2869,2875,2909-2910,2920,2967-2968,2998,3000-3001,3003,3005-3007,'
+            '3011,3013,3017,3030-3031,3052,3071,3077,3128,3168,3211,3221,3260-3261,3268-3269,3283,3300-3301,'
+            '3306,3322-3325,3333,3351,3367,3369-3372,3389-3390,3404,3476,3493,3517,3527,3546,3551,3580,3659,'
+            '3689-3690,3703,3737,3766,3784,3800-3801,3809,3814,3826-3828,3851,3869,3871,3878,3880,3889,3905,'
+            '3914,3918,3920,3945,3971,3986,3995,3998,4000-4006,4045,4111,4125-4126,4129,4224,4242,4279,4321,'
+            '4343,4443-4446,4449,4550,4567,4662,4848,4899-4900,4998,5000-5004,5009,5030,5033,5050-5051,5054,'
+            '5060-5061,5080,5087,5100-5102,5120,5190,5200,5214,5221-5222,5225-5226,5269,5280,5298,5357,5405,'
+            '5414,5431-5432,5440,5500,5510,5544,5550,5555,5560,5566,5631,5633,5666,5678-5679,5718,5730,'
+            '5800-5802,5810-5811,5815,5822,5825,5850,5859,5862,5877,5900-5904,5906-5907,5910-5911,5915,5922,'
+            '5925,5950,5952,5959-5963,5987-5989,5998-6007,6009,6025,6059,6100-6101,6106,6112,6123,6129,6156,'
+            '6346,6389,6502,6510,6543,6547,6565-6567,6580,6646,6666-6669,6689,6692,6699,6779,6788-6789,6792,'
+            '6839,6881,6901,6969,7000-7002,7004,7007,7019,7025,7070,7100,7103,7106,7200-7201,7402,7435,7443,'
+            '7496,7512,7625,7627,7676,7741,7777-7778,7800,7911,7920-7921,7937-7938,7999-8002,8007-8011,'
+            '8021-8022,8031,8042,8045,8080-8090,8093,8099-8100,8180-8181,8192-8194,8200,8222,8254,8290-8292,'
+            '8300,8333,8383,8400,8402,8443,8500,8600,8649,8651-8652,8654,8701,8800,8873,8888,8899,8994,'
+            '9000-9003,9009-9011,9040,9050,9071,9080-9081,9090-9091,9099-9103,9110-9111,9200,9207,9220,9290,'
+            '9415,9418,9485,9500,9502-9503,9535,9575,9593-9595,9618,9666,9876-9878,9898,9900,9917,9929,'
+            '9943-9944,9968,9998-10004,10009-10010,10012,10024-10025,10082,10180,10215,10243,10566,'
+            '10616-10617,10621,10626,10628-10629,10778,11110-11111,11967,12000,12174,12265,12345,13456,13722,'
+            '13782-13783,14000,14238,14441-14442,15000,15002-15004,15660,15742,16000-16001,16012,16016,16018,'
+            '16080,16113,16992-16993,17877,17988,18040,18101,18988,19101,19283,19315,19350,19780,19801,19842,'
+            '20000,20005,20031,20221-20222,20828,21571,22939,23502,24444,24800,25734-25735,26214,27000,'
+            '27352-27353,27355-27356,27715,28201,30000,30718,30951,31038,31337,32768-32785,33354,33899,'
+            '34571-34573,35500,38292,40193,40911,41511,42510,44176,44442-44443,44501,45100,48080,49152-49161,'
+            '49163,49165,49167,49175-49176,49400,49999-50003,50006,50300,50389,50500,50636,50800,51103,51493,'
+            '52673,52822,52848,52869,54045,54328,55055-55056,55555,55600,56737-56738,57294,57797,58080,60020,'
+            '60443,61532,61900,62078,63331,64623,64680,65000,65129,65389'
+        ),
+        'full': '1-65535',
+        'default': (
+            '21-23,25,53,69,80,88,110-111,123,135,137-139,143,161-162,389,443,445,464,514-515,548,554,631,636,'
+            '749,993,995,1433,1521,1723,1900,2181,2379,3000-3001,3268,3306,3389,4000-4001,5000-5001,5060-5061,'
+            '5353,5432,5601,5900,5985-5986,6379,6443,7000-7001,8000-8001,8008-8010,8080-8083,8089-8092,8443,'
+            '8888,9000-9001,9090,9200,9300,9999,10000,10250-10252,10255,11211,27017,50000'
+        )
+    }
+    
+    def __init__(self, concurrency=1000, initial_timeout=1.0, min_timeout=0.05, max_timeout=3.0, retries=1,
+                 prober=None):
+        self.concurrency = self.clamp_concurrency(concurrency)
+        self.prober = prober
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.retries = retries
+        self.rtt = {}
+        self.filtered = {}
+        self.stats = {'probes': 0, 'open': 0, 'closed': 0, 'filtered': 0}
+        
+    @staticmethod
+    def clamp_concurrency(concurrency):
+        """Keep in-flight sockets safely below the open file limit"""
+        try:
+            import resource
+            soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        except (ImportError, ValueError, OSError):
+            return concurrency
+        if soft_limit == resource.RLIM_INFINITY:
+            return concurrency
+        return max(1, min(concurrency, soft_limit - 128))
+        
+    @classmethod
+    def parse_ports(cls, spec):
+        """Profile name or '22,80,8000-8100' -> sorted list of unique ports"""
+        spec = cls.PROFILES.get(spec, spec)
+        ports = set()
+        for part in str(spec).split(','):
+            part = part.strip()
+            if not part:
+                continue
+            low, _, high = part.partition('-')
+            low, high = int(low), int(high or low)
+            if not 1 <= low <= high <= 65535:
+                raise ValueError(f"invalid port range: {part}")
+            ports.update(range(low, high + 1))
+        return sorted(ports)
+        
+    def timeout_for(self, host):
+        estimate = self.rtt.get(host)
+        if not estimate:
+            return self.initial_timeout
+        srtt, rttvar = estimate
+        return min(self.max_timeout, max(self.min_timeout, srtt + 4 * rttvar))
+        
+    def record_rtt(self, host, sample):
+        estimate = self.rtt.get(host)
+        if not estimate:
+            self.rtt[host] = (sample, sample / 2)
+        else:
+            srtt, rttvar = estimate
+            rttvar = 0.75 * rttvar + 0.25 * abs(srtt - sample)
+            self.rtt[host] = (0.875 * srtt + 0.125 * sample, rttvar)
+            
+    @staticmethod
+    async def connect(sock, address, timeout):
+        """Non-blocking connect; returns the errno (0 = connected) or None on timeout
+        
+        A writer callback plus a call_later timer costs far less per port than
+        loop.sock_connect wrapped in asyncio.wait_for.
+        """
+        error = sock.connect_ex(address)
+        if error not in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+            return error
+            
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        fd = sock.fileno()
+        loop.add_writer(fd, lambda: waiter.done() or waiter.set_result(True))
+        timer = loop.call_later(timeout, lambda: waiter.done() or waiter.set_result(False))
+        try:
+            ready = await waiter
+        finally:
+            timer.cancel()
+            loop.remove_writer(fd)
+        return sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) if ready else None
+        
+    async def probe(self, address, family, host, port):
+        """('open' | 'closed' | 'filtered', service probe result or None) for one port"""
+        loop = asyncio.get_running_loop()
+        for _ in range(self.retries + 1):
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            started = loop.time()
+            self.stats['probes'] += 1
+            try:
+                error = await self.connect(sock, (address, port), self.timeout_for(host))
+                if error is None:
+                    continue
+                if error in (0, errno.ECONNREFUSED):
+                    self.record_rtt(host, loop.time() - started)
+                if error == errno.ECONNREFUSED:
+                    return 'closed', None
+                if error:
+                    # EHOSTUNREACH, ENETUNREACH, EACCES, EPERM...: an ICMP
+                    # unreachable/prohibited or a local firewall stopped the
+                    # SYN, so the port itself never answered
+                    return 'filtered', None
+                if self.prober:
+                    return 'open', await self.prober.run(sock, host, port)
+                return 'open', None
+            except OSError as exc:
+                return ('closed' if exc.errno == errno.ECONNREFUSED else 'filtered'), None
+            finally:
+                sock.close()
+        return 'filtered', None
+        
+    async def scan_host(self, host, ports, callback=None, semaphore=None):
+        """Scan ports of one host; callback(host, port, probe) fires as each open port is found"""
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            return []
+        family, _, _, _, sockaddr = infos[0]
+        address = sockaddr[0]
+        
+        semaphore = semaphore or asyncio.Semaphore(self.concurrency)
+        open_ports = []
+        
+        async def check(port):
+            try:
+                state, probe = await self.probe(address, family, host, port)
+                self.stats[state] += 1
+                if state == 'open':
+                    open_ports.append(port)
+                    if callback:
+                        callback(host, port, probe)
+                elif state == 'filtered':
+                    self.filtered.setdefault(host, set()).add(port)
+            finally:
+                semaphore.release()
+                
+        tasks = set()
+        for port in self.parse_ports(ports) if isinstance(ports, str) else ports:
+            await semaphore.acquire()
+            task = asyncio.ensure_future(check(port))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        return sorted(open_ports)
+        
+    async def scan_hosts(self, hosts, ports, callback=None):
+        """Scan several hosts at once under one shared concurrency limit
+        
+        ports may also be a {host: ports} plan giving each host its own list.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        if isinstance(ports, dict):
+            plan = ports
+        else:
+            ports = self.parse_ports(ports) if isinstance(ports, str) else ports
+            plan = dict.fromkeys(hosts, ports)
+        results = await asyncio.gather(*(self.scan_host(host, plan[host], callback, semaphore) for host in hosts))
+        return dict(zip(hosts, results))
+        
+    def scan(self, host, ports, callback=None):
+        """Blocking wrapper for thread-pool callers; returns the open ports"""
+        return asyncio.run(self.scan_host(host, ports, callback))
+        
+    def scan_many(self, hosts, ports, callback=None):
+        """Blocking wrapper around scan_hosts; returns {host: open ports}"""
+        return asyncio.run(self.scan_hosts(list(hosts), ports, callback))
+        
+class PortStateStore:
+    """Last-seen state of every probed (ip, port), kept in the workspace
+    
+    Drives incremental re-scans: ports that were open last time are always
+    probed first, ports never probed are always probed, and ports last seen
+    closed or filtered are sampled by how long ago they were probed
+    (STALENESS). Banners are stored as a digest of their stable parts so a
+    change of software is noticed but a new Date header, or the clock and
+    queue ids in an SMTP, FTP or POP greeting, is not.
+    """
+    # (minimum seconds since last probe, fraction of such closed ports re-probed)
+    STALENESS = ((0, 0.02), (86400, 0.1), (7 * 86400, 1.0))
+    MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+    # Dates, times, zone offsets, timestamps/pids/queue ids and APOP challenges
+    BANNER_NOISE = re.compile('|'.join([
+        rf'\b\d{{1,2}}[ /-]{MONTH}[ /-]\d{{2,4}}\b',
+        rf'\b{MONTH}\s+\d{{1,2}}\b(?:,?\s+\d{{4}}\b)?',
+        r'\b\d{4}[-/]\d{1,2}[-/]\d{1,2}(?:t(?=\d))?',
+        r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b',
+        r'\b(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\b,?',
+        r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\.\d+)?(?:\s*[ap]m\b)?',
+        r'[+-]\d{4}\b',
+        r'\d{5,}',
+        r'<[^<>\s@]+@[^<>\s]+>'
+    ]), re.IGNORECASE)
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS port_state (
+                ip TEXT,
+                port INTEGER,
+                state TEXT,
+                banner_hash TEXT,
+                last_seen REAL,
+                last_changed REAL,
+                PRIMARY KEY (ip, port)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+        
+    @staticmethod
+    def banner_digest(banner):
+        """Digest of a banner without per-response noise (HTTP keeps the status line and Server header)"""
+        if not banner:
+            return None
+        if banner.startswith('HTTP/'):
+            lines = banner.split('\r\n')
+            banner = '\n'.join([lines[0]] + [line for line in lines[1:] if line.lower().startswith('server:')])
+        banner = ' '.join(PortStateStore.BANNER_NOISE.sub(' ', banner).split())
+        return hashlib.sha256(banner.encode('utf-8', 'ignore')).hexdigest()[:16]
+        
+    def states(self, ip):
+        """{port: (state, banner_hash, last_seen)} for one IP"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('SELECT port, state, banner_hash, last_seen FROM port_state WHERE ip = ?',
+                                (ip,)).fetchall()
+        finally:
+            conn.close()
+        return {port: (state, banner_hash, last_seen) for port, state, banner_hash, last_seen in rows}
+        
+    def plan(self, ports, known, staleness=None, now=None):
+        """Ports to probe this run, known-open first, then unseen, then sampled closed/filtered ones"""
+        staleness = sorted(staleness or self.STALENESS)
+        now = now or time.time()
+        known_open, unseen, sampled = [], [], []
+        for port in ports:
+            entry = known.get(port)
+            if entry is None:
+                unseen.append(port)
+            elif entry[0] == 'open':
+                known_open.append(port)
+            else:
+                age = now - entry[2]
+                fraction = 0
+                for min_age, rule_fraction in staleness:
+                    if age >= min_age:
+                        fraction = rule_fraction
+                if fraction >= 1 or random.random() < fraction:
+                    sampled.append(port)
+        return known_open + unseen + sampled
+        
+    @staticmethod
+    def port_state(port, open_banners, filtered):
+        """State to store for a probed port"""
+        if port in open_banners:
+            return 'open'
+        return 'filtered' if port in filtered else 'closed'
+        
+    def record(self, ip, probed, open_banners, filtered=(), now=None):
+        """Store the outcome of probing `probed` ports
+        
+        open_banners maps open port -> banner; filtered holds the ports that
+        never answered. Everything else probed is stored as closed.
+        """
+        now = now or time.time()
+        rows = [(ip, port, self.port_state(port, open_banners, filtered),
+                 self.banner_digest(open_banners.get(port)), now, now) for port in probed]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany('''
+                INSERT INTO port_state (ip, port, state, banner_hash, last_seen, last_changed)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (ip, port) DO UPDATE SET
+                    last_changed = CASE WHEN state != excluded.state OR banner_hash IS NOT excluded.banner_hash
+                                        THEN excluded.last_changed ELSE last_changed END,
+                    state = excluded.state,
+                    banner_hash = excluded.banner_hash,
+                    last_seen = excluded.last_seen
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
+            
+
+# Built-in signatures in nmap-service-probes syntax:
+#   match|softmatch <service> m<d><regex><d>[i][s] [p/product/] [v/version/] [i/info/] [cpe:/cpe/]
+# $1..$9 refer to regex groups. The first hard match wins; a softmatch only
+# names the service and is kept in case nothing more specific matches.
+BUILTIN_FINGERPRINTS = r'''
+match SSH m|^SSH-([\d.]+)-OpenSSH_([\w.]+)(?:\s+(.*))?| p/OpenSSH/ v/$2/ i/protocol $1; $3/ cpe:/a:openbsd:openssh:$2/
+match SSH m|^SSH-([\d.]+)-dropbear_([\w.]+)| p/Dropbear sshd/ v/$2/ i/protocol $1/ cpe:/a:matt_johnston:dropbear_ssh_server:$2/
+match SSH m|^SSH-([\d.]+)-libssh[_-]([\w.]+)| p/libssh/ v/$2/ i/protocol $1/ cpe:/a:libssh:libssh:$2/
+match SSH m|^SSH-([\d.]+)-Cisco-([\w.]+)| p/Cisco SSH/ v/$2/ i/protocol $1/
+softmatch SSH m|^SSH-([\d.]+)-|
+match FTP m|^220[- ].*\(vsFTPd ([\w.]+)\)|s p/vsftpd/ v/$1/ cpe:/a:beasts:vsftpd:$1/
+match FTP m|^220[- ].*ProFTPD ([\w.]+)|s p/ProFTPD/ v/$1/ cpe:/a:proftpd:proftpd:$1/
+match FTP m|^220[- ].*Pure-FTPd|s p/Pure-FTPd/ cpe:/a:pureftpd:pure-ftpd/
+match FTP m|^220[- ].*FileZilla Server(?: version)? ([\w.]+)|s p/FileZilla ftpd/ v/$1/ cpe:/a:filezilla-project:filezilla_server:$1/
+match FTP m|^220[- ].*Microsoft FTP Service|s p/Microsoft ftpd/ cpe:/a:microsoft:ftp_service/
+softmatch FTP m|^220[- ].*FTP|is
+match SMTP m|^220[- ]\S+ ESMTP Postfix(?: \(([^)]+)\))?| p/Postfix smtpd/ i/$1/ cpe:/a:postfix:postfix/
+match SMTP m|^220[- ]\S+ ESMTP Exim ([\w.]+)| p/Exim smtpd/ v/$1/ cpe:/a:exim:exim:$1/
+match SMTP m|^220[- ]\S+ ESMTP Sendmail ([\w.]+)| p/Sendmail/ v/$1/ cpe:/a:sendmail:sendmail:$1/
+match SMTP m|^220[- ]\S+ Microsoft ESMTP MAIL Service(?:, Version: ([\w.]+))?| p/Microsoft ESMTP/ v/$1/ cpe:/a:microsoft:exchange_server/
+softmatch SMTP m|^220[- ].*SMTP|is
+match POP3 m|^\+OK Dovecot| p/Dovecot pop3d/ cpe:/a:dovecot:dovecot/
+match IMAP m|^\* OK (?:\[.*\] )?Dovecot| p/Dovecot imapd/ cpe:/a:dovecot:dovecot/
+match IMAP m|^\* OK .*Courier-IMAP| p/Courier imapd/ cpe:/a:courier-mta:courier-imap/
+softmatch POP3 m|^\+OK |
+softmatch IMAP m|^\* OK |
+match MySQL m|^.\x00\x00\x00\x0a([\d.]+)-MariaDB|s p/MariaDB/ v/$1/ cpe:/a:mariadb:mariadb:$1/
+match MySQL m|^.\x00\x00\x00\x0a([\d.]+[\w.-]*)\x00|s p/MySQL/ v/$1/ cpe:/a:mysql:mysql:$1/
+match MySQL m|^.\x00\x00\x00\xffj\x04Host '.*' is not allowed to connect|s p/MySQL/ i/unauthorized host/ cpe:/a:mysql:mysql/
+match Redis m|redis_version:([\d.]+)| p/Redis/ v/$1/ cpe:/a:redis:redis:$1/
+match Redis m=^-(?:NOAUTH|ERR) =s p/Redis/ cpe:/a:redis:redis/
+match Memcached m|^VERSION ([\d.]+)| p/Memcached/ v/$1/ cpe:/a:memcached:memcached:$1/
+match VNC m|^RFB 0*(\d+)\.0*(\d+)| p/VNC/ v/$1.$2/ i/protocol/
+match Telnet m|^\xff[\xfb-\xfe]|s p/Telnet/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Apache/([\d.]+)(?: \(([^)\r\n]+)\))?|s p/Apache/ v/$1/ i/$2/ cpe:/a:apache:http_server:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Apache\r\n|s p/Apache/ cpe:/a:apache:http_server/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: nginx/([\d.]+)|s p/nginx/ v/$1/ cpe:/a:igor_sysoev:nginx:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: nginx\r\n|s p/nginx/ cpe:/a:igor_sysoev:nginx/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: openresty/([\d.]+)|s p/OpenResty/ v/$1/ cpe:/a:openresty:openresty:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Microsoft-IIS/([\d.]+)|s p/Microsoft IIS/ v/$1/ cpe:/a:microsoft:internet_information_services:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: lighttpd/([\d.]+)|s p/lighttpd/ v/$1/ cpe:/a:lighttpd:lighttpd:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: LiteSpeed|s p/LiteSpeed/ cpe:/a:litespeedtech:litespeed_web_server/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Caddy|s p/Caddy/ cpe:/a:caddyserver:caddy/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Jetty\(([\w.-]+)\)|s p/Jetty/ v/$1/ cpe:/a:eclipse:jetty:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Apache-Coyote/([\d.]+)|s p/Apache Tomcat/ i/Coyote $1/ cpe:/a:apache:tomcat/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: cloudflare|s p/Cloudflare proxy/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: AmazonS3|s p/Amazon S3/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: gunicorn(?:/([\d.]+))?|s p/gunicorn/ v/$1/ cpe:/a:gunicorn:gunicorn:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: Werkzeug/([\d.]+)|s p/Werkzeug httpd/ v/$1/ cpe:/a:palletsprojects:werkzeug:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nServer: SimpleHTTP/([\d.]+) Python/([\d.]+)|s p/SimpleHTTPServer/ v/$1/ i/Python $2/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*"cluster_name" : ".*"number" : "([\d.]+)"|s p/Elasticsearch REST API/ v/$1/ cpe:/a:elastic:elasticsearch:$1/
+match HTTP m|^HTTP/1\.[01] \d\d\d.*\r\nkbn-name: |s p/Kibana/ cpe:/a:elastic:kibana/
+softmatch HTTP m|^HTTP/1\.[01] \d\d\d|
+match PostgreSQL m|PostgreSQL (\d+\.\d+)| p/PostgreSQL/ v/$1/ cpe:/a:postgresql:postgresql:$1/
+match MongoDB m|MongoDB (\d+\.\d+\.\d+)| p/MongoDB/ v/$1/ cpe:/a:mongodb:mongodb:$1/
+'''
+
+SERVICE_PORTS = {
+    21: 'FTP', 22: 'SSH', 23: 'Telnet', 25: 'SMTP', 53: 'DNS', 80: 'HTTP',
+    110: 'POP3', 143: 'IMAP', 443: 'HTTPS', 993: 'IMAPS', 995: 'POP3S',
+    3306: 'MySQL', 3389: 'RDP', 5432: 'PostgreSQL', 6379: 'Redis',
+    27017: 'MongoDB', 11211: 'Memcached', 389: 'LDAP', 636: 'LDAPS',
+    1433: 'MSSQL', 1521: 'Oracle', 8080: 'HTTP-Alt', 8443: 'HTTPS-Alt',
+    9200: 'Elasticsearch', 5601: 'Kibana', 2181: 'Zookeeper', 6443: 'Kubernetes',
+    9300: 'Elasticsearch-Transport', 4001: 'etcd', 2379: 'etcd-client'
+}
+
+# Checked against every open service. 'product' + 'below' compare parsed
+# version tuples (so 7.10 sorts after 7.4); 'ports' and a 'banner' regex
+# narrow a rule further. Descriptions may use {port}, {banner}, {product}
+# and {version}.
+SERVICE_VULN_RULES = [
+    {'product': 'OpenSSH', 'below': (7, 4), 'type': 'Outdated SSH Version', 'severity': 'Medium',
+     'description': 'Outdated OpenSSH version: {banner}', 'recommendation': 'Update to OpenSSH 7.4 or later'},
+    {'product': 'Apache', 'below': (2, 4), 'type': 'Outdated Apache Version', 'severity': 'Medium',
+     'description': 'Outdated Apache version: {version}', 'recommendation': 'Update to Apache 2.4.x or later'},
+    {'ports': (21,), 'banner': re.compile(r'anonymous|ftp ready', re.IGNORECASE), 'type': 'Anonymous FTP Access', 'severity': 'Medium',
+     'description': 'Anonymous FTP access may be enabled', 'recommendation': 'Disable anonymous FTP access'},
+    {'ports': (23,), 'type': 'Insecure Telnet Service', 'severity': 'High',
+     'description': 'Insecure Telnet service detected', 'recommendation': 'Replace Telnet with SSH'},
+    {'ports': (3306, 5432, 1433, 1521, 27017, 6379), 'type': 'Exposed Database Service', 'severity': 'High',
+     'description': 'Database service exposed on port {port}',
+     'recommendation': 'Restrict database access to authorized networks only'}
+]
+
+def parse_version(text):
+    """Leading dotted number of a version string as an int tuple: '7.10p1' -> (7, 10)"""
+    match = re.match(r'\d+(?:\.\d+)*', text or '')
+    return tuple(int(part) for part in match.group(0).split('.')) if match else ()
+    
+class FingerprintDB:
+    """Service fingerprints in nmap-service-probes match syntax
+    
+    Patterns are compiled once when loaded. Signatures anchored on a
+    literal first character are bucketed by it, so a banner is only tried
+    against the signatures that can possibly match it (plus the unanchored
+    ones), in file order.
+    """
+    LINE = re.compile(r'^(match|softmatch)\s+(\S+)\s+m(\S)')
+    FIELD = re.compile(r'(?:^|\s)(cpe:|[pvihod])([/|])(.*?)\2')
+    GROUP_REFERENCE = re.compile(r'\$(\d)')
+    
+    def __init__(self, text=BUILTIN_FINGERPRINTS):
+        self.signatures = []
+        self.load(text)
+        
+    @classmethod
+    def from_file(cls, path):
+        """Built-in signatures plus those in path; the file's take precedence"""
+        with open(path, 'r') as f:
+            db = cls(f.read())
+        db.load(BUILTIN_FINGERPRINTS)
+        return db
+        
+    def load(self, text):
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            header = self.LINE.match(line)
+            if not header:
+                raise ValueError(f"fingerprint line {number}: cannot parse {line[:60]!r}")
+            kind, service, delimiter = header.groups()
+            rest = line[header.end():]
+            end = rest.find(delimiter)
+            if end < 0:
+                raise ValueError(f"fingerprint line {number}: unterminated pattern")
+            pattern, options = rest[:end], rest[end + 1:]
+            option_flags = options.split(' ', 1)[0]
+            flags = (re.IGNORECASE if 'i' in option_flags else 0) | (re.DOTALL if 's' in option_flags else 0)
+            fields = {('cpe' if name == 'cpe:' else name): value for name, _, value in self.FIELD.findall(options)}
+            try:
+                regex = re.compile(pattern, flags)
+            except re.error as e:
+                raise ValueError(f"fingerprint line {number}: {e}")
+            self.signatures.append({
+                'soft': kind == 'softmatch',
+                'service': service,
+                'regex': regex,
+                'first': self.first_literal(pattern, flags),
+                'fields': fields
+            })
+        self.build_index()
+        
+    @staticmethod
+    def first_literal(pattern, flags):
+        """Characters an anchored pattern's first character must be, or None"""
+        if len(pattern) < 2 or pattern[0] != '^':
+            return None
+        char = pattern[1]
+        if not (char.isalnum() or char in ' -_/<"') or pattern[2:3] in ('?', '*', '{'):
+            return None
+        return {char.lower(), char.upper()} if flags & re.IGNORECASE else {char}
+        
+    def build_index(self):
+        keys = set()
+        for signature in self.signatures:
+            keys.update(signature['first'] or ())
+        self.generic = [signature for signature in self.signatures if signature['first'] is None]
+        self.index = {key: [signature for signature in self.signatures
+                            if signature['first'] is None or key in signature['first']] for key in keys}
+                            
+    def classify(self, banner):
+        """First matching signature for a banner as {'service', 'product', 'version', 'info', 'cpe'}"""
+        if not banner:
+            return None
+        soft = None
+        for signature in self.index.get(banner[0], self.generic):
+            match = signature['regex'].search(banner)
+            if not match:
+                continue
+            if signature['soft']:
+                soft = soft or {'service': signature['service'], 'product': '', 'version': '', 'info': '', 'cpe': ''}
+                continue
+            expand = lambda value: self.GROUP_REFERENCE.sub(lambda ref: match.group(int(ref.group(1))) or '', value)
+            fields = signature['fields']
+            return {
+                'service': signature['service'],
+                'product': expand(fields.get('p', '')),
+                'version': expand(fields.get('v', '')),
+                'info': expand(fields.get('i', '')).strip('; '),
+                'cpe': expand(fields.get('cpe', ''))
+            }
+        return soft
+        
+SERVICE_FINGERPRINTS = FingerprintDB()
+
+def service_vulnerabilities(port, banner, fingerprint):
+    """Findings from SERVICE_VULN_RULES for one open service"""
+    product = fingerprint['product'] if fingerprint else ''
+    version = fingerprint['version'] if fingerprint else ''
+    values = {'port': port, 'banner': banner, 'product': product, 'version': version}
+    vulns = []
+    for rule in SERVICE_VULN_RULES:
+        if 'ports' in rule and port not in rule['ports']:
+            continue
+        if 'product' in rule and (product != rule['product'] or not version):
+            continue
+        if 'below' in rule and not parse_version(version) < rule['below']:
+            continue
+        if 'banner' in rule and not rule['banner'].search(banner or ''):
+            continue
+        vulns.append({
+            'type': rule['type'],
+            'severity': rule['severity'],
+            'description': rule['description'].format(**values),
+            'recommendation': rule['recommendation']
+        })
+    return vulns
+    
+
+# vuln-category scripts report "State: VULNERABLE" (or LIKELY VULNERABLE);
+# "State: NOT VULNERABLE" must not count
+NMAP_VULNERABLE_STATE = re.compile(r'^\s*State: (?:LIKELY )?VULNERABLE\b', re.MULTILINE)
+
+class NmapXMLStream:
+    """Incremental reader for nmap -oX output
+    
+    Bytes are fed as nmap writes them and every finished <port> comes back
+    as a plain dict right away; finished <host> elements are cleared so a
+    long run does not build up the whole document in memory.
+    """
+    def __init__(self):
+        self.parser = XMLPullParser(events=('start', 'end'))
+        self.address = None
+        
+    def feed(self, data):
+        """Parse the next piece of XML and yield the ports it completed"""
+        self.parser.feed(data)
+        for event, element in self.parser.read_events():
+            if event == 'start':
+                if element.tag == 'host':
+                    self.address = None
+            elif element.tag == 'address':
+                if element.get('addrtype') in ('ipv4', 'ipv6') and self.address is None:
+                    self.address = element.get('addr')
+            elif element.tag == 'port':
+                yield self.port_record(element)
+            elif element.tag == 'host':
+                element.clear()
+                
+    def port_record(self, element):
+        state = element.find('state')
+        service = element.find('service')
+        attrs = service.attrib if service is not None else {}
+        return {
+            'ip': self.address,
+            'port': int(element.get('portid')),
+            'protocol': element.get('protocol'),
+            'state': state.get('state') if state is not None else 'unknown',
+            'service': attrs.get('name', ''),
+            'tunnel': attrs.get('tunnel', ''),
+            'product': attrs.get('product', ''),
+            'version': attrs.get('version', ''),
+            'extrainfo': attrs.get('extrainfo', ''),
+            'cpe': [cpe.text for cpe in element.iter('cpe') if cpe.text],
+            'scripts': {script.get('id'): script.get('output', '') for script in element.iter('script')}
+        }
+        
+class TarantulaCore:
+    def __init__(self, workspace="default"):
         self.target = ""
         self.scan_mode = "normal"
-        self.workspace = "default"
+        self.workspace = workspace
+        self.interactive = True
+        self.log_stream = sys.stdout
         self.output_dir = f"tarantula_output_{int(time.time())}"
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -72,9 +2987,13 @@ class TarantulaCore:
         self.results = {
             'target_info': {},
             'subdomains': [],
+            'ct_names': [],
             'ports': [],
+            'port_changes': [],
+            'web_endpoints': {},
             'directories': [],
             'dns_records': {},
+            'dns_inventory': {},
             'ssl_info': {},
             'headers': {},
             'tech_stack': [],
@@ -99,6 +3018,7 @@ class TarantulaCore:
             'real_ip': None,
             'cloudflare_bypass': {}
         }
+        self.collector = ResultCollector(self.results)
         
         self.api_keys = {
             'shodan': '',
@@ -107,6 +3027,43 @@ class TarantulaCore:
             'virustotal': ''
         }
         
+        # Resolvers for the async DNS engine (None: the system's nameservers;
+        # PUBLIC_RESOLVERS only when asked for), with per-resolver queries/second
+        self.dns_resolvers = None
+        self.dns_rate_limit = 300
+        self.dns_concurrency = 500
+        self.wildcard_filter = None
+        self.persist_dns_cache = True
+        self.ct_cache_max_age = 86400
+        
+        # Port scanner: AsyncPortScanner profile name or port spec
+        self.port_profile = 'default'
+        self.port_concurrency = 1000
+        self.fingerprints = SERVICE_FINGERPRINTS
+        
+        # Pooled keep-alive client shared by every HTTP-speaking module, and
+        # the worker count and per-response byte budget of the async
+        # discovery engine
+        self.http = HTTP_CLIENT
+        self.http_concurrency = 200
+        self.http_body_budget = 65536
+        
+        # Schemes and ports answering HTTP per host, probed once and shared by
+        # every module that builds URLs (see web_bases)
+        self.liveness = LivenessCache(self.results['web_endpoints'])
+        
+        # Incremental re-scans: probe known-open ports and sample closed ones
+        # by PortStateStore staleness rules, reporting only what changed
+        self.incremental_ports = False
+        self.port_staleness = PortStateStore.STALENESS
+        
+        # Detailed nmap runs: one process per host, this many at a time
+        self.nmap_workers = 4
+        self.nmap_timeout = 300
+        
+        # Extra wordlist files per kind, streamed after the built-in words
+        self.wordlists = {'subdomains': [], 'directories': [], 'files': []}
+        
         self.tool_paths = {
             'nuclei': 'nuclei',
             'sqlmap': 'sqlmap',
@@ -122,10 +3079,21 @@ class TarantulaCore:
         """Setup output directory and check tool dependencies"""
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(f"{self.output_dir}/nuclei", exist_ok=True)
+        os.makedirs(f"{self.output_dir}/nmap", exist_ok=True)
         os.makedirs(f"{self.output_dir}/sqlmap", exist_ok=True)
         os.makedirs(f"{self.output_dir}/wpscan", exist_ok=True)
         os.makedirs(f"{self.output_dir}/screenshots", exist_ok=True)
         
+        # Workspace state survives between runs, unlike the per-run output directory
+        self.workspace_dir = os.path.join("tarantula_workspace", self.workspace)
+        os.makedirs(self.workspace_dir, exist_ok=True)
+        self.tool_cache = ToolProbeCache(os.path.join(self.workspace_dir, "tool_cache.json"))
+        self.dns_cache_file = os.path.join(self.workspace_dir, "dns_cache.json")
+        self.ct_index_path = os.path.join(self.workspace_dir, "ct_index.db")
+        self.port_state_path = os.path.join(self.workspace_dir, "port_state.db")
+        if self.persist_dns_cache:
+            DNS_CACHE.load(self.dns_cache_file)
+        
     def init_database(self):
         """Initialize SQLite database for results storage"""
         self.db_path = f"{self.output_dir}/tarantula_{self.workspace}.db"
@@ -150,7 +3118,8 @@ class TarantulaCore:
                 severity TEXT,
                 description TEXT,
                 tool TEXT,
-                timestamp TEXT
+                timestamp TEXT,
+                occurrences INTEGER DEFAULT 1
             )
         ''')
         
@@ -182,6 +3151,9 @@ class TarantulaCore:
         print(banner_text)
         
     def loading_animation(self, message, duration=2):
+        if not self.interactive:
+            return
+            
         chars = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
         for i in range(duration * 10):
             sys.stdout.write(f'\r{NeonColors.NEON_PINK}[{chars[i % len(chars)]}] {NeonColors.CYAN}{message}{NeonColors.RESET}')
@@ -191,19 +3163,19 @@ class TarantulaCore:
         
     def neon_print(self, message, color=NeonColors.CYAN, prefix="[+]"):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.NEON_BLUE}{prefix} {color}{message}{NeonColors.RESET}")
+        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.NEON_BLUE}{prefix} {color}{message}{NeonColors.RESET}", file=self.log_stream)
         
     def error_print(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.RED}[!] ERROR: {message}{NeonColors.RESET}")
+        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.RED}[!] ERROR: {message}{NeonColors.RESET}", file=self.log_stream)
         
     def success_print(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.NEON_GREEN}[✓] {message}{NeonColors.RESET}")
+        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.NEON_GREEN}[✓] {message}{NeonColors.RESET}", file=self.log_stream)
         
     def warning_print(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.YELLOW}[⚠] {message}{NeonColors.RESET}")
+        print(f"{NeonColors.GRAY}[{timestamp}] {NeonColors.YELLOW}[⚠] {message}{NeonColors.RESET}", file=self.log_stream)
         
     def menu(self):
         menu_text = f"""
@@ -236,34 +3208,40 @@ class TarantulaCore:
         self.neon_print("Enter target domain/IP/CIDR:", NeonColors.NEON_PINK, "[TARGET]")
         target = input(f"{NeonColors.NEON_BLUE}tarantula@neural-net:~$ {NeonColors.CYAN}")
         if target:
-            self.target = target.strip().replace('http://', '').replace('https://', '')
-            self.success_print(f"Target acquired: {self.target}")
-            self.results['target_info']['target'] = self.target
-            self.results['target_info']['timestamp'] = datetime.now().isoformat()
+            self.apply_target(target)
         else:
             self.error_print("No target specified!")
             
+    def apply_target(self, target):
+        """Normalize and record the scan target"""
+        self.target = target.strip().replace('http://', '').replace('https://', '')
+        self.success_print(f"Target acquired: {self.target}")
+        self.results['target_info']['target'] = self.target
+        self.results['target_info']['timestamp'] = datetime.now().isoformat()
+            
     def check_tool_dependencies(self):
         """Check if required tools are installed"""
         self.neon_print("Checking tool dependencies", NeonColors.NEON_BLUE)
         
         tools_status = {}
         for tool, path in self.tool_paths.items():
-            try:
-                result = subprocess.run([path, '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    tools_status[tool] = "✓ Available"
-                    self.success_print(f"{tool}: Available")
-                else:
-                    tools_status[tool] = "✗ Not found"
-                    self.warning_print(f"{tool}: Not found")
-            except:
+            entry = self.tool_cache.probe(tool, path)
+            if entry and entry['available']:
+                tools_status[tool] = "✓ Available"
+                self.success_print(f"{tool}: Available ({entry['version']})")
+            else:
                 tools_status[tool] = "✗ Not found"
                 self.warning_print(f"{tool}: Not found")
                 
         return tools_status
         
+    def resolve_tool(self, tool):
+        """Resolved binary path for a tool if it is installed and working, else None"""
+        entry = self.tool_cache.probe(tool, self.tool_paths.get(tool, tool))
+        if entry and entry['available']:
+            return entry['path']
+        return None
+        
     def install_python_dependencies(self):
         """Install required Python packages"""
         packages = [
@@ -305,24 +3283,21 @@ class TarantulaCore:
             'docker', 'registry', 'harbor', 'nexus', 'artifactory', 'sonar', 'quality'
         ]
         
-        found_subs = []
+        self.collector.reset('subdomains')
         
-        def check_subdomain(sub):
-            try:
-                full_domain = f"{sub}.{self.target}"
-                ip = socket.gethostbyname(full_domain)
-                found_subs.append({'subdomain': full_domain, 'ip': ip})
-                self.success_print(f"Subdomain found: {full_domain} -> {ip}")
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            def check_subdomain(answer):
+                if not answer.resolved:
+                    return
+                ip = answer.records[0]
+                self.collector.add_subdomain(answer.name, ip, ips=answer.records)
+                self.success_print(f"Subdomain found: {answer.name} -> {ip}")
                 
                 # Check for subdomain takeover
-                self.check_subdomain_takeover(full_domain)
-                
-            except:
-                pass
+                executor.submit(self.check_subdomain_takeover, answer.name)
                 
-        with ThreadPoolExecutor(max_workers=150) as executor:
             self.loading_animation("Neural subdomain discovery in progress", 3)
-            executor.map(check_subdomain, common_subs)
+            self.resolve_names((f"{sub}.{self.target}" for sub in common_subs), check_subdomain)
             
         # Certificate transparency lookup
         self.cert_transparency_lookup()
@@ -330,49 +3305,76 @@ class TarantulaCore:
         # DNS brute forcing with larger wordlist
         self.dns_bruteforce()
         
-        self.results['subdomains'] = found_subs
-        self.neon_print(f"Subdomain discovery complete: {len(found_subs)} domains mapped", NeonColors.NEON_GREEN)
+        # Alterations of everything found so far
+        self.permutation_discovery()
         
+        wildcard_zones = self.wildcard_filter.wildcard_zones if self.wildcard_filter else []
+        self.results['target_info']['wildcard_zones'] = wildcard_zones
+        for zone in wildcard_zones:
+            self.warning_print(f"Wildcard DNS on *.{zone} - matching answers filtered")
+            
+        self.neon_print(f"Subdomain discovery complete: {len(self.results['subdomains'])} domains mapped", NeonColors.NEON_GREEN)
+        
+    CT_SOURCES = [
+        ('crt.sh', "https://crt.sh/?q=%.{target}&output=json", 'name_value'),
+        ('certspotter', "https://api.certspotter.com/v1/issuances?domain={target}&include_subdomains=true&expand=dns_names",
+         'dns_names')
+    ]
+    
     def cert_transparency_lookup(self):
-        """Enhanced certificate transparency search"""
+        """Enhanced certificate transparency search
+        
+        A local index built with `tarantula ct-import` is consulted first; the
+        online sources are only queried when it has no names for the target.
+        CT responses are parsed element by element as they stream in and are
+        cached gzip-compressed in the workspace for ct_cache_max_age seconds.
+        """
         try:
             self.neon_print("Scanning certificate transparency logs", NeonColors.NEON_BLUE)
             
-            # Multiple CT log sources
-            ct_sources = [
-                f"https://crt.sh/?q=%.{self.target}&output=json",
-                f"https://api.certspotter.com/v1/issuances?domain={self.target}&include_subdomains=true&expand=dns_names"
-            ]
-            
+            cache = ResponseCache(os.path.join(self.workspace_dir, "ct_cache"), max_age=self.ct_cache_max_age,
+                                  client=self.http)
+            target = self.target.lower()
             cert_domains = set()
             
-            for source in ct_sources:
+            if os.path.exists(self.ct_index_path):
+                cert_domains.update(CTIndex(self.ct_index_path).names_under(target))
+                self.neon_print(f"Local CT index: {len(cert_domains)} names", NeonColors.NEON_BLUE)
+                
+            for source, url, field in ([] if cert_domains else self.CT_SOURCES):
                 try:
-                    response = requests.get(source, timeout=15)
-                    if response.status_code == 200:
-                        if 'crt.sh' in source:
-                            certs = response.json()
-                            for cert in certs[:100]:
-                                if 'name_value' in cert:
-                                    domains = cert['name_value'].split('\n')
-                                    for domain in domains:
-                                        if domain and self.target in domain:
-                                            cert_domains.add(domain.strip())
-                        else:
-                            # Certspotter format
-                            data = response.json()
-                            for item in data:
-                                if 'dns_names' in item:
-                                    for domain in item['dns_names']:
-                                        if self.target in domain:
-                                            cert_domains.add(domain)
+                    certificates = 0
+                    for cert in iter_json_array(cache.stream(url.format(target=self.target))):
+                        certificates += 1
+                        names = cert.get(field) or []
+                        if isinstance(names, str):
+                            names = names.split('\n')
+                        for domain in names:
+                            domain = domain.strip().lower()
+                            if domain.startswith('*.'):
+                                domain = domain[2:]
+                            if domain == target or domain.endswith(f".{target}"):
+                                cert_domains.add(domain)
+                    self.neon_print(f"{source}: {certificates} certificates processed", NeonColors.NEON_BLUE)
                 except:
                     continue
                     
-            for domain in cert_domains:
-                if domain not in [sub['subdomain'] for sub in self.results['subdomains']]:
-                    self.success_print(f"CT Log discovery: {domain}")
-                    
+            self.results['ct_names'] = sorted(cert_domains)
+            
+            # Names that still resolve become subdomains
+            known = {sub['subdomain'] for sub in self.results['subdomains']}
+            
+            def check_ct_name(answer):
+                if not answer.resolved:
+                    return
+                ip = answer.records[0]
+                self.collector.add_subdomain(answer.name, ip, 'ct', answer.records)
+                self.success_print(f"CT Log discovery: {answer.name} -> {ip}")
+                
+            self.resolve_names((domain for domain in self.results['ct_names'] if domain not in known),
+                               check_ct_name)
+            self.neon_print(f"Certificate transparency: {len(cert_domains)} unique names", NeonColors.NEON_BLUE)
+            
         except Exception as e:
             self.error_print(f"Certificate transparency lookup failed: {str(e)}")
             
@@ -390,33 +3392,94 @@ class TarantulaCore:
                 'training', 'education', 'learn', 'academy', 'university',
                 'partners', 'vendor', 'supplier', 'client', 'customer', 'guest',
                 'public', 'private', 'secure', 'protected', 'restricted', 'classified'
-            ]
-            
-            found_count = 0
-            
-            def check_extended_subdomain(sub):
-                nonlocal found_count
-                try:
-                    full_domain = f"{sub}.{self.target}"
-                    ip = socket.gethostbyname(full_domain)
-                    self.results['subdomains'].append({'subdomain': full_domain, 'ip': ip})
-                    self.success_print(f"Extended discovery: {full_domain} -> {ip}")
-                    found_count += 1
-                except:
-                    pass
-                    
-            with ThreadPoolExecutor(max_workers=100) as executor:
-                executor.map(check_extended_subdomain, extended_subs)
+            ]
+            
+            self.collector.reset_counter('extended_subdomains')
+            
+            def check_extended_subdomain(answer):
+                if not answer.resolved:
+                    return
+                ip = answer.records[0]
+                self.collector.add_subdomain(answer.name, ip, 'extended', answer.records)
+                self.success_print(f"Extended discovery: {answer.name} -> {ip}")
+                self.collector.increment('extended_subdomains')
+                
+            words = self.wordlist_source('subdomains', extended_subs, checkpoint_lag=2 * self.dns_concurrency)
+            self.resolve_names((f"{sub}.{self.target}" for sub in words), check_extended_subdomain)
                 
+            found_count = self.collector.count('extended_subdomains')
             self.neon_print(f"Extended DNS bruteforce found {found_count} additional subdomains", NeonColors.NEON_BLUE)
             
         except Exception as e:
             self.error_print(f"DNS bruteforce failed: {str(e)}")
             
+    def permutation_discovery(self):
+        """Resolve permutations of discovered subdomains and CT names"""
+        try:
+            known = [sub['subdomain'] for sub in self.results['subdomains']] + self.results.get('ct_names', [])
+            if not known:
+                return
+            self.neon_print(f"Permutation scan over {len(known)} known names", NeonColors.NEON_BLUE)
+            
+            self.collector.reset_counter('permutation_subdomains')
+            
+            def check_permutation(answer):
+                if not answer.resolved:
+                    return
+                ip = answer.records[0]
+                self.collector.add_subdomain(answer.name, ip, 'permutation', answer.records)
+                self.success_print(f"Permutation discovery: {answer.name} -> {ip}")
+                self.collector.increment('permutation_subdomains')
+                
+            self.resolve_names(subdomain_permutations(known, self.target), check_permutation)
+            
+            found_count = self.collector.count('permutation_subdomains')
+            self.neon_print(f"Permutation scan found {found_count} additional subdomains", NeonColors.NEON_BLUE)
+            
+        except Exception as e:
+            self.error_print(f"Permutation discovery failed: {str(e)}")
+            
+    def wordlist_source(self, kind, builtin, checkpoint_lag=None):
+        """Stream built-in words plus any configured wordlist files for kind
+        
+        Passing checkpoint_lag (the most words the consumer can have in
+        flight) makes file progress resumable per target in the workspace.
+        """
+        if checkpoint_lag is None:
+            return WordlistSource(builtin, self.wordlists.get(kind, []))
+        return WordlistSource(builtin, self.wordlists.get(kind, []),
+                              state_file=os.path.join(self.workspace_dir, "wordlist_state.json"),
+                              state_key=f"{kind}:{self.target}", checkpoint_lag=checkpoint_lag)
+        
+    def resolve_names(self, names, callback, filter_wildcards=True):
+        """Resolve names on a fresh dns_engine, warning about names no resolver answered"""
+        engine = self.dns_engine(filter_wildcards)
+        engine.resolve_all(names, callback=callback)
+        if engine.stats['lost']:
+            self.warning_print(f"{engine.stats['lost']} names got no DNS answer after retries - "
+                               f"results may be incomplete (try a lower --dns-rate)")
+        return engine
+        
+    def dns_engine(self, filter_wildcards=True):
+        """Fresh AsyncDNSEngine using the configured resolvers and limits
+        
+        The wildcard filter is kept per target so zones are only probed once
+        across all of a scan's brute-force passes. Lookups of names that are
+        already known to exist pass filter_wildcards=False. The resolvers are
+        the configured ones, or else the system's.
+        """
+        resolvers = self.dns_resolvers or system_resolvers()
+        if not resolvers:
+            raise RuntimeError("no system DNS resolvers found - pass --resolvers (e.g. --resolvers public)")
+        if self.wildcard_filter is None or self.wildcard_filter.apex != self.target.lower():
+            self.wildcard_filter = WildcardFilter(self.target)
+        return AsyncDNSEngine(resolvers, rate_limit=self.dns_rate_limit, concurrency=self.dns_concurrency,
+                              wildcard_filter=self.wildcard_filter if filter_wildcards else None)
+        
     def check_subdomain_takeover(self, subdomain):
         """Enhanced subdomain takeover detection"""
         try:
-            response = requests.get(f"http://{subdomain}", timeout=8, allow_redirects=False)
+            response = self.http.get(f"http://{subdomain}", timeout=8, allow_redirects=False)
             
             takeover_signatures = {
                 'GitHub Pages': ['There isn\'t a GitHub Pages site here', 'For root URLs'],
@@ -437,14 +3500,8 @@ class TarantulaCore:
             for service, signatures in takeover_signatures.items():
                 for signature in signatures:
                     if signature in response.text:
-                        vuln = {
-                            'type': 'Subdomain Takeover',
-                            'target': subdomain,
-                            'severity': 'High',
-                            'description': f'Possible {service} subdomain takeover: {signature}',
-                            'tool': 'TARANTULA'
-                        }
-                        self.results['vulnerabilities'].append(vuln)
+                        self.collector.add_finding('Subdomain Takeover', subdomain, 'High',
+                                                   f'Possible {service} subdomain takeover: {signature}')
                         self.warning_print(f"Possible takeover ({service}): {subdomain}")
                         return
                         
@@ -459,225 +3516,324 @@ class TarantulaCore:
             
         self.neon_print(f"Enhanced port scanning for {self.target}", NeonColors.NEON_GREEN)
         
-        # Comprehensive port ranges
-        top_ports = [
-            21, 22, 23, 25, 53, 80, 110, 111, 135, 139, 143, 443, 993, 995, 1723, 3306, 
-            3389, 5432, 5900, 8080, 8443, 8888, 9000, 9001, 9090, 6379, 27017, 11211,
-            389, 636, 88, 464, 749, 1433, 1521, 3268, 5985, 5986, 445, 137, 138,
-            161, 162, 69, 123, 514, 515, 631, 548, 554, 1900, 5353, 5060, 5061,
-            8000, 8001, 8008, 8009, 8010, 8081, 8082, 8083, 8089, 8090, 8091, 8092,
-            9200, 9300, 5601, 2181, 2379, 4001, 6443, 10250, 10251, 10252, 10255,
-            3000, 3001, 4000, 4001, 5000, 5001, 7000, 7001, 9999, 10000, 50000
-        ]
-        
-        open_ports = []
+        self.collector.reset('ports')
+        self.collector.reset('port_changes')
+        open_ports = self.results['ports']
+        
+        # Every unique IP is scanned once; its results belong to all hostnames on it
+        hosts_by_ip = self.port_scan_targets()
+        self.neon_print(f"Scanning {len(hosts_by_ip)} unique IPs behind "
+                        f"{sum(len(hosts) for hosts in hosts_by_ip.values())} hostnames", NeonColors.NEON_BLUE)
+        
+        # Last-seen state per (ip, port) from earlier scans of this workspace
+        ports = AsyncPortScanner.parse_ports(self.port_profile)
+        store = PortStateStore(self.port_state_path)
+        known = {ip: store.states(ip) for ip in hosts_by_ip}
+        if self.incremental_ports:
+            plan = {ip: store.plan(ports, known[ip], self.port_staleness) for ip in hosts_by_ip}
+            self.neon_print(f"Incremental scan: {sum(len(due) for due in plan.values())} of "
+                            f"{len(ports) * len(hosts_by_ip)} ports due for probing", NeonColors.NEON_BLUE)
+        else:
+            plan = dict.fromkeys(hosts_by_ip, ports)
+        open_banners = {ip: {} for ip in hosts_by_ip}
         
-        def enhanced_port_scan(port):
+        def enhanced_port_scan(ip, port, probe):
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(3)
-                result = sock.connect_ex((self.target, port))
-                
-                if result == 0:
-                    service = self.identify_service(port)
-                    banner = self.grab_banner(self.target, port)
-                    version = self.detect_service_version(banner, port)
-                    
-                    port_info = {
-                        'port': port,
-                        'service': service,
-                        'banner': banner,
-                        'version': version,
-                        'state': 'open'
-                    }
-                    
-                    open_ports.append(port_info)
-                    self.success_print(f"Port {port}/{service} open - {banner[:60]}")
-                    
-                    # Enhanced vulnerability checks
-                    self.check_service_vulnerabilities(port, service, banner, version)
+                hostnames = hosts_by_ip[ip]
+                banner = probe['banner']
+                fingerprint = self.fingerprints.classify(banner)
+                service = self.identify_service(port)
+                if service == 'Unknown' and fingerprint:
+                    service = fingerprint['service']
+                    if service == 'HTTP' and probe['tls']:
+                        service = 'HTTPS'
+                version = self.detect_service_version(banner, port, fingerprint)
+                
+                self.collector.add_service(port, service, banner, version, ip=ip, hostnames=hostnames,
+                                           tls=probe['tls'])
+                open_banners[ip][port] = banner
+                
+                # Web services on other ports join hosts the liveness probe already covered
+                endpoint = LivenessCache.service_endpoint(port, service, banner, probe['tls'])
+                if endpoint:
+                    for hostname in hostnames:
+                        self.liveness.add_endpoints(hostname, [endpoint], self.http)
+                
+                previous = known[ip].get(port)
+                if previous is None or previous[0] != 'open':
+                    change = 'opened'
+                elif previous[1] != PortStateStore.banner_digest(banner):
+                    change = 'banner_changed'
+                else:
+                    change = None
+                if change:
+                    self.collector.add('port_changes', {'ip': ip, 'port': port, 'change': change,
+                                                        'service': service, 'version': version})
                     
-                sock.close()
+                # Incremental runs only report what changed since the last scan
+                if change or not self.incremental_ports:
+                    shown = ', '.join(hostnames[:3]) + (f" +{len(hostnames) - 3}" if len(hostnames) > 3 else '')
+                    state = 'changed' if change == 'banner_changed' else 'open'
+                    self.success_print(f"Port {ip}:{port}/{service} {state} [{shown}] - {banner[:60]}")
+                
+                # Enhanced vulnerability checks
+                self.check_service_vulnerabilities(port, service, banner, version, ip, hostnames, fingerprint)
             except:
                 pass
                 
-        with ThreadPoolExecutor(max_workers=250) as executor:
+        # Banners come from the connection that found the port open
+        prober = ServiceProber({ip: hostnames[0] for ip, hostnames in hosts_by_ip.items()})
+        scanner = AsyncPortScanner(concurrency=self.port_concurrency, prober=prober)
+        with ThreadPoolExecutor(max_workers=50) as executor:
             self.loading_animation("Neural port reconnaissance in progress", 4)
-            executor.map(enhanced_port_scan, top_ports)
-            
-        # Nmap integration for detailed scanning
-        if open_ports:
-            self.nmap_service_scan(open_ports)
+            scanner.scan_many(hosts_by_ip, plan,
+                              callback=lambda ip, port, probe: executor.submit(enhanced_port_scan, ip, port, probe))
+            
+        self.neon_print(f"Probed {scanner.stats['probes']} ports ({scanner.stats['filtered']} filtered)", NeonColors.NEON_BLUE)
+        
+        for ip, probed in plan.items():
+            probed_set = set(probed)
+            filtered = scanner.filtered.get(ip, set())
+            for port, (state, _, _) in sorted(known[ip].items()):
+                if state == 'open' and port in probed_set and port not in open_banners[ip]:
+                    change = PortStateStore.port_state(port, open_banners[ip], filtered)
+                    self.collector.add('port_changes', {'ip': ip, 'port': port, 'change': change})
+                    self.warning_print(f"Port {ip}:{port} {change} since the last scan")
+            store.record(ip, probed, open_banners[ip], filtered)
+            
+        changes = self.results['port_changes']
+        self.neon_print(f"{len(changes)} port changes since the last scan", NeonColors.NEON_BLUE)
+        
+        # Nmap integration for detailed scanning (only changed services when incremental)
+        if self.incremental_ports:
+            changed = {(change['ip'], change['port']) for change in changes
+                       if change['change'] in ('opened', 'banner_changed')}
+            nmap_ports = [record for record in open_ports if (record['ip'], record['port']) in changed]
+        else:
+            nmap_ports = open_ports
+        if nmap_ports:
+            self.nmap_service_scan(nmap_ports)
             
-        self.results['ports'] = open_ports
         self.neon_print(f"Port scanning complete: {len(open_ports)} services discovered", NeonColors.NEON_GREEN)
         
+    def port_scan_targets(self):
+        """Map each unique IP of the target and its subdomains (every A record) to the hostnames on it"""
+        hosts_by_ip = {}
+        
+        def add(ip, hostname):
+            hostnames = hosts_by_ip.setdefault(ip, [])
+            if hostname not in hostnames:
+                hostnames.append(hostname)
+                
+        try:
+            ipaddress.ip_address(self.target)
+            add(self.target, self.target)
+        except ValueError:
+            for ip in DNS_CACHE.resolve(self.target).records:
+                add(ip, self.target)
+                
+        for subdomain in self.results.get('subdomains', []):
+            for ip in subdomain.get('ips') or [subdomain.get('ip')]:
+                if ip:
+                    add(ip, subdomain['subdomain'])
+                
+        # Unresolvable target: let the scanner's own lookup have a go
+        return hosts_by_ip or {self.target: [self.target]}
+        
     def nmap_service_scan(self, open_ports):
-        """Use nmap for detailed service detection"""
+        """Use nmap for detailed service detection, one run per host in a bounded pool"""
         try:
             if not open_ports:
                 return
                 
-            self.neon_print("Performing detailed service detection with nmap", NeonColors.NEON_BLUE)
-            
-            port_list = ','.join([str(p['port']) for p in open_ports[:20]])  # Limit to first 20 ports
-            
-            nmap_cmd = [
-                'nmap', '-sV', '-sC', '--script=default,vuln',
-                '-p', port_list, self.target,
-                '-oX', f"{self.output_dir}/nmap_detailed.xml"
-            ]
-            
-            try:
-                result = subprocess.run(nmap_cmd, capture_output=True, text=True, timeout=300)
-                if result.returncode == 0:
-                    self.success_print("Nmap service detection completed")
-                    self.parse_nmap_results(f"{self.output_dir}/nmap_detailed.xml")
-                else:
-                    self.warning_print("Nmap service detection failed")
-            except subprocess.TimeoutExpired:
-                self.warning_print("Nmap scan timeout")
-            except FileNotFoundError:
+            nmap_bin = self.resolve_tool('nmap')
+            if not nmap_bin:
                 self.warning_print("Nmap not found - skipping detailed service detection")
+                return
                 
+            ports_by_ip = {}
+            hostnames_by_ip = {}
+            for record in list(open_ports):
+                ip = record.get('ip') or self.target
+                ports_by_ip.setdefault(ip, set()).add(record['port'])
+                hostnames_by_ip.setdefault(ip, record.get('hostnames') or [])
+                
+            self.neon_print(f"Performing detailed service detection with nmap on {len(ports_by_ip)} hosts "
+                            f"({self.nmap_workers} at a time)", NeonColors.NEON_BLUE)
+            
+            with ThreadPoolExecutor(max_workers=self.nmap_workers) as executor:
+                futures = {executor.submit(self.run_nmap_host, nmap_bin, ip, sorted(ports), hostnames_by_ip[ip]): ip
+                           for ip, ports in ports_by_ip.items()}
+                for future in as_completed(futures):
+                    ip = futures[future]
+                    try:
+                        merged, complete = future.result()
+                    except Exception as e:
+                        self.warning_print(f"Nmap scan of {ip} failed: {str(e)}")
+                        continue
+                    if complete:
+                        self.success_print(f"Nmap service detection for {ip} completed: {merged} ports")
+                    else:
+                        self.warning_print(f"Nmap scan of {ip} stopped early - kept {merged} ports parsed so far")
+                        
         except Exception as e:
             self.error_print(f"Nmap service scan failed: {str(e)}")
             
+    def run_nmap_host(self, nmap_bin, ip, ports, hostnames=()):
+        """Run nmap against one host, merging each port into the results as nmap reports it"""
+        xml_file = f"{self.output_dir}/nmap/nmap_{ip.replace(':', '_')}.xml"
+        nmap_cmd = [
+            nmap_bin, '-sV', '-sC', '--script=default,vuln',
+            '-p', ','.join(str(port) for port in ports),
+            '-oX', '-', ip
+        ]
+        
+        # XML goes to stdout so it can be parsed as it arrives; a copy is kept on disk
+        process = subprocess.Popen(nmap_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        timer = threading.Timer(self.nmap_timeout, process.kill)
+        timer.start()
+        stream = NmapXMLStream()
+        merged = 0
+        finished = False
+        try:
+            with open(xml_file, 'wb') as f:
+                for chunk in iter(lambda: process.stdout.read1(65536), b''):
+                    f.write(chunk)
+                    for port in stream.feed(chunk):
+                        merged += self.merge_nmap_port(port, ip, hostnames)
+            finished = True
+        finally:
+            # End of output is not the end of the process: give nmap a moment to
+            # exit on its own and only kill it if it hangs (or we are bailing out)
+            try:
+                process.wait(timeout=30 if finished else 0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            timer.cancel()
+            process.stdout.close()
+        return merged, process.returncode == 0
+        
+    def merge_nmap_port(self, port, ip=None, hostnames=()):
+        """Merge one parsed nmap port into the service records; returns 1 if merged"""
+        if port['state'] != 'open':
+            return 0
+            
+        ip = port['ip'] or ip or self.target
+        service = port['service'].upper()
+        if port['tunnel'] == 'ssl' and service == 'HTTP':
+            service = 'HTTPS'
+        version = ' '.join(part for part in (port['product'], port['version']) if part)
+        if version and port['extrainfo']:
+            version += f" ({port['extrainfo']})"
+            
+        record, created = self.collector.merge_service(ip, port['port'], service, version, port['cpe'],
+                                                       port['scripts'], hostnames)
+        if created:
+            self.success_print(f"Port {ip}:{port['port']}/{record.service} open (nmap)")
+            
+        # Findings from the vuln script category
+        hostnames = record.hostnames
+        host = hostnames[0] if len(hostnames) == 1 else ip
+        for script_id, output in port['scripts'].items():
+            if not NMAP_VULNERABLE_STATE.search(output):
+                continue
+            lines = [line.strip() for line in output.splitlines() if line.strip()]
+            title = next((line for line in lines if not line.startswith('VULNERABLE')), script_id)
+            finding = self.collector.add_finding(f"Nmap: {script_id}", f"{host}:{port['port']}", 'High',
+                                                 title, tool='Nmap', script_output=output[:2000],
+                                                 hostnames=list(hostnames))
+            self.warning_print(f"Vulnerability: {finding.type} on {finding.target}")
+        return 1
+        
     def parse_nmap_results(self, xml_file):
-        """Parse nmap XML results"""
+        """Merge a saved nmap XML file into the port results"""
         try:
-            # Basic XML parsing would go here
-            # For now, just indicate that results are available
-            self.neon_print("Nmap results saved to XML", NeonColors.NEON_BLUE)
+            stream = NmapXMLStream()
+            merged = 0
+            with open(xml_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    for port in stream.feed(chunk):
+                        merged += self.merge_nmap_port(port)
+            self.neon_print(f"Merged {merged} ports from {xml_file}", NeonColors.NEON_BLUE)
+            return merged
         except Exception as e:
             self.error_print(f"Failed to parse nmap results: {str(e)}")
+            return 0
             
     def identify_service(self, port):
         """Enhanced service identification"""
-        service_map = {
-            21: 'FTP', 22: 'SSH', 23: 'Telnet', 25: 'SMTP', 53: 'DNS', 80: 'HTTP',
-            110: 'POP3', 143: 'IMAP', 443: 'HTTPS', 993: 'IMAPS', 995: 'POP3S',
-            3306: 'MySQL', 3389: 'RDP', 5432: 'PostgreSQL', 6379: 'Redis',
-            27017: 'MongoDB', 11211: 'Memcached', 389: 'LDAP', 636: 'LDAPS',
-            1433: 'MSSQL', 1521: 'Oracle', 8080: 'HTTP-Alt', 8443: 'HTTPS-Alt',
-            9200: 'Elasticsearch', 5601: 'Kibana', 2181: 'Zookeeper', 6443: 'Kubernetes',
-            9300: 'Elasticsearch-Transport', 4001: 'etcd', 2379: 'etcd-client'
-        }
-        return service_map.get(port, 'Unknown')
+        return SERVICE_PORTS.get(port, 'Unknown')
         
-    def grab_banner(self, host, port):
-        """Enhanced banner grabbing"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((host, port))
-            
-            # Send appropriate probes based on port
-            if port == 80:
-                sock.send(b'GET / HTTP/1.1\r\nHost: ' + host.encode() + b'\r\n\r\n')
-            elif port == 443:
-                # For HTTPS, we'll skip detailed banner for now
-                sock.close()
-                return "HTTPS Service"
-            else:
-                sock.send(b'\r\n')
-                
-            banner = sock.recv(2048).decode('utf-8', errors='ignore').strip()
-            sock.close()
-            return banner
-        except:
-            return ""
-            
-    def detect_service_version(self, banner, port):
+    def detect_service_version(self, banner, port, fingerprint=None):
         """Detect service versions from banners"""
         if not banner:
             return "Unknown"
             
-        # Common version detection patterns
-        version_patterns = {
-            'Apache': r'Apache/(\d+\.\d+\.\d+)',
-            'nginx': r'nginx/(\d+\.\d+\.\d+)',
-            'OpenSSH': r'OpenSSH_(\d+\.\d+)',
-            'MySQL': r'MySQL (\d+\.\d+\.\d+)',
-            'PostgreSQL': r'PostgreSQL (\d+\.\d+)',
-            'Redis': r'Redis server v=(\d+\.\d+\.\d+)',
-            'MongoDB': r'MongoDB (\d+\.\d+\.\d+)'
-        }
-        
-        for service, pattern in version_patterns.items():
-            match = re.search(pattern, banner)
-            if match:
-                return f"{service} {match.group(1)}"
-                
+        fingerprint = fingerprint or self.fingerprints.classify(banner)
+        if fingerprint and fingerprint['product']:
+            return f"{fingerprint['product']} {fingerprint['version']}".strip()
+            
         return "Version Unknown"
         
-    def check_service_vulnerabilities(self, port, service, banner, version):
+    def check_service_vulnerabilities(self, port, service, banner, version, ip=None, hostnames=(), fingerprint=None):
         """Enhanced service vulnerability detection"""
-        vulns = []
-        
-        # SSH vulnerabilities
-        if port == 22 and 'SSH' in banner:
-            if 'OpenSSH' in banner:
-                version_match = re.search(r'OpenSSH_(\d+\.\d+)', banner)
-                if version_match:
-                    version_num = float(version_match.group(1))
-                    if version_num < 7.4:
-                        vulns.append({
-                            'type': 'Outdated SSH Version',
-                            'severity': 'Medium',
-                            'description': f'Outdated OpenSSH version: {banner}',
-                            'recommendation': 'Update to OpenSSH 7.4 or later'
-                        })
-                        
-        # HTTP vulnerabilities
-        elif port in [80, 8080] and 'HTTP' in service:
-            if 'Apache' in banner:
-                version_match = re.search(r'Apache/(\d+\.\d+\.\d+)', banner)
-                if version_match:
-                    version_str = version_match.group(1)
-                    major, minor, patch = map(int, version_str.split('.'))
-                    if major < 2 or (major == 2 and minor < 4):
-                        vulns.append({
-                            'type': 'Outdated Apache Version',
-                            'severity': 'Medium',
-                            'description': f'Outdated Apache version: {version_str}',
-                            'recommendation': 'Update to Apache 2.4.x or later'
-                        })
-                        
-        # FTP vulnerabilities
-        elif port == 21:
-            if 'anonymous' in banner.lower() or 'ftp ready' in banner.lower():
-                vulns.append({
-                    'type': 'Anonymous FTP Access',
-                    'severity': 'Medium',
-                    'description': 'Anonymous FTP access may be enabled',
-                    'recommendation': 'Disable anonymous FTP access'
-                })
-                
-        # Telnet vulnerabilities
-        elif port == 23:
-            vulns.append({
-                'type': 'Insecure Telnet Service',
-                'severity': 'High',
-                'description': 'Insecure Telnet service detected',
-                'recommendation': 'Replace Telnet with SSH'
-            })
-            
-        # Database vulnerabilities
-        elif port in [3306, 5432, 1433, 1521, 27017, 6379]:
-            vulns.append({
-                'type': 'Exposed Database Service',
-                'severity': 'High',
-                'description': f'Database service exposed on port {port}',
-                'recommendation': 'Restrict database access to authorized networks only'
-            })
-            
+        if fingerprint is None and banner:
+            fingerprint = self.fingerprints.classify(banner)
+        vulns = service_vulnerabilities(port, banner, fingerprint)
+        
+        # A single hostname keeps the readable asset; shared IPs report the IP
+        host = hostnames[0] if len(hostnames) == 1 else (ip or self.target)
+        if hostnames:
+            for vuln in vulns:
+                vuln['hostnames'] = list(hostnames)
+                
         for vuln in vulns:
-            vuln['target'] = f"{self.target}:{port}"
-            vuln['tool'] = 'TARANTULA'
-            self.results['vulnerabilities'].append(vuln)
-            self.warning_print(f"Vulnerability: {vuln['type']}")
+            finding = self.collector.add_finding(target=f"{host}:{port}", **vuln)
+            self.warning_print(f"Vulnerability: {finding.type}")
+            
+    def web_bases(self, host=None):
+        """Base URLs answering HTTP on host (default: the target), https first; [] when nothing answers"""
+        return self.liveness.bases(host or self.target, self.http)
+        
+    def web_service_endpoints(self):
+        """{host: {(scheme, port)}} for the web services the port scan found"""
+        endpoints = collections.defaultdict(set)
+        for service in self.results.get('ports', []):
+            endpoint = LivenessCache.service_endpoint(service['port'], service.get('service'), service.get('banner'),
+                                                      service.get('tls'))
+            if endpoint:
+                for host in service.get('hostnames') or [self.target]:
+                    endpoints[host].add(endpoint)
+        return endpoints
+        
+    def web_liveness_probe(self):
+        """Probe which schemes and ports answer on the target before the HTTP modules run
+        
+        Runs at once rather than after subdomain discovery and the port scan,
+        so the HTTP modules are not held up by them: subdomains found so far
+        are included, later ones are probed when a module first asks about
+        them, and web services the port scan finds are added as they turn up.
+        """
+        if not self.target:
+            self.error_print("No target set!")
+            return
             
+        self.liveness.reset()
+        service_endpoints = self.web_service_endpoints()
+        for host, endpoints in service_endpoints.items():
+            self.liveness.add_endpoints(host, endpoints)
+        hosts = ([self.target] + [subdomain['subdomain'] for subdomain in self.results.get('subdomains', [])] +
+                 list(service_endpoints))
+        records = self.liveness.check_all(hosts, self.http, workers=self.http.per_host)
+        
+        for host, record in records.items():
+            if not record['live']:
+                self.warning_print(f"No HTTP endpoint answers on {host}")
+            else:
+                redirect = " (http redirects to https)" if record['https_redirect'] else ""
+                self.success_print(f"Live: {host} -> {', '.join(self.web_bases(host))}{redirect}")
+                
     def directory_file_discovery(self):
         """Enhanced directory and file discovery"""
         if not self.target:
@@ -704,54 +3860,7 @@ class TarantulaCore:
             'v1', 'v2', 'api/v1', 'api/v2', 'graphql', 'swagger', 'openapi'
         ]
         
-        found_dirs = []
-        
-        def check_directory(directory):
-            try:
-                protocols = ['http', 'https']
-                for protocol in protocols:
-                    url = f"{protocol}://{self.target}/{directory}"
-                    
-                    # Use random user agent
-                    headers = {'User-Agent': random.choice(self.user_agents)}
-                    response = requests.get(url, timeout=8, allow_redirects=False, 
-                                          headers=headers, verify=False)
-                    
-                    if response.status_code in [200, 301, 302, 403, 401]:
-                        dir_info = {
-                            'directory': directory,
-                            'url': url,
-                            'status_code': response.status_code,
-                            'size': len(response.content),
-                            'protocol': protocol,
-                            'headers': dict(response.headers)
-                        }
-                        
-                        found_dirs.append(dir_info)
-                        self.success_print(f"Directory found: /{directory} [{response.status_code}] ({protocol.upper()})")
-                        
-                        # Check for sensitive files in discovered directories
-                        self.check_sensitive_files(url)
-                        
-                        # Check for backup files
-                        self.check_backup_files(url, directory)
-                        break
-                        
-            except:
-                pass
-                
-        with ThreadPoolExecutor(max_workers=40) as executor:
-            self.loading_animation("Neural directory reconnaissance", 4)
-            executor.map(check_directory, directories)
-            
-        # Check for common sensitive files in root
-        self.check_root_sensitive_files()
-        
-        self.results['directories'] = found_dirs
-        self.neon_print(f"Directory discovery complete: {len(found_dirs)} paths found", NeonColors.NEON_GREEN)
-        
-    def check_sensitive_files(self, base_url):
-        """Enhanced sensitive file detection"""
+        # Sensitive files looked for inside every discovered directory
         sensitive_files = [
             '.env', '.env.local', '.env.production', '.env.development',
             '.git/config', '.git/HEAD', '.gitignore',
@@ -765,97 +3874,126 @@ class TarantulaCore:
             'Dockerfile', 'docker-compose.yml', '.dockerignore',
             'README.md', 'CHANGELOG.md', 'TODO.txt'
         ]
-        
-        for file in sensitive_files:
-            try:
-                file_url = urljoin(base_url, file)
-                headers = {'User-Agent': random.choice(self.user_agents)}
-                response = requests.get(file_url, timeout=5, headers=headers, verify=False)
-                
-                if response.status_code == 200 and len(response.content) > 0:
-                    file_info = {
-                        'file': file,
-                        'url': file_url,
-                        'size': len(response.content),
-                        'content_type': response.headers.get('content-type', 'unknown')
-                    }
-                    
-                    self.results['exposed_files'].append(file_info)
-                    
-                    # Classify severity based on file type
-                    if file in ['.env', 'wp-config.php', 'database.php', 'id_rsa', 'private.key']:
-                        severity = 'Critical'
-                    elif file in ['config.php', '.git/config', 'backup.sql']:
-                        severity = 'High'
-                    else:
-                        severity = 'Medium'
-                        
-                    vuln = {
-                        'type': 'Sensitive File Exposure',
-                        'target': file_url,
-                        'severity': severity,
-                        'description': f'Sensitive file exposed: {file}',
-                        'tool': 'TARANTULA'
-                    }
-                    self.results['vulnerabilities'].append(vuln)
-                    self.warning_print(f"Sensitive file exposed: {file_url}")
-                    
-            except:
-                pass
-                
-    def check_backup_files(self, base_url, directory):
-        """Check for backup files in discovered directories"""
+        sensitive_files = self.wordlist_source('files', sensitive_files)
         backup_extensions = ['.bak', '.backup', '.old', '.orig', '.copy', '.tmp', '~']
         
-        for ext in backup_extensions:
-            try:
-                backup_url = f"{base_url}{ext}"
-                headers = {'User-Agent': random.choice(self.user_agents)}
-                response = requests.get(backup_url, timeout=5, headers=headers, verify=False)
+        self.collector.reset('directories')
+        
+        bases = self.web_bases()
+        if not bases:
+            self.warning_print(f"No HTTP endpoint answers on {self.target} - skipping directory discovery")
+            return
+            
+        def follow_ups(url, name):
+            """Lazily generated checks for a directory hit, re-reading the files wordlist"""
+            base_url = url.rstrip('/') + '/'
+            for file in sensitive_files:
+                yield (urljoin(base_url, file), 'file', file)
+            for ext in backup_extensions:
+                yield (f"{url}{ext}", 'backup', f"{name}{ext}")
                 
-                if response.status_code == 200 and len(response.content) > 0:
-                    self.warning_print(f"Backup file found: {backup_url}")
-                    
-                    vuln = {
-                        'type': 'Backup File Exposure',
-                        'target': backup_url,
-                        'severity': 'Medium',
-                        'description': f'Backup file accessible: {directory}{ext}',
-                        'tool': 'TARANTULA'
-                    }
-                    self.results['vulnerabilities'].append(vuln)
+        def handle(item, response):
+            url, kind, name = item
+            if kind == 'directory':
+                protocol = url.split('://', 1)[0]
+                if response is not None and response.status_code in [200, 301, 302, 403, 401]:
+                    self.collector.add_directory(name, url, response.status_code, response.length,
+                                                 protocol, dict(response.headers), response.size_lower_bound)
+                    self.success_print(f"Directory found: {url} [{response.status_code}] ({protocol.upper()})")
                     
-            except:
-                pass
-                
-    def check_root_sensitive_files(self):
+                    # Sensitive files and backup copies share the workers with the wordlist
+                    return follow_ups(url, name)
+            elif response is not None and response.status_code == 200 and response.length != 0:
+                if kind == 'file':
+                    self.sensitive_file_found(name, url, response)
+                else:
+                    self.backup_file_found(name, url)
+            return None
+            
+        engine = AsyncHTTPEngine(concurrency=self.http_concurrency, per_host=self.http.per_host,
+                                 user_agents=self.user_agents, soft_not_found=SoftNotFoundFilter(),
+                                 body_budget=self.http_body_budget)
+        # Every live base gets the wordlist: other ports and a non-redirecting http serve other apps
+        seeds = ((f"{base}/{directory}", 'directory', directory)
+                 for directory in self.wordlist_source('directories', directories,
+                                                       checkpoint_lag=engine.concurrency)
+                 for base in bases)
+        
+        self.loading_animation("Neural directory reconnaissance", 4)
+        engine.run(seeds, handle)
+        if engine.soft_not_found.unavailable:
+            self.warning_print(f"No soft-404 baseline for {len(engine.soft_not_found.unavailable)} directories "
+                               f"(every probe failed) - catch-all pages there were not filtered")
+        self.neon_print(f"{engine.stats['requests']} requests over {engine.stats['connections']} connections "
+                        f"({engine.stats['errors']} errors, {engine.stats['soft_404']} soft-404s discarded, "
+                        f"{engine.stats['body_bytes']:,} body bytes read)",
+                        NeonColors.NEON_BLUE)
+        
+        # Check for common sensitive files in root
+        self.check_root_sensitive_files(bases)
+        
+        self.neon_print(f"Directory discovery complete: {len(self.results['directories'])} paths found", NeonColors.NEON_GREEN)
+        
+    def sensitive_file_found(self, file, file_url, response):
+        """Record an exposed sensitive file"""
+        file_info = {
+            'file': file,
+            'url': file_url,
+            'size': response.length,
+            'size_lower_bound': response.size_lower_bound,
+            'content_type': response.header('content-type', 'unknown')
+        }
+        
+        self.results['exposed_files'].append(file_info)
+        
+        # Classify severity based on file type
+        if file in ['.env', 'wp-config.php', 'database.php', 'id_rsa', 'private.key']:
+            severity = 'Critical'
+        elif file in ['config.php', '.git/config', 'backup.sql']:
+            severity = 'High'
+        else:
+            severity = 'Medium'
+            
+        self.collector.add_finding('Sensitive File Exposure', file_url, severity,
+                                   f'Sensitive file exposed: {file}')
+        self.warning_print(f"Sensitive file exposed: {file_url}")
+        
+    def backup_file_found(self, name, backup_url):
+        """Record an accessible backup copy of a discovered path"""
+        self.warning_print(f"Backup file found: {backup_url}")
+        
+        self.collector.add_finding('Backup File Exposure', backup_url, 'Medium',
+                                   f'Backup file accessible: {name}')
+        
+    def check_root_sensitive_files(self, bases=None):
         """Check for sensitive files in root directory"""
         root_files = [
             'robots.txt', 'sitemap.xml', 'security.txt', '.well-known/security.txt',
             'crossdomain.xml', 'clientaccesspolicy.xml', 'humans.txt'
         ]
         
+        bases = self.web_bases() if bases is None else bases
         for file in root_files:
             try:
-                protocols = ['http', 'https']
-                for protocol in protocols:
-                    url = f"{protocol}://{self.target}/{file}"
+                for base in bases:
+                    url = f"{base}/{file}"
                     headers = {'User-Agent': random.choice(self.user_agents)}
-                    response = requests.get(url, timeout=5, headers=headers, verify=False)
+                    response = self.http.get(url, timeout=5, headers=headers, verify=False)
                     
                     if response.status_code == 200:
                         self.success_print(f"Information file found: {url}")
                         
                         # Parse robots.txt for additional paths
                         if file == 'robots.txt':
-                            self.parse_robots_txt(response.text)
+                            self.parse_robots_txt(response.text, base)
                         break
                         
             except:
                 pass
                 
-    def parse_robots_txt(self, robots_content):
+    def parse_robots_txt(self, robots_content, base=None):
         """Parse robots.txt for additional discovery paths"""
+        base = base or f"http://{self.target}"
         try:
             disallow_paths = []
             for line in robots_content.split('\n'):
@@ -870,9 +4008,9 @@ class TarantulaCore:
             # Check accessibility of disallowed paths
             for path in disallow_paths[:20]:  # Limit to first 20
                 try:
-                    url = f"http://{self.target}{path}"
+                    url = f"{base}{path}"
                     headers = {'User-Agent': random.choice(self.user_agents)}
-                    response = requests.get(url, timeout=5, headers=headers, verify=False)
+                    response = self.http.get(url, timeout=5, headers=headers, verify=False)
                     
                     if response.status_code == 200:
                         self.success_print(f"Accessible disallowed path: {path}")
@@ -893,8 +4031,8 @@ class TarantulaCore:
         
         try:
             # Check if nuclei is available
-            result = subprocess.run(['nuclei', '-version'], capture_output=True, text=True)
-            if result.returncode != 0:
+            nuclei_bin = self.resolve_tool('nuclei')
+            if not nuclei_bin:
                 self.error_print("Nuclei not found. Please install: go install -v github.com/projectdiscovery/nuclei/v2/cmd/nuclei@latest")
                 return
                 
@@ -903,18 +4041,19 @@ class TarantulaCore:
             for subdomain in self.results.get('subdomains', []):
                 targets.append(subdomain['subdomain'])
                 
-            # Write targets to file
+            # Write the endpoints that answer to file
+            self.liveness.check_all(targets[:50], self.http, workers=self.http.per_host)  # Limit targets
             targets_file = f"{self.output_dir}/nuclei_targets.txt"
             with open(targets_file, 'w') as f:
-                for target in targets[:50]:  # Limit targets
-                    f.write(f"http://{target}\n")
-                    f.write(f"https://{target}\n")
+                for target in targets[:50]:
+                    for base in self.web_bases(target):
+                        f.write(f"{base}\n")
                     
             # Run nuclei scan
             nuclei_output = f"{self.output_dir}/nuclei/nuclei_results.json"
             
             nuclei_cmd = [
-                'nuclei',
+                nuclei_bin,
                 '-l', targets_file,
                 '-t', 'cves,vulnerabilities,exposures,misconfiguration',
                 '-severity', 'critical,high,medium',
@@ -954,18 +4093,16 @@ class TarantulaCore:
                     try:
                         result = json.loads(line.strip())
                         
-                        vuln = {
-                            'type': f"Nuclei: {result.get('info', {}).get('name', 'Unknown')}",
-                            'target': result.get('host', self.target),
-                            'severity': result.get('info', {}).get('severity', 'Unknown').title(),
-                            'description': result.get('info', {}).get('description', 'No description'),
-                            'matcher_name': result.get('matcher-name', ''),
-                            'template_id': result.get('template-id', ''),
-                            'tool': 'Nuclei'
-                        }
+                        info = result.get('info', {})
+                        vuln = self.collector.add_finding(f"Nuclei: {info.get('name', 'Unknown')}",
+                                                          result.get('host', self.target),
+                                                          info.get('severity', 'Unknown').title(),
+                                                          info.get('description', 'No description'),
+                                                          tool='Nuclei',
+                                                          matcher_name=result.get('matcher-name', ''),
+                                                          template_id=result.get('template-id', ''))
                         
                         nuclei_vulns.append(vuln)
-                        self.results['vulnerabilities'].append(vuln)
                         self.results['nuclei_results'].append(result)
                         
                         # Color code by severity
@@ -994,8 +4131,8 @@ class TarantulaCore:
         
         try:
             # Check if sqlmap is available
-            result = subprocess.run(['sqlmap', '--version'], capture_output=True, text=True)
-            if result.returncode != 0:
+            sqlmap_bin = self.resolve_tool('sqlmap')
+            if not sqlmap_bin:
                 self.error_print("SQLMap not found. Please install sqlmap")
                 return
                 
@@ -1003,12 +4140,12 @@ class TarantulaCore:
             test_urls = []
             
             # Test main domain
-            test_urls.extend([
-                f"http://{self.target}/?id=1",
-                f"https://{self.target}/?id=1",
-                f"http://{self.target}/login.php",
-                f"https://{self.target}/admin.php"
-            ])
+            for base in self.web_bases():
+                test_urls.extend([
+                    f"{base}/?id=1",
+                    f"{base}/login.php",
+                    f"{base}/admin.php"
+                ])
             
             # Test discovered directories with common parameters
             for dir_info in self.results.get('directories', []):
@@ -1029,7 +4166,7 @@ class TarantulaCore:
                     sqlmap_output = f"{self.output_dir}/sqlmap/sqlmap_{hashlib.md5(url.encode()).hexdigest()}.txt"
                     
                     sqlmap_cmd = [
-                        'sqlmap',
+                        sqlmap_bin,
                         '-u', url,
                         '--batch',
                         '--random-agent',
@@ -1044,16 +4181,11 @@ class TarantulaCore:
                     
                     # Parse sqlmap output for vulnerabilities
                     if 'Parameter:' in result.stdout and 'is vulnerable' in result.stdout:
-                        vuln = {
-                            'type': 'SQL Injection',
-                            'target': url,
-                            'severity': 'Critical',
-                            'description': f'SQL injection vulnerability found in {url}',
-                            'tool': 'SQLMap'
-                        }
+                        vuln = self.collector.add_finding('SQL Injection', url, 'Critical',
+                                                          f'SQL injection vulnerability found in {url}',
+                                                          tool='SQLMap')
                         
                         sqlmap_results.append(vuln)
-                        self.results['vulnerabilities'].append(vuln)
                         self.results['sqlmap_results'].append({
                             'url': url,
                             'output': result.stdout
@@ -1085,33 +4217,25 @@ class TarantulaCore:
         
         try:
             # Check if wpscan is available
-            result = subprocess.run(['wpscan', '--version'], capture_output=True, text=True)
-            if result.returncode != 0:
+            wpscan_bin = self.resolve_tool('wpscan')
+            if not wpscan_bin:
                 self.error_print("WPScan not found. Please install: gem install wpscan")
                 return
                 
-            # Prepare URLs to scan
-            wordpress_urls = []
+            # Prepare URLs to scan: main domain, then subdomains, probing hosts only until 5 live URLs are found
+            hosts = [self.target] + [subdomain['subdomain'] for subdomain in self.results.get('subdomains', [])]
+            wordpress_urls = itertools.chain.from_iterable(self.web_bases(host) for host in hosts)
             
-            # Check main domain
-            for protocol in ['http', 'https']:
-                wordpress_urls.append(f"{protocol}://{self.target}")
-                
-            # Check subdomains
-            for subdomain in self.results.get('subdomains', []):
-                for protocol in ['http', 'https']:
-                    wordpress_urls.append(f"{protocol}://{subdomain['subdomain']}")
-                    
             wpscan_results = []
             
-            for url in wordpress_urls[:5]:  # Limit to first 5 URLs
+            for url in itertools.islice(wordpress_urls, 5):  # Limit to first 5 URLs
                 try:
                     self.neon_print(f"WPScan analysis on: {url}", NeonColors.NEON_BLUE)
                     
                     wpscan_output = f"{self.output_dir}/wpscan/wpscan_{hashlib.md5(url.encode()).hexdigest()}.json"
                     
                     wpscan_cmd = [
-                        'wpscan',
+                        wpscan_bin,
                         '--url', url,
                         '--format', 'json',
                         '--output', wpscan_output,
@@ -1150,16 +4274,10 @@ class TarantulaCore:
             # Parse vulnerabilities
             if 'vulnerabilities' in wpscan_data:
                 for vuln in wpscan_data['vulnerabilities']:
-                    vuln_info = {
-                        'type': f"WordPress: {vuln.get('title', 'Unknown Vulnerability')}",
-                        'target': url,
-                        'severity': 'High',  # Default to High for WordPress vulns
-                        'description': vuln.get('title', 'WordPress vulnerability detected'),
-                        'references': vuln.get('references', {}),
-                        'tool': 'WPScan'
-                    }
-                    
-                    self.results['vulnerabilities'].append(vuln_info)
+                    # Default to High for WordPress vulns
+                    self.collector.add_finding(f"WordPress: {vuln.get('title', 'Unknown Vulnerability')}", url, 'High',
+                                               vuln.get('title', 'WordPress vulnerability detected'),
+                                               tool='WPScan', references=vuln.get('references', {}))
                     self.warning_print(f"WordPress vulnerability: {vuln.get('title', 'Unknown')}")
                     
             # Parse version information
@@ -1181,15 +4299,9 @@ class TarantulaCore:
                 for plugin_name, plugin_data in plugins.items():
                     if 'vulnerabilities' in plugin_data:
                         for vuln in plugin_data['vulnerabilities']:
-                            vuln_info = {
-                                'type': f"WordPress Plugin: {plugin_name}",
-                                'target': url,
-                                'severity': 'Medium',
-                                'description': f"Plugin vulnerability in {plugin_name}: {vuln.get('title', 'Unknown')}",
-                                'tool': 'WPScan'
-                            }
-                            
-                            self.results['vulnerabilities'].append(vuln_info)
+                            self.collector.add_finding(f"WordPress Plugin: {plugin_name}", url, 'Medium',
+                                                       f"Plugin vulnerability in {plugin_name}: {vuln.get('title', 'Unknown')}",
+                                                       tool='WPScan')
                             self.warning_print(f"Plugin vulnerability: {plugin_name}")
                             
             # Parse themes
@@ -1198,15 +4310,9 @@ class TarantulaCore:
                 for theme_name, theme_data in themes.items():
                     if 'vulnerabilities' in theme_data:
                         for vuln in theme_data['vulnerabilities']:
-                            vuln_info = {
-                                'type': f"WordPress Theme: {theme_name}",
-                                'target': url,
-                                'severity': 'Medium',
-                                'description': f"Theme vulnerability in {theme_name}: {vuln.get('title', 'Unknown')}",
-                                'tool': 'WPScan'
-                            }
-                            
-                            self.results['vulnerabilities'].append(vuln_info)
+                            self.collector.add_finding(f"WordPress Theme: {theme_name}", url, 'Medium',
+                                                       f"Theme vulnerability in {theme_name}: {vuln.get('title', 'Unknown')}",
+                                                       tool='WPScan')
                             self.warning_print(f"Theme vulnerability: {theme_name}")
                             
         except Exception as e:
@@ -1222,7 +4328,7 @@ class TarantulaCore:
         
         # Try to import wafw00f
         try:
-            from wafw00f.main import WAFW00F
+            WAFW00F = wafw00f_main.WAFW00F
             wafw00f_available = True
         except ImportError:
             wafw00f_available = False
@@ -1233,8 +4339,8 @@ class TarantulaCore:
         # Use wafw00f if available
         if wafw00f_available:
             try:
-                for protocol in ['http', 'https']:
-                    url = f"{protocol}://{self.target}"
+                for url in self.web_bases():
+                    protocol = url.split('://', 1)[0]
                     
                     # Initialize wafw00f
                     waf_detector = WAFW00F(url)
@@ -1259,8 +4365,6 @@ class TarantulaCore:
         # WAF bypass techniques
         if detected_wafs:
             self.attempt_waf_bypass(detected_wafs)
-        else:
-            self.custom_waf_detection()
             
         self.results['waf_detection'] = {
             'detected_wafs': detected_wafs,
@@ -1298,11 +4402,11 @@ class TarantulaCore:
             
             for payload in test_payloads:
                 try:
-                    for protocol in ['http', 'https']:
-                        url = f"{protocol}://{self.target}{payload}"
+                    for base in self.web_bases():
+                        url = f"{base}{payload}"
                         headers = {'User-Agent': random.choice(self.user_agents)}
                         
-                        response = requests.get(url, timeout=10, headers=headers, verify=False)
+                        response = self.http.get(url, timeout=10, headers=headers, verify=False)
                         
                         # Check headers for WAF signatures
                         response_headers = str(response.headers).lower()
@@ -1360,11 +4464,11 @@ class TarantulaCore:
         
         for technique in bypass_techniques:
             try:
-                for protocol in ['http', 'https']:
-                    url = f"{protocol}://{self.target}{technique}"
+                for base in self.web_bases():
+                    url = f"{base}{technique}"
                     headers = {'User-Agent': random.choice(self.user_agents)}
                     
-                    response = requests.get(url, timeout=10, headers=headers, verify=False)
+                    response = self.http.get(url, timeout=10, headers=headers, verify=False)
                     
                     # Check if bypass was successful (status 200 without WAF block message)
                     if response.status_code == 200:
@@ -1442,7 +4546,7 @@ class TarantulaCore:
             
             for source in sources:
                 try:
-                    response = requests.get(source, timeout=10)
+                    response = self.http.get(source, timeout=10)
                     if response.status_code == 200 and 'No records found' not in response.text:
                         # Parse IP addresses from response
                         ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
@@ -1507,10 +4611,9 @@ class TarantulaCore:
                 'X-Cluster-Client-IP', 'X-Client-IP', 'Client-IP'
             ]
             
-            for protocol in ['http', 'https']:
+            for url in self.web_bases():
                 try:
-                    url = f"{protocol}://{self.target}"
-                    response = requests.get(url, timeout=10, verify=False)
+                    response = self.http.get(url, timeout=10, verify=False)
                     
                     for header in ip_headers:
                         if header in response.headers:
@@ -1543,7 +4646,10 @@ class TarantulaCore:
                     mx_host = mx_record.split()[-1].rstrip('.')
                     
                     # Resolve MX host IP
-                    mx_ip = socket.gethostbyname(mx_host)
+                    answer = DNS_CACHE.resolve(mx_host)
+                    if not answer.resolved:
+                        continue
+                    mx_ip = answer.records[0]
                     ips.append(mx_ip)
                     
                     self.neon_print(f"Mail server IP: {mx_ip} ({mx_host})", NeonColors.NEON_BLUE)
@@ -1556,26 +4662,30 @@ class TarantulaCore:
             
         return ips
         
+    CLOUDFLARE_RANGES = [
+        '173.245.48.0/20', '103.21.244.0/22', '103.22.200.0/22',
+        '103.31.4.0/22', '141.101.64.0/18', '108.162.192.0/18',
+        '190.93.240.0/20', '188.114.96.0/20', '197.234.240.0/22',
+        '198.41.128.0/17', '162.158.0.0/15', '104.16.0.0/12'
+    ]
+    _cloudflare_networks = None
+    
     def filter_cloudflare_ips(self, ips):
         """Filter out known Cloudflare IP ranges"""
-        cloudflare_ranges = [
-            '173.245.48.0/20', '103.21.244.0/22', '103.22.200.0/22',
-            '103.31.4.0/22', '141.101.64.0/18', '108.162.192.0/18',
-            '190.93.240.0/20', '188.114.96.0/20', '197.234.240.0/22',
-            '198.41.128.0/17', '162.158.0.0/15', '104.16.0.0/12'
-        ]
-        
+        if TarantulaCore._cloudflare_networks is None:
+            TarantulaCore._cloudflare_networks = [ipaddress.ip_network(cf_range)
+                                                  for cf_range in self.CLOUDFLARE_RANGES]
+            
         filtered_ips = []
         
         for ip in ips:
             is_cloudflare = False
             
             try:
-                import ipaddress
                 ip_obj = ipaddress.ip_address(ip)
                 
-                for cf_range in cloudflare_ranges:
-                    if ip_obj in ipaddress.ip_network(cf_range):
+                for cf_network in TarantulaCore._cloudflare_networks:
+                    if ip_obj in cf_network:
                         is_cloudflare = True
                         break
                         
@@ -1602,14 +4712,16 @@ class TarantulaCore:
                     'User-Agent': random.choice(self.user_agents)
                 }
                 
-                for protocol in ['http', 'https']:
+                for url in self.web_bases(ip):
                     try:
-                        url = f"{protocol}://{ip}"
-                        response = requests.get(url, headers=headers, timeout=10, verify=False)
+                        protocol = url.split('://', 1)[0]
+                        response = self.http.get(url, headers=headers, timeout=10, verify=False)
                         
                         if response.status_code == 200:
-                            # Check if content matches main site
-                            main_response = requests.get(f"{protocol}://{self.target}", timeout=10, verify=False)
+                            # Check if content matches main site on the same scheme
+                            main_url = next((base for base in self.web_bases() if base.startswith(f"{protocol}://")),
+                                            f"{protocol}://{self.target}")
+                            main_response = self.http.get(main_url, timeout=10, verify=False)
                             
                             # Simple content comparison
                             if len(response.content) > 0 and abs(len(response.content) - len(main_response.content)) < 1000:
@@ -1628,15 +4740,12 @@ class TarantulaCore:
     def cloudscraper_integration(self):
         """Integrate cloudscraper for Cloudflare bypass"""
         try:
-            import cloudscraper
+            scraper = self.http.scraper
             
             self.neon_print("Attempting Cloudflare bypass with cloudscraper", NeonColors.NEON_BLUE)
             
-            scraper = cloudscraper.create_scraper()
-            
-            for protocol in ['http', 'https']:
+            for url in self.web_bases():
                 try:
-                    url = f"{protocol}://{self.target}"
                     response = scraper.get(url, timeout=15)
                     
                     if response.status_code == 200:
@@ -1686,7 +4795,6 @@ class TarantulaCore:
             for query in fofa_queries:
                 try:
                     # Encode query
-                    import base64
                     encoded_query = base64.b64encode(query.encode()).decode()
                     
                     # FOFA API URL
@@ -1699,7 +4807,7 @@ class TarantulaCore:
                         'fields': 'host,ip,port,protocol,country,os,server,title'
                     }
                     
-                    response = requests.get(api_url, params=params, timeout=15)
+                    response = self.http.get(api_url, params=params, timeout=15)
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -1765,8 +4873,6 @@ class TarantulaCore:
             return
             
         try:
-            import shodan
-            
             api = shodan.Shodan(self.api_keys['shodan'])
             
             # Search for target
@@ -1809,15 +4915,9 @@ class TarantulaCore:
                 
                 # Report vulnerabilities found by Shodan
                 for vuln_id in result.get('vulns', []):
-                    vuln = {
-                        'type': f'Shodan CVE: {vuln_id}',
-                        'target': f"{result.get('ip_str', '')}:{result.get('port', '')}",
-                        'severity': 'High',
-                        'description': f'CVE {vuln_id} detected by Shodan',
-                        'tool': 'Shodan'
-                    }
-                    
-                    self.results['vulnerabilities'].append(vuln)
+                    self.collector.add_finding(f'Shodan CVE: {vuln_id}',
+                                               f"{result.get('ip_str', '')}:{result.get('port', '')}", 'High',
+                                               f'CVE {vuln_id} detected by Shodan', tool='Shodan')
                     self.warning_print(f"Shodan CVE: {vuln_id}")
                     
             self.results['shodan_data'] = {
@@ -1867,37 +4967,115 @@ class TarantulaCore:
         # Check tool dependencies
         self.check_tool_dependencies()
         
-        enterprise_modules = [
-            ("Advanced Subdomain Discovery", self.advanced_subdomain_discovery),
-            ("Enhanced Port Scanning", self.enhanced_port_scanning),
-            ("Directory & File Discovery", self.directory_file_discovery),
-            ("DNS Intelligence Gathering", self.comprehensive_dns_enum),
-            ("HTTP Analysis & Fingerprinting", self.advanced_http_analysis),
-            ("WAF Detection & Bypass", self.waf_detection_bypass),
-            ("Cloudflare Real IP Discovery", self.cloudflare_real_ip_discovery),
-            ("FOFA Cyber Space Mapping", self.fofa_cyberspace_mapping),
-            ("Shodan Attack Surface Intel", self.shodan_attack_surface_intel),
-            ("Nuclei Vulnerability Scan", self.nuclei_vulnerability_scan),
-            ("SQLMap Injection Testing", self.sqlmap_injection_testing),
-            ("WPScan WordPress Analysis", self.wpscan_wordpress_analysis),
-            ("SSL/TLS Security Assessment", self.ssl_tls_vulnerability_check),
-            ("Email & Social OSINT", self.email_social_osint),
-            ("Domain Reputation Analysis", self.domain_reputation_check)
+        self.run_module_graph(self.enterprise_modules())
+            
+        self.success_print("🔥 ENTERPRISE SCAN COMPLETED 🔥")
+        self.save_scan_to_db()
+        
+    def enterprise_modules(self):
+        """Module registry: (key, name, function, consumes, produces)
+        
+        consumes/produces are keys of self.results. A module is started as soon
+        as every module producing something it consumes has finished.
+        """
+        return [
+            ('subdomains', "Advanced Subdomain Discovery", self.advanced_subdomain_discovery,
+             (), ('subdomains',)),
+            ('ports', "Enhanced Port Scanning", self.enhanced_port_scanning,
+             ('subdomains',), ('ports', 'port_changes')),
+            ('live', "Web Liveness Probe", self.web_liveness_probe,
+             (), ('web_endpoints',)),
+            ('directories', "Directory & File Discovery", self.directory_file_discovery,
+             ('web_endpoints',), ('directories', 'exposed_files')),
+            ('dns', "DNS Intelligence Gathering", self.comprehensive_dns_enum,
+             ('subdomains',), ('dns_records', 'dns_inventory')),
+            ('http', "HTTP Analysis & Fingerprinting", self.advanced_http_analysis,
+             ('ports', 'web_endpoints'), ('tech_stack', 'security_headers', 'cms_info')),
+            ('waf', "WAF Detection & Bypass", self.waf_detection_bypass,
+             ('web_endpoints',), ('waf_detection',)),
+            ('realip', "Cloudflare Real IP Discovery", self.cloudflare_real_ip_discovery,
+             ('subdomains', 'dns_records', 'web_endpoints'), ('real_ip', 'cloudflare_bypass')),
+            ('fofa', "FOFA Cyber Space Mapping", self.fofa_cyberspace_mapping,
+             (), ('fofa_intelligence',)),
+            ('shodan', "Shodan Attack Surface Intel", self.shodan_attack_surface_intel,
+             ('real_ip',), ('shodan_data',)),
+            ('nuclei', "Nuclei Vulnerability Scan", self.nuclei_vulnerability_scan,
+             ('subdomains', 'tech_stack', 'web_endpoints'), ('nuclei_results',)),
+            ('sqlmap', "SQLMap Injection Testing", self.sqlmap_injection_testing,
+             ('directories', 'web_endpoints'), ('sqlmap_results',)),
+            ('wpscan', "WPScan WordPress Analysis", self.wpscan_wordpress_analysis,
+             ('subdomains', 'tech_stack', 'cms_info', 'web_endpoints'), ('wpscan_results',)),
+            ('ssl', "SSL/TLS Security Assessment", self.ssl_tls_vulnerability_check,
+             (), ('ssl_info',)),
+            ('osint', "Email & Social OSINT", self.email_social_osint,
+             (), ('emails', 'social_media')),
+            ('reputation', "Domain Reputation Analysis", self.domain_reputation_check,
+             (), ('reputation',))
         ]
         
-        for module_name, module_func in enterprise_modules:
+    def run_module_graph(self, modules, max_workers=None):
+        """Run modules concurrently, respecting their consumes/produces edges
+        
+        Inputs that no module in the set produces are treated as already
+        available, so any subset of the registry can be scheduled. A failed
+        module still releases its dependants, which then run on whatever
+        results exist - the same behaviour as the old sequential loop.
+        """
+        producers = {}
+        for key, _, _, _, produces in modules:
+            for output in produces:
+                producers.setdefault(output, set()).add(key)
+                
+        waiting_on = {}
+        for key, _, _, consumes, _ in modules:
+            waiting_on[key] = set()
+            for needed in consumes:
+                waiting_on[key] |= producers.get(needed, set()) - {key}
+                
+        by_key = {module[0]: module for module in modules}
+        pending = [module[0] for module in modules]
+        timings = {}
+        
+        def execute(key):
+            _, module_name, module_func, _, _ = by_key[key]
             self.neon_print(f"Enterprise module executing: {module_name}", NeonColors.NEON_BLUE)
+            started = time.time()
             try:
                 module_func()
             except Exception as e:
                 self.error_print(f"{module_name} failed: {str(e)}")
-            print()
-            
-        self.success_print("🔥 ENTERPRISE SCAN COMPLETED 🔥")
-        self.save_scan_to_db()
+            timings[key] = time.time() - started
+            
+        with ThreadPoolExecutor(max_workers=max_workers or len(modules) or 1) as executor:
+            running = {}
+            while pending or running:
+                for key in [k for k in pending if not waiting_on[k]]:
+                    pending.remove(key)
+                    running[executor.submit(execute, key)] = key
+                    
+                if not running:
+                    # Only reachable with a dependency cycle - release what is left
+                    for key in pending:
+                        waiting_on[key] = set()
+                    continue
+                    
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished = running.pop(future)
+                    for key in pending:
+                        waiting_on[key].discard(finished)
+                        
+        self.neon_print(f"Module graph finished: {len(modules)} modules, "
+                        f"{sum(timings.values()):.1f}s of module time", NeonColors.NEON_BLUE)
+        return timings
         
     def comprehensive_dns_enum(self):
-        """Comprehensive DNS enumeration"""
+        """Comprehensive DNS enumeration
+        
+        Every record type for the target and all discovered subdomains goes
+        out as one concurrent batch through the DNS engine, while zone
+        transfer and DNSSEC checks run alongside it in worker threads.
+        """
         if not self.target:
             self.error_print("No target set!")
             return
@@ -1905,34 +5083,37 @@ class TarantulaCore:
         self.neon_print(f"Comprehensive DNS intelligence for {self.target}", NeonColors.NEON_GREEN)
         
         record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'CNAME', 'SOA', 'PTR', 'SRV', 'CAA']
-        dns_info = {}
-        
-        for record_type in record_types:
-            try:
-                answers = dns.resolver.resolve(self.target, record_type)
-                dns_info[record_type] = []
-                
-                for answer in answers:
-                    record_data = str(answer)
-                    dns_info[record_type].append(record_data)
-                    self.success_print(f"{record_type}: {record_data}")
-                    
-                    # Extract intelligence from DNS records
-                    if record_type == 'TXT':
-                        self.analyze_txt_records(record_data)
-                    elif record_type == 'MX':
-                        self.analyze_mx_records(record_data)
-                        
-            except:
-                dns_info[record_type] = []
+        names = list(dict.fromkeys([self.target] + [sub['subdomain'] for sub in self.results.get('subdomains', [])]))
+        inventory = {name: {} for name in names}
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            executor.submit(self.check_dnssec)
+            
+            def collect(answer):
+                if not answer.records:
+                    return
+                inventory[answer.name][answer.rdtype] = answer.records
+                # Zone transfers start as soon as the apex NS set is known
+                if answer.name == self.target and answer.rdtype == 'NS':
+                    executor.submit(self.check_zone_transfer, answer.records)
+                    
+            self.resolve_names(((name, record_type) for name in names for record_type in record_types), collect,
+                               filter_wildcards=False)
+            
+        dns_info = {record_type: inventory[self.target].get(record_type, []) for record_type in record_types}
+        for record_type, records in dns_info.items():
+            for record_data in records:
+                self.success_print(f"{record_type}: {record_data}")
                 
-        # Check for zone transfer vulnerability
-        self.check_zone_transfer()
-        
-        # Check DNSSEC
-        self.check_dnssec()
-        
+                # Extract intelligence from DNS records
+                if record_type == 'TXT':
+                    self.analyze_txt_records(record_data)
+                elif record_type == 'MX':
+                    self.analyze_mx_records(record_data)
+                    
         self.results['dns_records'] = dns_info
+        self.results['dns_inventory'] = {name: records for name, records in inventory.items() if records}
+        self.neon_print(f"DNS records collected for {len(self.results['dns_inventory'])}/{len(names)} names", NeonColors.NEON_BLUE)
         
     def analyze_txt_records(self, txt_record):
         """Analyze TXT records for intelligence"""
@@ -1957,33 +5138,32 @@ class TarantulaCore:
                 self.neon_print(f"Mail service: {service}", NeonColors.NEON_BLUE)
                 break
                 
-    def check_zone_transfer(self):
-        """Check for DNS zone transfer vulnerability"""
-        try:
-            ns_records = dns.resolver.resolve(self.target, 'NS')
-            for ns in ns_records:
-                try:
-                    zone = dns.zone.from_xfr(dns.query.xfr(str(ns), self.target))
-                    if zone:
-                        vuln = {
-                            'type': 'DNS Zone Transfer',
-                            'target': str(ns),
-                            'severity': 'High',
-                            'description': f'Zone transfer enabled on {ns}',
-                            'tool': 'TARANTULA'
-                        }
-                        self.results['vulnerabilities'].append(vuln)
-                        self.warning_print(f"Zone transfer vulnerability: {ns}")
-                except:
-                    pass
-        except:
-            pass
+    def check_zone_transfer(self, ns_records=None):
+        """Check for DNS zone transfer vulnerability against every NS concurrently"""
+        if ns_records is None:
+            ns_records = DNS_CACHE.resolve(self.target, 'NS').records
+            
+        def try_transfer(ns):
+            try:
+                # AXFR needs the nameserver's address, not its hostname
+                ns_ip = DNS_CACHE.resolve(ns).records[0]
+                zone = dns_zone.from_xfr(dns_query.xfr(ns_ip, self.target, lifetime=15))
+                if zone:
+                    self.collector.add_finding('DNS Zone Transfer', str(ns), 'High',
+                                               f'Zone transfer enabled on {ns}')
+                    self.warning_print(f"Zone transfer vulnerability: {ns}")
+            except:
+                pass
+                
+        if ns_records:
+            with ThreadPoolExecutor(max_workers=len(ns_records)) as executor:
+                list(executor.map(try_transfer, ns_records))
             
     def check_dnssec(self):
         """Check DNSSEC implementation"""
         try:
-            response = dns.resolver.resolve(self.target, 'DNSKEY')
-            if response:
+            response = DNS_CACHE.resolve(self.target, 'DNSKEY')
+            if response.resolved:
                 self.success_print("DNSSEC implemented")
             else:
                 self.warning_print("DNSSEC not implemented")
@@ -2000,23 +5180,17 @@ class TarantulaCore:
         
         # Use cloudscraper for Cloudflare bypass
         try:
-            import cloudscraper
-            scraper = cloudscraper.create_scraper()
+            scraper = self.http.scraper
         except ImportError:
-            scraper = requests.Session()
+            scraper = self.http
             self.warning_print("cloudscraper not available - using standard requests")
             
-        protocols = ['http', 'https']
-        
-        for protocol in protocols:
+        for url in self.web_bases():
+            protocol = url.split('://', 1)[0]
             try:
-                url = f"{protocol}://{self.target}"
                 headers = {'User-Agent': random.choice(self.user_agents)}
                 
-                if hasattr(scraper, 'get'):
-                    response = scraper.get(url, timeout=15, headers=headers, verify=False)
-                else:
-                    response = requests.get(url, timeout=15, headers=headers, verify=False)
+                response = scraper.get(url, timeout=15, headers=headers, verify=False)
                 
                 # Analyze security headers
                 self.analyze_security_headers(response.headers, protocol)
@@ -2054,14 +5228,8 @@ class TarantulaCore:
                 
                 # Create vulnerability for missing critical headers
                 if header in ['Strict-Transport-Security', 'Content-Security-Policy']:
-                    vuln = {
-                        'type': 'Missing Security Header',
-                        'target': f"{protocol}://{self.target}",
-                        'severity': 'Medium',
-                        'description': f'Missing {description} header',
-                        'tool': 'TARANTULA'
-                    }
-                    self.results['vulnerabilities'].append(vuln)
+                    self.collector.add_finding('Missing Security Header', f"{protocol}://{self.target}", 'Medium',
+                                               f'Missing {description} header')
                     
                 self.warning_print(f"Missing: {description}")
                 
@@ -2187,14 +5355,8 @@ class TarantulaCore:
                 break
                 
         for misconfig in misconfigs:
-            vuln = {
-                'type': 'Security Misconfiguration',
-                'target': f"{protocol}://{self.target}",
-                'severity': 'Medium',
-                'description': misconfig,
-                'tool': 'TARANTULA'
-            }
-            self.results['vulnerabilities'].append(vuln)
+            self.collector.add_finding('Security Misconfiguration', f"{protocol}://{self.target}", 'Medium',
+                                       misconfig)
             self.warning_print(f"Misconfiguration: {misconfig}")
             
     def ssl_tls_vulnerability_check(self):
@@ -2230,25 +5392,13 @@ class TarantulaCore:
                     # Check for vulnerabilities
                     weak_ciphers = ['RC4', 'DES', '3DES', 'MD5']
                     if cipher and any(weak in cipher[0] for weak in weak_ciphers):
-                        vuln = {
-                            'type': 'Weak SSL Cipher',
-                            'target': f"{self.target}:443",
-                            'severity': 'Medium',
-                            'description': f'Weak cipher: {cipher[0]}',
-                            'tool': 'TARANTULA'
-                        }
-                        self.results['vulnerabilities'].append(vuln)
+                        self.collector.add_finding('Weak SSL Cipher', f"{self.target}:443", 'Medium',
+                                                   f'Weak cipher: {cipher[0]}')
                         
                     # Check protocol version
                     if version in ['SSLv2', 'SSLv3', 'TLSv1', 'TLSv1.1']:
-                        vuln = {
-                            'type': 'Outdated SSL Protocol',
-                            'target': f"{self.target}:443",
-                            'severity': 'High',
-                            'description': f'Outdated protocol: {version}',
-                            'tool': 'TARANTULA'
-                        }
-                        self.results['vulnerabilities'].append(vuln)
+                        self.collector.add_finding('Outdated SSL Protocol', f"{self.target}:443", 'High',
+                                                   f'Outdated protocol: {version}')
                         
                     self.results['ssl_info'] = ssl_info
                     self.success_print(f"SSL/TLS analysis complete - Protocol: {version}")
@@ -2291,7 +5441,7 @@ class TarantulaCore:
         for platform, url in social_platforms.items():
             try:
                 headers = {'User-Agent': random.choice(self.user_agents)}
-                response = requests.get(url, timeout=10, headers=headers)
+                response = self.http.get(url, timeout=10, headers=headers)
                 
                 if response.status_code == 200:
                     social_results[platform] = 'Profile found'
@@ -2331,19 +5481,23 @@ class TarantulaCore:
             cursor.execute('''
                 INSERT INTO scans (target, scan_mode, timestamp, results)
                 VALUES (?, ?, ?, ?)
-            ''', (self.target, self.scan_mode, datetime.now().isoformat(), json.dumps(self.results)))
+            ''', (self.target, self.scan_mode, datetime.now().isoformat(), json.dumps(self.results, default=record_to_json)))
             
             # Save vulnerabilities
             for vuln in self.results.get('vulnerabilities', []):
                 cursor.execute('''
-                    INSERT INTO vulnerabilities (target, vuln_type, severity, description, tool, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    INSERT INTO vulnerabilities (target, vuln_type, severity, description, tool, timestamp, occurrences)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (vuln.get('target', self.target), vuln['type'], vuln['severity'], 
-                     vuln['description'], vuln.get('tool', 'TARANTULA'), datetime.now().isoformat()))
+                     vuln['description'], vuln.get('tool', 'TARANTULA'), datetime.now().isoformat(),
+                     vuln.get('occurrences', 1)))
             
             conn.commit()
             conn.close()
             
+            if self.persist_dns_cache:
+                DNS_CACHE.save(self.dns_cache_file)
+                
             self.success_print("Scan results saved to database")
             
         except Exception as e:
@@ -2373,7 +5527,7 @@ class TarantulaCore:
             f.write(html_report)
             
         with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(json_report, f, indent=2)
+            json.dump(json_report, f, indent=2, default=record_to_json)
             
         with open(summary_file, 'w', encoding='utf-8') as f:
             f.write(executive_summary)
@@ -2546,6 +5700,7 @@ class TarantulaCore:
                         <p><strong>Target:</strong> {vuln.get('target', 'N/A')}</p>
                         <p><strong>Tool:</strong> {vuln.get('tool', 'TARANTULA')}</p>
                         <p><strong>Description:</strong> {vuln['description']}</p>
+                        {f"<p><strong>Occurrences:</strong> {vuln.get('occurrences', 1)}</p>" if vuln.get('occurrences', 1) > 1 else ''}
                     </div>
                     '''
                     
@@ -2567,9 +5722,10 @@ class TarantulaCore:
         # Open ports
         if self.results.get('ports'):
             html += '<h3>🔌 Open Services</h3>'
-            html += '<table><tr><th>Port</th><th>Service</th><th>Version</th><th>Banner</th></tr>'
+            html += '<table><tr><th>IP</th><th>Port</th><th>Service</th><th>Version</th><th>Banner</th></tr>'
             for port in self.results['ports'][:15]:  # Limit to 15
                 html += f"""<tr>
+                    <td>{port.get('ip') or self.target}</td>
                     <td>{port.get('port', 'N/A')}</td>
                     <td>{port.get('service', 'N/A')}</td>
                     <td>{port.get('version', 'N/A')}</td>
@@ -2817,6 +5973,7 @@ Author: Scav-engeR | Framework: Advanced Python3 + Integrated Security Tools
             
         print(f"\n{NeonColors.NEON_GREEN}Output Directory:{NeonColors.RESET} {self.output_dir}")
         print(f"{NeonColors.NEON_GREEN}Database Path:{NeonColors.RESET} {self.db_path}")
+        print(f"{NeonColors.NEON_GREEN}Workspace:{NeonColors.RESET} {self.workspace_dir}")
         
     def run(self):
         """Main execution loop"""
@@ -2884,8 +6041,395 @@ Author: Scav-engeR | Framework: Advanced Python3 + Integrated Security Tools
             print(f"\n{NeonColors.RED}[!] Neural network interrupted by user{NeonColors.RESET}")
         except Exception as e:
             print(f"\n{NeonColors.RED}[!] Fatal system error: {str(e)}{NeonColors.RESET}")
+            
+    def run_headless(self, target, module_keys, out_path):
+        """Non-interactive scan: no banner, spinners or prompts, JSON results out"""
+        self.interactive = False
+        self.log_stream = sys.stderr
+        self.scan_mode = "batch"
+        self.apply_target(target)
+        
+        registry = self.enterprise_modules()
+        if 'all' in module_keys:
+            selected = registry
+        else:
+            known = {module[0] for module in registry}
+            unknown = [key for key in module_keys if key not in known]
+            if unknown:
+                self.error_print(f"Unknown module(s): {', '.join(unknown)} "
+                                 f"(available: {', '.join(sorted(known))}, all)")
+                return 2
+            selected = [module for module in registry if module[0] in module_keys]
+            
+        self.run_module_graph(selected)
+        self.save_scan_to_db()
+        
+        report = self.create_json_report()
+        report['modules'] = [module[0] for module in selected]
+        if out_path == '-':
+            json.dump(report, sys.stdout, indent=2, default=record_to_json)
+            sys.stdout.write('\n')
+        else:
+            with open(out_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, default=record_to_json)
+            self.success_print(f"Results written to {out_path}")
+        return 0
+        
 
-if __name__ == "__main__":
+# Integrations that must not be imported just by loading this module
+LAZY_INTEGRATIONS = ['requests', 'urllib3', 'dns', 'cloudscraper', 'shodan', 'wafw00f', 'colorama', 'yaml']
+
+def bench_startup(args):
+    """Cold-start benchmark: spawn fresh interpreters and enforce a time budget"""
+    script = os.path.abspath(__file__)
+    timings = []
+    
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, script, '--version'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - started)
+        
+    probe = (f"import sys; sys.path.insert(0, {os.path.dirname(script)!r}); "
+             f"import {os.path.splitext(os.path.basename(script))[0]}; "
+             f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules}} & set({LAZY_INTEGRATIONS!r}))))")
+    eager = subprocess.run([sys.executable, '-c', probe], capture_output=True,
+                           text=True, check=True).stdout.strip()
+    
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"startup: median {median * 1000:.1f} ms, best {timings[0] * 1000:.1f} ms, "
+          f"worst {timings[-1] * 1000:.1f} ms over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+    
+    failed = False
+    if eager:
+        print(f"FAIL: integrations imported at startup: {eager}")
+        failed = True
+    if median > args.budget:
+        print("FAIL: startup budget exceeded")
+        failed = True
+    return 1 if failed else 0
+
+class StandInResolver(asyncio.DatagramProtocol):
+    """Minimal authoritative stand-in for benchmarks: every A query -> 127.0.0.1"""
+    def connection_made(self, transport):
+        self.transport = transport
+        
+    def datagram_received(self, data, addr):
+        end = 12
+        while end < len(data) and data[end]:
+            end += data[end] + 1
+        question = data[12:end + 5]
+        if question[-4:-2] == b'\x00\x01':
+            answer = b'\xc0\x0c\x00\x01\x00\x01\x00\x00\x00\x3c\x00\x04\x7f\x00\x00\x01'
+            header = data[:2] + b'\x81\x80\x00\x01\x00\x01\x00\x00\x00\x00'
+        else:
+            answer = b''
+            header = data[:2] + b'\x81\x80\x00\x01\x00\x00\x00\x00\x00\x00'
+        self.transport.sendto(header + question + answer, addr)
+        
+class StandInHTTPServer(asyncio.Protocol):
+    """Keep-alive HTTP/1.1 stand-in for benchmarks: /hit* -> 200, anything else -> 404"""
+    FOUND = b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 5\r\n\r\nfound'
+    NOT_FOUND = b'HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\nContent-Length: 9\r\n\r\nnot found'
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        self.buffer = b''
+        
+    def data_received(self, data):
+        self.buffer += data
+        while True:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                return
+            request, self.buffer = self.buffer[:end], self.buffer[end + 4:]
+            method, path = request.split(b' ', 2)[:2]
+            response = self.FOUND if path.startswith(b'/hit') else self.NOT_FOUND
+            if method == b'HEAD':
+                response = response[:response.index(b'\r\n\r\n') + 4]
+            self.transport.write(response)
+            
+def _serve_standin(protocol_factory, count, ports, ready):
+    async def serve():
+        loop = asyncio.get_running_loop()
+        for _ in range(count):
+            if issubclass(protocol_factory, asyncio.DatagramProtocol):
+                transport, _ = await loop.create_datagram_endpoint(protocol_factory, local_addr=('127.0.0.1', 0))
+                ports.put(transport.get_extra_info('sockname')[1])
+            else:
+                server = await loop.create_server(protocol_factory, '127.0.0.1', 0)
+                ports.put(server.sockets[0].getsockname()[1])
+        ready.set()
+        await asyncio.Event().wait()
+        
+    asyncio.run(serve())
+    
+def start_standin_servers(protocol_factory, count=1):
+    """Run stand-in servers in a child process; returns (process, ports)"""
+    import multiprocessing
+    
+    ports = multiprocessing.Queue()
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=_serve_standin, args=(protocol_factory, count, ports, ready),
+                                      daemon=True)
+    process.start()
+    ready.wait(10)
+    return process, [ports.get(timeout=5) for _ in range(count)]
+    
+def bench_dns(args):
+    """Throughput of AsyncDNSEngine against local stand-in resolvers"""
+    count = args.count or 50000
+    process, ports = start_standin_servers(StandInResolver, args.resolvers)
+    
+    try:
+        engine = AsyncDNSEngine([f"127.0.0.1:{port}" for port in ports], rate_limit=10 ** 9,
+                                concurrency=2000, timeout=2.0, retries=1, cache=None)
+        names = (f"host{i}.bench.example" for i in range(count))
+        started = time.perf_counter()
+        resolved = engine.resolve_all(names)
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        
+    rate = count / elapsed
+    print(f"dns: {count} queries over {len(ports)} resolvers in {elapsed:.2f}s = {rate:,.0f} q/s "
+          f"({len(resolved)} resolved, {engine.stats['timeouts']} timeouts, "
+          f"{engine.stats['deferred']} retried after the main pass, {engine.stats['lost']} lost)")
+    if engine.stats['lost'] or len(resolved) != count:
+        print("FAIL: names went unanswered by the stand-in resolvers")
+        return 1
+    if args.min_rate and rate < args.min_rate:
+        print(f"FAIL: below minimum rate of {args.min_rate:,.0f} q/s")
+        return 1
+    return 0
+    
+def bench_ports(args):
+    """Full 1-65535 connect scan of loopback with a few listeners open"""
+    listeners = []
+    for _ in range(5):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(128)
+        listeners.append(listener)
+    expected = sorted(listener.getsockname()[1] for listener in listeners)
+    
+    try:
+        scanner = AsyncPortScanner(concurrency=args.count or 1000)
+        started = time.perf_counter()
+        found = scanner.scan('127.0.0.1', 'full')
+        elapsed = time.perf_counter() - started
+    finally:
+        for listener in listeners:
+            listener.close()
+            
+    rate = scanner.stats['probes'] / elapsed
+    missing = [port for port in expected if port not in found]
+    print(f"ports: 65535 ports in {elapsed:.2f}s = {rate:,.0f} probes/s "
+          f"({len(found)} open, {scanner.stats['filtered']} filtered)")
+    if missing:
+        print(f"FAIL: listeners not found: {missing}")
+        return 1
+    if args.min_rate and rate < args.min_rate:
+        print(f"FAIL: below minimum rate of {args.min_rate:,.0f} probes/s")
+        return 1
+    return 0
+    
+SAMPLE_BANNERS = [
+    'SSH-2.0-OpenSSH_{0}.{1}p1 Ubuntu-4ubuntu0.{2}',
+    'SSH-2.0-dropbear_20{0}.{1}',
+    '220 (vsFTPd 3.0.{0})',
+    '220 mail{0}.example.com ESMTP Postfix (Debian/GNU)',
+    '220 mx{0}.example.com ESMTP Exim 4.{1} Mon, 01 Jan 2024 00:00:00 +0000',
+    'HTTP/1.1 200 OK\r\nDate: Mon, 01 Jan 2024 00:00:00 GMT\r\nServer: Apache/2.{0}.{1} (Ubuntu)\r\n'
+    'Content-Type: text/html\r\n\r\n',
+    'HTTP/1.1 301 Moved Permanently\r\nServer: nginx/1.{0}.{1}\r\nLocation: https://example.com/\r\n\r\n',
+    'HTTP/1.1 403 Forbidden\r\nServer: cloudflare\r\nCF-RAY: {0}{1}{2}\r\n\r\n',
+    'HTTP/1.0 200 OK\r\nServer: custom-{0}\r\n\r\n',
+    '+OK Dovecot (Ubuntu) ready.',
+    '* OK [CAPABILITY IMAP4rev1] Dovecot ready.',
+    'J\x00\x00\x00\x0a5.7.{0}-0ubuntu0.18.04.1\x00',
+    '-NOAUTH Authentication required.',
+    'RFB 003.00{0}',
+    'unrecognised greeting {0}.{1}.{2}'
+]
+
+def bench_fingerprint(args):
+    """Banner classification throughput of the compiled fingerprint DB"""
+    count = args.count or 50000
+    banners = [SAMPLE_BANNERS[i % len(SAMPLE_BANNERS)].format(i % 10, i % 31, i % 7) for i in range(count)]
+    
+    started = time.perf_counter()
+    matched = sum(1 for banner in banners if SERVICE_FINGERPRINTS.classify(banner))
+    elapsed = time.perf_counter() - started
+    
+    rate = count / elapsed
+    print(f"fingerprint: {count} banners against {len(SERVICE_FINGERPRINTS.signatures)} signatures "
+          f"in {elapsed:.2f}s = {rate:,.0f} banners/s ({matched} matched)")
+    if args.min_rate and rate < args.min_rate:
+        print(f"FAIL: below minimum rate of {args.min_rate:,.0f} banners/s")
+        return 1
+    return 0
+    
+def bench_http(args):
+    """Request throughput of AsyncHTTPEngine against a local keep-alive stand-in server"""
+    count = args.count or 20000
+    process, (port,) = start_standin_servers(StandInHTTPServer)
+    found = []
+    
+    # Every 100th path is a hit that schedules 10 backup-style follow-ups on the same workers
+    # (siblings rather than children: the stand-in answers anything under /hit* and would be a soft-404 there)
+    def handle(item, result):
+        if result is not None and result.status_code == 200:
+            found.append(item[0])
+            if item[1] == 'seed':
+                return [(f"{item[0]}.bak{i}", 'follow-up') for i in range(10)]
+        return None
+        
+    try:
+        engine = AsyncHTTPEngine(concurrency=200, per_host=args.per_host, soft_not_found=SoftNotFoundFilter())
+        seeds = ((f"http://127.0.0.1:{port}/{'hit' if i % 100 == 0 else 'path'}{i}", 'seed') for i in range(count))
+        started = time.perf_counter()
+        engine.run(seeds, handle)
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        
+    requests_made = engine.stats['requests']
+    rate = requests_made / elapsed
+    print(f"http: {requests_made} requests over {engine.stats['connections']} connections in {elapsed:.2f}s "
+          f"= {rate:,.0f} req/s ({len(found)} hits, {engine.stats['errors']} errors)")
+    if engine.stats['errors']:
+        print("FAIL: requests failed against the stand-in server")
+        return 1
+    if args.min_rate and rate < args.min_rate:
+        print(f"FAIL: below minimum rate of {args.min_rate:,.0f} req/s")
+        return 1
+    return 0
+    
+BENCHMARKS = {
+    'startup': bench_startup,
+    'dns': bench_dns,
+    'ports': bench_ports,
+    'fingerprint': bench_fingerprint,
+    'http': bench_http
+}
+
+def main(argv=None):
+    """Entry point: interactive matrix by default, `scan` for batch runs"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog='tarantula',
+        description='TARANTULA v3.0 - Enterprise Attack Surface Management Platform')
+    parser.add_argument('--version', action='version', version='TARANTULA v3.0')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    scan_parser = subparsers.add_parser('scan', help='Run a non-interactive scan and write JSON results')
+    scan_parser.add_argument('--target', required=True, help='Target domain/IP')
+    scan_parser.add_argument('--modules', default='all',
+                             help='Comma-separated module keys (default: all)')
+    scan_parser.add_argument('--out', default='-',
+                             help='Output JSON file, or - for stdout (default: -)')
+    scan_parser.add_argument('--workspace', default='default',
+                             help='Workspace name for persistent state (default: default)')
+    scan_parser.add_argument('--resolvers',
+                             help="Comma-separated DNS resolvers (ip or ip:port); 'public' adds "
+                                  f"{', '.join(PUBLIC_RESOLVERS)} (default: the system's nameservers)")
+    scan_parser.add_argument('--dns-rate', type=int, help='Queries per second per resolver')
+    scan_parser.add_argument('--ports', default='default',
+                             help=f"Port profile ({', '.join(AsyncPortScanner.PROFILES)}) or spec like 22,80,8000-8100 "
+                                  "(default: default)")
+    scan_parser.add_argument('--subdomain-wordlist', action='append', default=[], metavar='PATH',
+                             help='Extra subdomain wordlist file (repeatable)')
+    scan_parser.add_argument('--directory-wordlist', action='append', default=[], metavar='PATH',
+                             help='Extra directory wordlist file (repeatable)')
+    scan_parser.add_argument('--file-wordlist', action='append', default=[], metavar='PATH',
+                             help='Extra sensitive file wordlist (repeatable)')
+    scan_parser.add_argument('--http2', action='store_true',
+                             help='Multiplex HTTP requests over HTTP/2 where supported (needs httpx[http2])')
+    scan_parser.add_argument('--http-per-host', type=int, default=40, metavar='N',
+                             help='Maximum concurrent HTTP connections per host (default: 40)')
+    scan_parser.add_argument('--http-body-budget', type=int, default=65536, metavar='BYTES',
+                             help='Most body bytes read per discovery probe (default: 65536)')
+    scan_parser.add_argument('--incremental', action='store_true',
+                             help='Re-scan known-open ports, sample closed ones by staleness, report only changes')
+    scan_parser.add_argument('--fingerprints', metavar='PATH',
+                             help='Extra service fingerprints in nmap-service-probes match syntax')
+    
+    import_parser = subparsers.add_parser('ct-import', help='Import certificate dumps into the local CT index')
+    import_parser.add_argument('dumps', nargs='+', metavar='DUMP',
+                               help='Dump files (crt.sh/Censys JSON, CSV or plain text; .gz allowed)')
+    import_parser.add_argument('--workspace', default='default',
+                               help='Workspace holding the index (default: default)')
+    import_parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    
+    bench_parser = subparsers.add_parser('bench', help='Run a performance benchmark')
+    bench_parser.add_argument('name', choices=sorted(BENCHMARKS))
+    bench_parser.add_argument('--runs', type=int, default=10, help='Repetitions (default: 10)')
+    bench_parser.add_argument('--budget', type=float, default=0.5,
+                              help='Fail if the median exceeds this many seconds (default: 0.5)')
+    bench_parser.add_argument('--count', type=int, default=0, help='Workload size (benchmark specific)')
+    bench_parser.add_argument('--min-rate', type=float, default=0,
+                              help='Fail if throughput is below this many operations per second')
+    bench_parser.add_argument('--resolvers', type=int, default=4,
+                              help='Stand-in resolvers for the dns benchmark (default: 4)')
+    bench_parser.add_argument('--per-host', type=int, default=50,
+                              help='Connections to the stand-in server for the http benchmark (default: 50)')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'bench':
+        return BENCHMARKS[args.name](args)
+        
+    if args.command == 'ct-import':
+        workspace_dir = os.path.join("tarantula_workspace", args.workspace)
+        os.makedirs(workspace_dir, exist_ok=True)
+        index = CTIndex(os.path.join(workspace_dir, "ct_index.db"))
+        
+        def progress(completed, total, added):
+            print(f"[{completed}/{total or '?'}] chunks imported, {added:,} new names", file=sys.stderr)
+            
+        started = time.perf_counter()
+        added = index.import_dumps(args.dumps, workers=args.workers, progress=progress)
+        print(f"Imported {added:,} new names into {index.db_path} in {time.perf_counter() - started:.1f}s")
+        return 0
+        
+    if args.command == 'scan':
+        modules = [key.strip() for key in args.modules.split(',') if key.strip()]
+        tarantula = TarantulaCore(workspace=args.workspace)
+        if args.resolvers:
+            resolvers = []
+            for resolver in (r.strip() for r in args.resolvers.split(',')):
+                if resolver == 'public':
+                    resolvers.extend(PUBLIC_RESOLVERS)
+                elif resolver:
+                    resolvers.append(resolver)
+            tarantula.dns_resolvers = resolvers
+        if args.dns_rate:
+            tarantula.dns_rate_limit = args.dns_rate
+        try:
+            AsyncPortScanner.parse_ports(args.ports)
+        except ValueError as e:
+            parser.error(f"--ports: {e}")
+        tarantula.port_profile = args.ports
+        tarantula.incremental_ports = args.incremental
+        tarantula.http = HTTPClient(per_host=args.http_per_host, http2=args.http2)
+        tarantula.http_body_budget = args.http_body_budget
+        tarantula.wordlists['subdomains'] = args.subdomain_wordlist
+        tarantula.wordlists['directories'] = args.directory_wordlist
+        tarantula.wordlists['files'] = args.file_wordlist
+        if args.fingerprints:
+            try:
+                tarantula.fingerprints = FingerprintDB.from_file(args.fingerprints)
+            except (OSError, ValueError) as e:
+                parser.error(f"--fingerprints: {e}")
+        return tarantula.run_headless(args.target, modules, args.out)
+        
+    # Initialize colorama
+    from colorama import init
+    init(autoreset=True)
+    
     print(f"{NeonColors.NEON_GREEN}Initializing TARANTULA enterprise neural networks...{NeonColors.RESET}")
     time.sleep(2)
     
@@ -2894,3 +6438,7 @@ if __name__ == "__main__":
         tarantula.run()
     except Exception as e:
         print(f"{NeonColors.RED}[FATAL] Neural network initialization failed: {str(e)}{NeonColors.RESET}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""AsyncHTTPEngine reads at most body_budget bytes of a response"""
+import asyncio
+import re
+
+import pytest
+
+from Tarantula import AsyncHTTPEngine, HTTPResult, StandInHTTPServer
+
+
+BUDGET = 1000
+SIZE = 100000
+
+
+class LargeBodyHTTPServer(StandInHTTPServer):
+    """Stand-in serving SIZE-byte bodies every way a server may send them"""
+    def data_received(self, data):
+        self.buffer += data
+        while b'\r\n\r\n' in self.buffer:
+            request, self.buffer = self.buffer.split(b'\r\n\r\n', 1)
+            method, path = request.split(b' ', 2)[:2]
+            body = b'x' * SIZE
+            if path == b'/ranged':
+                last = int(re.search(rb'Range: bytes=0-(\d+)', request).group(1))
+                response = (b'HTTP/1.1 206 Partial Content\r\nContent-Range: bytes 0-%d/%d\r\nContent-Length: %d\r\n\r\n'
+                            % (last, SIZE, last + 1) + body[:last + 1])
+            elif path == b'/length':
+                response = b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n' % SIZE + body
+            elif path == b'/chunked':
+                response = (b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n' +
+                            b''.join(b'%x\r\n%s\r\n' % (len(piece), piece) for piece in (body[:600],) * 4))
+            elif path == b'/huge-chunk':
+                huge = b'y' * (5 * 1024 * 1024)
+                response = b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n%x\r\n%s\r\n0\r\n\r\n' % (
+                    len(huge), huge)
+            elif path == b'/small-chunked':
+                response = b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n'
+            elif path == b'/no-head' and method == b'HEAD':
+                response = b'HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n'
+            elif path == b'/no-head':
+                response = b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok'
+            elif path == b'/hang-head' and method == b'HEAD':
+                continue
+            else:
+                response = b'HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n' + body[:SIZE if path == b'/close' else 100]
+                self.transport.write(response)
+                self.transport.close()
+                return
+            if method == b'HEAD':
+                response = response[:response.index(b'\r\n\r\n') + 4]
+            self.transport.write(response)
+            
+            
+def fetch_all(requests, **options):
+    """[(HTTPResult, engine)] for (method, path) requests against LargeBodyHTTPServer"""
+    async def run():
+        server = await asyncio.get_running_loop().create_server(LargeBodyHTTPServer, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        engine = AsyncHTTPEngine(timeout=1, body_budget=BUDGET, **options)
+        try:
+            results = []
+            for method, path in requests:
+                url = f"http://127.0.0.1:{port}{path}"
+                results.append(await (engine.probe(url) if method == 'PROBE' else engine.fetch(url, method)))
+            return results, engine
+        finally:
+            server.close()
+            
+    return asyncio.run(run())
+    
+    
+@pytest.mark.parametrize('path, length', [
+    ('/ranged', SIZE),
+    ('/length', SIZE),
+    ('/chunked', None),
+    ('/huge-chunk', None),
+    ('/close', None),
+    ('/small-chunked', 5),
+    ('/short-close', 100),
+])
+def test_get_reads_at_most_the_budget(path, length):
+    (result,), engine = fetch_all([('GET', path)])
+    
+    assert result.status_code == 200
+    assert len(result.content) <= BUDGET
+    assert result.length == length
+    assert engine.stats['body_bytes'] <= BUDGET
+    
+    
+def test_one_huge_chunk_is_read_only_up_to_the_budget():
+    (result,), engine = fetch_all([('GET', '/huge-chunk')])
+    
+    assert result.content == b'y' * BUDGET
+    assert result.truncated and result.length is None
+    assert engine.stats['body_bytes'] == BUDGET
+    
+    
+def test_truncated_size_is_a_lower_bound_not_a_length():
+    (chunked, complete), _ = fetch_all([('GET', '/chunked'), ('GET', '/length')])
+    
+    assert (chunked.length, chunked.size_lower_bound) == (None, BUDGET)
+    assert (complete.length, complete.size_lower_bound) == (SIZE, None)
+    
+    
+def test_connection_is_reused_after_a_drained_body():
+    _, engine = fetch_all([('GET', '/ranged'), ('GET', '/ranged'), ('GET', '/small-chunked')])
+    
+    assert engine.stats['connections'] == 1
+    
+    
+def test_probe_uses_head_and_content_length():
+    (result,), engine = fetch_all([('PROBE', '/length')])
+    
+    assert result.length == SIZE and result.content == b''
+    assert engine.stats['requests'] == 1
+    
+    
+def test_probe_turns_head_off_for_hosts_that_refuse_it():
+    (first, second), engine = fetch_all([('PROBE', '/no-head'), ('PROBE', '/no-head')])
+    
+    assert (first.status_code, first.content) == (200, b'ok')
+    assert (second.status_code, second.content) == (200, b'ok')
+    assert engine.stats['requests'] == 3
+    
+    
+def test_probe_falls_back_to_get_when_head_times_out():
+    (result,), engine = fetch_all([('PROBE', '/hang-head')])
+    
+    assert result.status_code == 200 and result.content == b'x' * 100
+    assert False in engine.head_support.values()
+    
+    
+def test_http_result_length_defaults_to_content():
+    assert HTTPResult('http://example.com/', 200, {}, b'abc').length == 3
+    assert HTTPResult('http://example.com/', 200, {}, b'abc', truncated=True).length is None
@@ -0,0 +1,69 @@
+"""CTIndex imports of certificate dumps, split across pool workers"""
+import gzip
+import json
+
+from Tarantula import CTIndex
+
+
+NAMES = [f"host{i}.example.com" for i in range(3000)]
+
+
+def crtsh_dump():
+    """crt.sh JSON on one line, name_value holding several names joined by a literal \\n"""
+    entries = [{'issuer_name': 'C=US, O=Example CA', 'common_name': NAMES[i],
+                'name_value': '\n'.join(NAMES[i:i + 3])} for i in range(0, len(NAMES), 3)]
+    return json.dumps(entries).encode()
+    
+    
+def small_chunk_index(tmp_path):
+    index = CTIndex(str(tmp_path / 'ct.db'))
+    index.CHUNK_SIZE = 4096
+    return index
+    
+    
+def test_single_line_json_is_split_into_chunks(tmp_path):
+    dump = tmp_path / 'crtsh.json'
+    dump.write_bytes(crtsh_dump())
+    index = small_chunk_index(tmp_path)
+    
+    chunks = index.chunks(str(dump), dump.stat().st_size)
+    
+    assert len(chunks) > 10
+    assert chunks[0][1] == 0 and chunks[-1][2] == dump.stat().st_size
+    assert all(previous[2] == chunk[1] for previous, chunk in zip(chunks, chunks[1:]))
+    
+    
+def test_single_line_json_imports_every_name_and_resumes(tmp_path):
+    dump = tmp_path / 'crtsh.json'
+    dump.write_bytes(crtsh_dump())
+    index = small_chunk_index(tmp_path)
+    
+    assert index.import_dumps([str(dump)], workers=2) == len(NAMES)
+    assert sorted(index.names_under('example.com')) == sorted(NAMES)
+    assert index.import_dumps([str(dump)], workers=2) == 0
+    
+    
+def test_gzip_dump_is_streamed_in_pieces(tmp_path):
+    dump = tmp_path / 'crtsh.json.gz'
+    with gzip.open(dump, 'wb') as f:
+        f.write(crtsh_dump())
+    index = small_chunk_index(tmp_path)
+    progress = []
+    
+    added = index.import_dumps([str(dump)], workers=2, progress=lambda *update: progress.append(update))
+    
+    assert added == len(NAMES)
+    assert sorted(index.names_under('example.com')) == sorted(NAMES)
+    assert len(progress) > 10
+    assert all(total is None for _, total, _ in progress)
+    assert index.import_dumps([str(dump)], workers=2) == 0
+    
+    
+def test_names_under_is_limited_to_the_domain(tmp_path):
+    dump = tmp_path / 'names.txt'
+    dump.write_text("www.example.com\nexample.com\napi.dev.example.com\nexample.com.evil.net\nwww.example.org\n")
+    index = CTIndex(str(tmp_path / 'ct.db'))
+    index.import_dumps([str(dump)], workers=1)
+    
+    assert sorted(index.names_under('example.com')) == ['api.dev.example.com', 'example.com', 'www.example.com']
+    assert index.names_under('dev.example.com') == ['api.dev.example.com']
@@ -0,0 +1,213 @@
+"""DNSCache and the urllib3 pools that connect through it"""
+import shutil
+import ssl
+import subprocess
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import dns.resolver
+import pytest
+
+import Tarantula
+from Tarantula import DNS_CACHE, DNSAnswer, DNSCache, HTTPClient
+
+
+HOSTNAME = 'app.tarantula.test'
+
+
+class EchoHostHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        body = self.headers['Host'].encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, *args):
+        pass
+        
+        
+@pytest.fixture
+def cached_hostname():
+    """HOSTNAME exists only in DNS_CACHE, pointing at 127.0.0.1"""
+    DNS_CACHE.put(DNSAnswer(HOSTNAME, 'A', 'NOERROR', ['127.0.0.1'], 300))
+    yield HOSTNAME
+    with DNS_CACHE.lock:
+        DNS_CACHE.entries.pop(DNS_CACHE.key(HOSTNAME, 'A'), None)
+        
+        
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+    
+    
+def test_http_pool_connects_to_the_cached_address(cached_hostname):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHostHandler)
+    try:
+        port = serve(server)
+        response = HTTPClient().get(f"http://{cached_hostname}:{port}/", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+        
+    assert response.status_code == 200
+    assert response.text == f"{cached_hostname}:{port}"
+    
+    
+@pytest.mark.skipif(shutil.which('openssl') is None, reason='needs openssl to make a certificate')
+@pytest.mark.filterwarnings('ignore:Unverified HTTPS request')
+def test_https_pool_keeps_the_hostname_for_sni(cached_hostname, tmp_path):
+    key, cert = tmp_path / 'key.pem', tmp_path / 'cert.pem'
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', str(key), '-out', str(cert),
+                    '-days', '1', '-subj', f"/CN={cached_hostname}"], check=True, capture_output=True)
+    server_names = []
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(str(cert), str(key))
+    context.sni_callback = lambda sock, name, ctx: server_names.append(name)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHostHandler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    try:
+        port = serve(server)
+        response = HTTPClient().get(f"https://{cached_hostname}:{port}/", timeout=5, verify=False)
+    finally:
+        server.shutdown()
+        server.server_close()
+        
+    assert response.text == f"{cached_hostname}:{port}"
+    assert server_names == [cached_hostname]
+    
+    
+def test_address_lookup_is_bounded_by_the_connect_timeout(monkeypatch):
+    cache = DNSCache()
+    lifetimes = []
+    monkeypatch.setattr(cache, 'resolve', lambda name, rdtype, lifetime: lifetimes.append(lifetime) or
+                        DNSAnswer(name, rdtype, 'NOERROR', ['192.0.2.1'], 60))
+    
+    assert cache.address('www.example.com', timeout=2.5) == '192.0.2.1'
+    cache.address('www.example.com', timeout=None)
+    cache.address('www.example.com', timeout=60)
+    
+    assert lifetimes == [2.5, DNSCache.LIFETIME, DNSCache.LIFETIME]
+    assert cache.address('192.0.2.7') == '192.0.2.7'
+    
+    
+def test_failed_lookup_is_cached_briefly(monkeypatch):
+    calls = []
+    
+    def resolve(name, rdtype, lifetime):
+        calls.append(name)
+        raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=[])
+        
+    monkeypatch.setattr(Tarantula, 'dns_resolver', types.SimpleNamespace(
+        resolve=resolve, NXDOMAIN=dns.resolver.NXDOMAIN, NoAnswer=dns.resolver.NoAnswer,
+        LifetimeTimeout=dns.resolver.LifetimeTimeout))
+    cache = DNSCache()
+    
+    assert cache.address('down.example.com', timeout=1) == 'down.example.com'
+    assert cache.address('down.example.com', timeout=1) == 'down.example.com'
+    assert calls == ['down.example.com']
+    
+    answer = cache.get('down.example.com')
+    assert answer.rcode == 'TIMEOUT'
+    assert 0 < answer.ttl <= DNSCache.FAILURE_TTL
+    
+    
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time() for the cache; advance with clock.now += seconds"""
+    clock = types.SimpleNamespace(now=1000000.0)
+    monkeypatch.setattr(Tarantula, 'time', types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+    
+    
+def test_positive_answers_live_for_their_ttl(clock):
+    cache = DNSCache()
+    cache.put(DNSAnswer('WWW.Example.com.', 'A', 'NOERROR', ['192.0.2.1', '192.0.2.2'], 120, ['lb.example.net']))
+    
+    clock.now += 100
+    answer = cache.get('www.example.com')
+    assert (answer.rcode, answer.records, answer.cnames, answer.ttl) == (
+        'NOERROR', ['192.0.2.1', '192.0.2.2'], ['lb.example.net'], 20)
+    assert answer.resolver == 'cache'
+    assert cache.get('www.example.com', 'AAAA') is None
+    
+    clock.now += 20
+    assert cache.get('www.example.com') is None
+    assert cache.stats == {'hits': 1, 'misses': 2}
+    assert cache.entries == {}
+    
+    
+def test_long_ttls_are_clamped(clock):
+    cache = DNSCache()
+    cache.put(DNSAnswer('www.example.com', 'A', 'NOERROR', ['192.0.2.1'], 7 * 86400))
+    
+    clock.now += DNSCache.MAX_TTL - 1
+    assert cache.get('www.example.com')
+    clock.now += 1
+    assert cache.get('www.example.com') is None
+    
+    
+@pytest.mark.parametrize('rcode, records', [('NXDOMAIN', []), ('NOERROR', [])])
+def test_negative_answers_live_for_the_negative_ttl(clock, rcode, records):
+    cache = DNSCache()
+    cache.put(DNSAnswer('missing.example.com', 'A', rcode, records, 0))
+    
+    clock.now += DNSCache.NEGATIVE_TTL - 1
+    answer = cache.get('missing.example.com')
+    assert (answer.rcode, answer.records, answer.resolved) == (rcode, [], False)
+    clock.now += 1
+    assert cache.get('missing.example.com') is None
+    
+    
+@pytest.mark.parametrize('answer', [
+    DNSAnswer('www.example.com', 'A', 'NOERROR', ['192.0.2.1'], 0),
+    DNSAnswer('www.example.com', 'A', 'REFUSED'),
+    DNSAnswer('www.example.com', 'A', 'BADNAME'),
+])
+def test_uncacheable_answers_are_not_stored(answer):
+    cache = DNSCache()
+    cache.put(answer)
+    
+    assert cache.entries == {}
+    
+    
+def test_cached_answers_are_fresh_copies():
+    cache = DNSCache()
+    cache.put(DNSAnswer('www.example.com', 'A', 'NOERROR', ['192.0.2.1'], 60))
+    
+    cache.get('www.example.com').records.append('192.0.2.99')
+    cache.get('www.example.com').rcode = 'WILDCARD'
+    
+    answer = cache.get('www.example.com')
+    assert (answer.rcode, answer.records) == ('NOERROR', ['192.0.2.1'])
+    
+    
+def test_oldest_entry_is_evicted_when_full(monkeypatch):
+    cache = DNSCache()
+    monkeypatch.setattr(cache, 'MAX_ENTRIES', 3)
+    for i in range(4):
+        cache.put(DNSAnswer(f"host{i}.example.com", 'A', 'NOERROR', ['192.0.2.1'], 60))
+        
+    assert cache.get('host0.example.com') is None
+    assert all(cache.get(f"host{i}.example.com") for i in range(1, 4))
+    
+    
+def test_nxdomain_lookup_is_cached(monkeypatch):
+    calls = []
+    
+    def resolve(name, rdtype, lifetime):
+        calls.append(name)
+        raise dns.resolver.NXDOMAIN()
+        
+    monkeypatch.setattr(Tarantula, 'dns_resolver', types.SimpleNamespace(
+        resolve=resolve, NXDOMAIN=dns.resolver.NXDOMAIN, NoAnswer=dns.resolver.NoAnswer,
+        LifetimeTimeout=dns.resolver.LifetimeTimeout))
+    cache = DNSCache()
+    
+    assert cache.resolve('missing.example.com').rcode == 'NXDOMAIN'
+    assert cache.resolve('missing.example.com').rcode == 'NXDOMAIN'
+    assert calls == ['missing.example.com']
+    assert 0 < cache.get('missing.example.com').ttl <= DNSCache.NEGATIVE_TTL
@@ -0,0 +1,93 @@
+"""AsyncDNSEngine against stand-in resolvers"""
+import asyncio
+
+from Tarantula import AsyncDNSEngine, StandInResolver, _ResolverEndpoint, start_standin_servers, system_resolvers
+
+
+class MismatchedResolver(StandInResolver):
+    """Answers every query under its id, but for another name"""
+    def datagram_received(self, data, addr):
+        other = AsyncDNSEngine.encode_query('other.example.com', 1)
+        super().datagram_received(data[:2] + other[2:], addr)
+        
+        
+class MixedCaseResolver(StandInResolver):
+    """Echoes the question name upper-cased, as 0x20-randomising resolvers do"""
+    def datagram_received(self, data, addr):
+        question = _ResolverEndpoint.question(data)
+        super().datagram_received(data[:12] + question[:-4].upper() + question[-4:], addr)
+        
+        
+class FirstQueryLostResolver(StandInResolver):
+    """Drops the first query for every name, like a burst of lost replies"""
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self.seen = set()
+        
+    def datagram_received(self, data, addr):
+        question = _ResolverEndpoint.question(data).lower()
+        if question not in self.seen:
+            self.seen.add(question)
+            return
+        super().datagram_received(data, addr)
+        
+        
+def resolve(protocol_factory, names, **options):
+    """Run an engine against an in-process resolver; returns (answers, stats)"""
+    async def run():
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            protocol_factory, local_addr=('127.0.0.1', 0))
+        port = transport.get_extra_info('sockname')[1]
+        engine = AsyncDNSEngine([f"127.0.0.1:{port}"], cache=None, rate_limit=100000, **options)
+        try:
+            return [answer async for answer in engine.resolve_stream(names)], engine.stats
+        finally:
+            engine.close()
+            transport.close()
+            
+    return asyncio.run(run())
+    
+    
+def test_resolves_against_standin_servers():
+    process, ports = start_standin_servers(StandInResolver, 2)
+    try:
+        engine = AsyncDNSEngine([f"127.0.0.1:{port}" for port in ports], cache=None, rate_limit=100000,
+                                concurrency=100)
+        names = [f"host{i}.example.com" for i in range(2000)]
+        resolved = engine.resolve_all(names)
+    finally:
+        process.terminate()
+        
+    assert sorted(answer.name for answer in resolved) == sorted(names)
+    assert all(answer.records == ['127.0.0.1'] for answer in resolved)
+    assert engine.stats['lost'] == 0
+    
+    
+def test_reply_for_another_question_is_dropped():
+    answers, stats = resolve(MismatchedResolver, ['www.example.com'], timeout=0.2, retries=0)
+    
+    assert [answer.rcode for answer in answers] == ['TIMEOUT']
+    assert stats['lost'] == 1
+    
+    
+def test_question_name_matches_case_insensitively():
+    answers, _ = resolve(MixedCaseResolver, ['www.example.com'], timeout=1, retries=0)
+    
+    assert [(answer.rcode, answer.records) for answer in answers] == [('NOERROR', ['127.0.0.1'])]
+    
+    
+def test_timed_out_names_get_a_retry_pass():
+    names = [f"host{i}.example.com" for i in range(20)]
+    answers, stats = resolve(FirstQueryLostResolver, names, timeout=0.2, retries=0, concurrency=20)
+    
+    assert sorted(answer.name for answer in answers if answer.resolved) == sorted(names)
+    assert stats['deferred'] == len(names)
+    assert stats['lost'] == 0
+    
+    
+def test_system_resolvers_reads_resolv_conf(tmp_path):
+    resolv_conf = tmp_path / 'resolv.conf'
+    resolv_conf.write_text("# local\nsearch example.com\nnameserver 10.0.0.2\nnameserver 10.0.0.3\noptions ndots:1\n")
+    
+    assert system_resolvers(str(resolv_conf)) == ['10.0.0.2', '10.0.0.3']
+
@@ -0,0 +1,79 @@
+"""Finding fingerprints and ResultCollector's merge of duplicate findings"""
+import threading
+
+import pytest
+
+from Tarantula import Finding, ResultCollector
+    
+    
+@pytest.fixture
+def collector():
+    return ResultCollector({'vulnerabilities': []})
+    
+    
+@pytest.mark.parametrize('first, second', [
+    ('http://a.test/admin', 'https://a.test/admin/'),
+    ('https://A.test:443/admin', 'a.test/admin'),
+    ('http://a.test:80', 'a.test'),
+])
+def test_fingerprint_normalizes_the_asset(first, second):
+    assert (Finding('Exposed Admin', first, 'Low', 'Admin panel').fingerprint() ==
+            Finding('exposed admin ', second, 'High', 'admin   PANEL').fingerprint())
+            
+            
+@pytest.mark.parametrize('other', [
+    Finding('Exposed Admin', 'a.test:8080/admin', 'Low', 'Admin panel'),
+    Finding('Exposed Admin', 'a.test/login', 'Low', 'Admin panel'),
+    Finding('Open Redirect', 'a.test/admin', 'Low', 'Admin panel'),
+    Finding('Exposed Admin', 'a.test/admin', 'Low', 'Admin panel without auth'),
+])
+def test_fingerprint_keeps_distinct_issues_apart(other):
+    assert Finding('Exposed Admin', 'a.test/admin', 'Low', 'Admin panel').fingerprint() != other.fingerprint()
+    
+    
+def test_duplicates_merge_into_the_first_finding(collector):
+    first = collector.add_finding('XSS', 'http://a.test/search', 'Medium', 'Reflected q', tool='nuclei')
+    again = collector.add_finding('XSS', 'https://a.test/search', 'High', 'Reflected q', tool='nuclei')
+    other = collector.add_finding('XSS', 'a.test/search', 'Low', 'Reflected q', tool='nikto')
+    
+    assert again is first and other is first
+    assert collector.results['vulnerabilities'] == [first]
+    assert first.occurrences == 3
+    assert first.severity == 'High'
+    assert first['seen_on'] == ['https://a.test/search', 'a.test/search (nikto)']
+    
+    
+def test_merge_keeps_details_and_does_not_repeat_variants(collector):
+    first = collector.add_finding('CVE', 'a.test', 'Critical', 'CVE-2021-44228', template='log4j')
+    for _ in range(3):
+        collector.add_finding('CVE', 'https://a.test', 'Low', 'CVE-2021-44228')
+        
+    assert first.occurrences == 4
+    assert first.severity == 'Critical'
+    assert first['template'] == 'log4j'
+    assert first['seen_on'] == ['https://a.test']
+    assert first.to_dict()['occurrences'] == 4
+    
+    
+def test_concurrent_duplicates_become_one_finding(collector):
+    def report():
+        for _ in range(200):
+            collector.add_finding('Missing Header', 'https://a.test', 'Info', 'No HSTS')
+            
+    threads = [threading.Thread(target=report) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+        
+    assert len(collector.results['vulnerabilities']) == 1
+    assert collector.results['vulnerabilities'][0].occurrences == 800
+    
+    
+def test_reset_forgets_fingerprints(collector):
+    collector.add_finding('XSS', 'a.test', 'Low', 'x')
+    collector.reset('vulnerabilities')
+    finding = collector.add_finding('XSS', 'a.test', 'Low', 'x')
+    
+    assert collector.results['vulnerabilities'] == [finding]
+    assert finding.occurrences == 1
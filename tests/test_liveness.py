@@ -0,0 +1,124 @@
+"""LivenessCache: which web endpoints each host answers on"""
+import threading
+import time
+
+import pytest
+
+from Tarantula import LivenessCache, TarantulaCore
+
+
+class StubResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+        
+    def close(self):
+        pass
+        
+        
+class StubClient:
+    """HTTPClient stand-in: answers URLs from a table, anything else fails to connect"""
+    def __init__(self, answers, delay=0):
+        self.answers = answers
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        if url not in self.answers:
+            raise ConnectionError(url)
+        status, headers = self.answers[url]
+        return StubResponse(status, headers)
+        
+        
+REDIRECT = (301, {'Location': 'https://a.test/'})
+
+
+@pytest.mark.parametrize('answers, bases', [
+    ({'https://a.test': (200, {}), 'http://a.test': REDIRECT}, ['https://a.test']),
+    ({'https://a.test': (200, {}), 'http://a.test': (200, {})}, ['https://a.test', 'http://a.test']),
+    ({'http://a.test': REDIRECT}, ['http://a.test']),
+    ({}, []),
+])
+def test_bases_drop_http_only_when_it_redirects_to_live_https(answers, bases):
+    assert LivenessCache().bases('a.test', StubClient(answers)) == bases
+    
+    
+def test_concurrent_callers_share_one_probe():
+    client = StubClient({'https://a.test': (200, {})}, delay=0.2)
+    cache = LivenessCache()
+    records = []
+    threads = [threading.Thread(target=lambda: records.append(cache.check('A.test.', client))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+        
+    assert sorted(client.calls) == ['http://a.test', 'https://a.test']
+    assert len(records) == 8 and all(record is records[0] for record in records)
+    
+    
+def test_endpoints_added_before_the_first_probe_are_included():
+    client = StubClient({'http://a.test:8080': (200, {})})
+    cache = LivenessCache()
+    cache.add_endpoints('a.test', [('http', 8080)])
+    
+    assert cache.bases('a.test', client) == ['http://a.test:8080']
+    
+    
+def test_endpoints_added_later_are_probed_and_merged():
+    client = StubClient({'https://a.test': (200, {}), 'https://a.test:8443': (200, {})})
+    cache = LivenessCache()
+    cache.check('a.test', client)
+    
+    cache.add_endpoints('a.test', [('https', 8443), ('https', 443)], client)
+    cache.add_endpoints('a.test', [('https', 8443)], client)
+    
+    assert cache.bases('a.test', client) == ['https://a.test', 'https://a.test:8443']
+    assert client.calls.count('https://a.test:8443') == 1
+    assert client.calls.count('https://a.test') == 1
+    
+    
+def test_endpoints_for_unprobed_hosts_wait_for_their_first_probe():
+    client = StubClient({})
+    LivenessCache().add_endpoints('a.test', [('http', 8080)], client)
+    
+    assert client.calls == []
+    
+    
+@pytest.mark.parametrize('port, service, banner, tls, endpoint', [
+    (8080, 'HTTP-Alt', 'HTTP/1.1 200 OK', None, ('http', 8080)),
+    (8443, 'HTTPS-Alt', '', {'version': 'TLSv1.3'}, ('https', 8443)),
+    (9000, 'Unknown', 'HTTP/1.0 404 Not Found', None, ('http', 9000)),
+    (8444, 'ssl/http', '', None, ('https', 8444)),
+    (22, 'SSH', 'SSH-2.0-OpenSSH_8.4', None, None),
+])
+def test_service_endpoint(port, service, banner, tls, endpoint):
+    assert LivenessCache.service_endpoint(port, service, banner, tls) == endpoint
+    
+    
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    core = TarantulaCore()
+    core.target = 'a.test'
+    return core
+    
+    
+def test_web_service_endpoints_come_from_the_port_scan(core):
+    core.collector.add_service(8080, 'HTTP-Alt', 'HTTP/1.1 200 OK', 'nginx', ip='192.0.2.1',
+                               hostnames=['a.test', 'www.a.test'])
+    core.collector.add_service(8443, 'HTTPS-Alt', '', 'Unknown', ip='192.0.2.1', hostnames=['a.test'], tls={})
+    core.collector.add_service(22, 'SSH', 'SSH-2.0-OpenSSH_8.4', 'OpenSSH 8.4', ip='192.0.2.1', hostnames=['a.test'])
+    
+    assert core.web_service_endpoints() == {'a.test': {('http', 8080), ('https', 8443)},
+                                            'www.a.test': {('http', 8080)}}
+                                            
+                                            
+def test_liveness_probe_does_not_wait_for_other_modules(core):
+    consumes = {key: needed for key, _, _, needed, _ in core.enterprise_modules()}
+    
+    assert consumes['live'] == ()
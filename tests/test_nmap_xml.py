@@ -0,0 +1,115 @@
+"""NmapXMLStream and merging nmap ports into the results"""
+import pytest
+
+from Tarantula import NMAP_VULNERABLE_STATE, NmapXMLStream, TarantulaCore
+    
+    
+VULNERABLE = """
+  VULNERABLE:
+  SSL POODLE information leak
+    State: VULNERABLE
+    IDs:  CVE:CVE-2014-3566"""
+    
+NOT_VULNERABLE = """
+  Slowloris DOS attack
+    State: NOT VULNERABLE"""
+    
+    
+def escape(output):
+    """Script output as nmap writes it into an attribute, newlines as &#xa;"""
+    return output.replace('\n', '&#xa;')
+    
+    
+XML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -sV -oX - a.test">
+<host><status state="up"/>
+<address addr="192.0.2.1" addrtype="ipv4"/><address addr="00:11:22:33:44:55" addrtype="mac"/>
+<ports>
+<port protocol="tcp" portid="22"><state state="open"/><service name="ssh" product="OpenSSH" version="8.4" extrainfo="protocol 2.0"><cpe>cpe:/a:openbsd:openssh:8.4</cpe></service></port>
+<port protocol="tcp" portid="443"><state state="open"/><service name="http" tunnel="ssl" product="nginx"/><script id="ssl-poodle" output="{escape(VULNERABLE)}"/><script id="http-slowloris-check" output="{escape(NOT_VULNERABLE)}"/></port>
+<port protocol="tcp" portid="25"><state state="closed"/></port>
+</ports></host>
+<host><status state="up"/><address addr="2001:db8::1" addrtype="ipv6"/>
+<ports><port protocol="tcp" portid="80"><state state="open"/></port></ports></host>
+</nmaprun>
+""".encode()
+    
+    
+def parse(chunks):
+    stream = NmapXMLStream()
+    return [port for chunk in chunks for port in stream.feed(chunk)]
+    
+    
+def test_ports_are_parsed_with_their_host_address():
+    ports = parse([XML])
+    
+    assert [(port['ip'], port['port'], port['state']) for port in ports] == [
+        ('192.0.2.1', 22, 'open'), ('192.0.2.1', 443, 'open'), ('192.0.2.1', 25, 'closed'), ('2001:db8::1', 80, 'open')]
+    assert ports[0] == {'ip': '192.0.2.1', 'port': 22, 'protocol': 'tcp', 'state': 'open', 'service': 'ssh',
+                        'tunnel': '', 'product': 'OpenSSH', 'version': '8.4', 'extrainfo': 'protocol 2.0',
+                        'cpe': ['cpe:/a:openbsd:openssh:8.4'], 'scripts': {}}
+    assert ports[1]['scripts'] == {'ssl-poodle': VULNERABLE, 'http-slowloris-check': NOT_VULNERABLE}
+    assert ports[3]['service'] == ''
+    
+    
+def test_byte_at_a_time_feeding_gives_the_same_ports():
+    assert parse(XML[i:i + 1] for i in range(len(XML))) == parse([XML])
+    
+    
+def test_each_port_is_yielded_as_soon_as_it_closes():
+    stream = NmapXMLStream()
+    first_port_end = XML.index(b'</port>') + len(b'</port>')
+    
+    assert [port['port'] for port in stream.feed(XML[:first_port_end])] == [22]
+    assert [port['port'] for port in stream.feed(XML[first_port_end:])] == [443, 25, 80]
+    
+    
+def test_finished_hosts_are_cleared():
+    stream = NmapXMLStream()
+    hosts = []
+    read_events = stream.parser.read_events
+    
+    def record_hosts():
+        for event, element in read_events():
+            if event == 'end' and element.tag == 'host':
+                hosts.append(element)
+            yield event, element
+            
+    stream.parser.read_events = record_hosts
+    list(stream.feed(XML))
+    
+    assert [len(host) for host in hosts] == [0, 0]
+    
+    
+@pytest.mark.parametrize('output, vulnerable', [
+    (VULNERABLE, True),
+    ("\n  State: LIKELY VULNERABLE\n", True),
+    (NOT_VULNERABLE, False),
+    ("VULNERABLE:\n  State: UNKNOWN", False),
+])
+def test_vulnerable_state_matches_only_vulnerable_results(output, vulnerable):
+    assert bool(NMAP_VULNERABLE_STATE.search(output)) is vulnerable
+    
+    
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    core = TarantulaCore()
+    core.target = 'a.test'
+    return core
+    
+    
+def test_open_ports_and_vulnerable_scripts_are_merged(core, tmp_path):
+    xml_file = tmp_path / 'nmap.xml'
+    xml_file.write_bytes(XML)
+    
+    assert core.parse_nmap_results(str(xml_file)) == 3
+    
+    services = {(service['ip'], service['port']): service for service in core.results['ports']}
+    assert set(services) == {('192.0.2.1', 22), ('192.0.2.1', 443), ('2001:db8::1', 80)}
+    assert services['192.0.2.1', 22]['version'] == 'OpenSSH 8.4 (protocol 2.0)'
+    assert services['192.0.2.1', 443]['service'] == 'HTTPS'
+    
+    findings = core.results['vulnerabilities']
+    assert [(finding['type'], finding['target'], finding['description']) for finding in findings] == [
+        ('Nmap: ssl-poodle', '192.0.2.1:443', 'SSL POODLE information leak')]
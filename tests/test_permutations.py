@@ -0,0 +1,67 @@
+"""BloomFilter and subdomain_permutations: sizing, membership and one-shot candidates"""
+import itertools
+import types
+
+import pytest
+
+from Tarantula import BloomFilter, subdomain_permutations
+    
+    
+def test_bloom_filter_is_sized_for_capacity_and_error_rate():
+    bloom = BloomFilter(100000)
+    
+    assert bloom.hashes == 10
+    assert 1.7 < len(bloom.bits) / 100000 < 1.9
+    
+    
+def test_bloom_filter_add_reports_new_items_only():
+    bloom = BloomFilter(1000)
+    
+    assert bloom.add('api.example.com')
+    assert not bloom.add('api.example.com')
+    assert 'api.example.com' in bloom
+    assert 'dev.example.com' not in bloom
+    
+    
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"host{i}.example.com")
+        
+    assert all(f"host{i}.example.com" in bloom for i in range(10000))
+    false_positives = sum(f"other{i}.example.com" in bloom for i in range(10000))
+    assert false_positives < 200
+    
+    
+def test_permutations_derive_alterations_of_known_names():
+    candidates = set(subdomain_permutations(['api.example.com', 'web2.example.com'], 'example.com',
+                                            words=['dev', 'staging']))
+    
+    assert {'dev-api.example.com', 'api-dev.example.com', 'devapi.example.com', 'apidev.example.com',
+            'api.dev.example.com', 'dev.api.example.com', 'api.staging.example.com',
+            'api1.example.com', 'api-2.example.com'} <= candidates
+    assert {'web1.example.com', 'web3.example.com', 'web4.example.com'} <= candidates
+    
+    
+def test_permutations_skip_known_names_duplicates_and_other_apexes():
+    known = ['api.example.com', 'api1.example.com', '*.cdn.example.com', 'api.other.org']
+    candidates = list(subdomain_permutations(known, 'example.com', words=['dev']))
+    
+    assert len(candidates) == len(set(candidates))
+    assert 'api1.example.com' not in candidates
+    assert 'dev-cdn.example.com' in candidates
+    assert all(name.endswith('.example.com') for name in candidates)
+    assert not any('other' in name for name in candidates)
+    
+    
+def test_permutations_are_lazy_and_share_the_seen_filter():
+    seen = BloomFilter(1000)
+    candidates = subdomain_permutations(['api.example.com'], 'example.com', words=['dev'], seen=seen)
+    
+    assert isinstance(candidates, types.GeneratorType)
+    first = list(itertools.islice(candidates, 3))
+    assert len(first) == 3 and all(name in seen for name in first)
+    
+    rest = list(subdomain_permutations(['api.example.com'], 'example.com', words=['dev'], seen=seen))
+    everything = list(subdomain_permutations(['api.example.com'], 'example.com', words=['dev']))
+    assert first + rest == everything
@@ -0,0 +1,82 @@
+"""Port scanning: which IPs get scanned and how each port is classified"""
+import asyncio
+import errno
+import socket
+
+import pytest
+
+from Tarantula import AsyncPortScanner, TarantulaCore
+    
+    
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    core = TarantulaCore()
+    core.target = '192.0.2.1'
+    return core
+    
+    
+def test_every_a_record_of_a_subdomain_is_scanned(core):
+    core.collector.add_subdomain('www.a.test', '192.0.2.10', ips=['192.0.2.10', '192.0.2.11', '192.0.2.12'])
+    core.collector.add_subdomain('api.a.test', '192.0.2.11', 'ct', ['192.0.2.11'])
+    
+    assert core.port_scan_targets() == {'192.0.2.1': ['192.0.2.1'],
+                                        '192.0.2.10': ['www.a.test'],
+                                        '192.0.2.11': ['www.a.test', 'api.a.test'],
+                                        '192.0.2.12': ['www.a.test']}
+    
+    
+def test_subdomain_without_ips_falls_back_to_its_ip(core):
+    core.collector.add_subdomain('www.a.test', '192.0.2.10')
+    
+    assert core.results['subdomains'][0]['ips'] == ['192.0.2.10']
+    assert core.port_scan_targets()['192.0.2.10'] == ['www.a.test']
+    
+    
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+        
+        
+def probe(scanner, port):
+    return asyncio.run(scanner.probe('127.0.0.1', socket.AF_INET, '127.0.0.1', port))
+    
+    
+def test_open_and_refused_ports():
+    scanner = AsyncPortScanner()
+    with socket.socket() as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        
+        assert probe(scanner, server.getsockname()[1]) == ('open', None)
+    assert probe(scanner, free_port()) == ('closed', None)
+    
+    
+@pytest.mark.parametrize('error', [errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EACCES, errno.EPERM])
+def test_unreachable_and_prohibited_ports_are_filtered(error, monkeypatch):
+    scanner = AsyncPortScanner()
+    calls = []
+    
+    async def connect(sock, address, timeout):
+        calls.append(address)
+        return error
+        
+    monkeypatch.setattr(scanner, 'connect', connect)
+    
+    assert probe(scanner, free_port()) == ('filtered', None)
+    assert len(calls) == 1
+    
+    
+def test_ports_that_never_answer_are_filtered_after_retries(monkeypatch):
+    scanner = AsyncPortScanner(retries=2)
+    calls = []
+    
+    async def connect(sock, address, timeout):
+        calls.append(address)
+        return None
+        
+    monkeypatch.setattr(scanner, 'connect', connect)
+    
+    assert probe(scanner, free_port()) == ('filtered', None)
+    assert len(calls) == 3
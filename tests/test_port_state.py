@@ -0,0 +1,59 @@
+"""PortStateStore: what an incremental port scan re-probes and what counts as a change"""
+import pytest
+
+from Tarantula import PortStateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PortStateStore(str(tmp_path / 'ports.db'))
+    
+    
+def test_record_keeps_open_closed_and_filtered_apart(store):
+    store.record('10.0.0.1', [22, 80, 443], {22: 'SSH-2.0-OpenSSH_8.4'}, filtered={443}, now=1000)
+    
+    states = store.states('10.0.0.1')
+    
+    assert {port: entry[0] for port, entry in states.items()} == {22: 'open', 80: 'closed', 443: 'filtered'}
+    assert states[22][1] == PortStateStore.banner_digest('SSH-2.0-OpenSSH_8.4')
+    assert states[80][1] is None
+    
+    
+def test_plan_orders_known_open_then_unseen_then_stale(store):
+    store.record('10.0.0.1', [22, 80, 443, 8080], {22: 'SSH-2.0-x'}, filtered={443}, now=1000)
+    known = store.states('10.0.0.1')
+    staleness = ((0, 0.0), (3600, 1.0))
+    
+    fresh = store.plan([21, 22, 80, 443, 8080], known, staleness, now=1010)
+    stale = store.plan([21, 22, 80, 443, 8080], known, staleness, now=1000 + 3600)
+    
+    assert fresh == [22, 21]
+    assert stale == [22, 21, 80, 443, 8080]
+    
+    
+@pytest.mark.parametrize('first, second', [
+    ("220 mx.example.com ESMTP Exim 4.94 Mon, 01 Jan 2024 10:00:00 +0000",
+     "220 mx.example.com ESMTP Exim 4.94 Tue, 02 Jan 2024 11:22:33 +0000"),
+    ("220 mail.corp Microsoft ESMTP MAIL Service ready at Mon, 1 Jan 2024 10:00:00 -0800",
+     "220 mail.corp Microsoft ESMTP MAIL Service ready at Sat, 13 Jul 2024 08:12:59 -0700"),
+    ("220 ProFTPD 1.3.5 Server ready at 2024-01-01 10:00:00", "220 ProFTPD 1.3.5 Server ready at 2024-03-09 23:59:59"),
+    ("+OK Dovecot ready. <1896.697170952@mail.example.com>", "+OK Dovecot ready. <2001.712345678@mail.example.com>"),
+    ("HTTP/1.1 200 OK\r\nDate: Mon, 01 Jan 2024 10:00:00 GMT\r\nServer: nginx/1.24.0\r\nContent-Length: 12",
+     "HTTP/1.1 200 OK\r\nDate: Tue, 02 Jan 2024 11:00:00 GMT\r\nServer: nginx/1.24.0\r\nContent-Length: 99"),
+])
+def test_banner_digest_ignores_clocks_and_ids(first, second):
+    assert PortStateStore.banner_digest(first) == PortStateStore.banner_digest(second)
+    
+    
+@pytest.mark.parametrize('first, second', [
+    ("220 ProFTPD 1.3.5 Server ready", "220 ProFTPD 1.3.6 Server ready"),
+    ("SSH-2.0-OpenSSH_7.4", "SSH-2.0-OpenSSH_8.4"),
+    ("HTTP/1.1 200 OK\r\nServer: Apache/2.4.41", "HTTP/1.1 200 OK\r\nServer: Apache/2.4.58"),
+    ("HTTP/1.1 200 OK\r\nServer: nginx", "HTTP/1.1 403 Forbidden\r\nServer: nginx"),
+])
+def test_banner_digest_notices_software_changes(first, second):
+    assert PortStateStore.banner_digest(first) != PortStateStore.banner_digest(second)
+    
+    
+def test_banner_digest_of_no_banner_is_none():
+    assert PortStateStore.banner_digest('') is None
@@ -0,0 +1,90 @@
+"""ResponseCache and iter_json_array over a local crt.sh-style server"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Tarantula import HTTPClient, ResponseCache, iter_json_array
+
+
+ENTRIES = [{'common_name': f"host{i}.example.com", 'name_value': f"host{i}.example.com"} for i in range(2000)]
+
+
+class CrtShHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.server.requests += 1
+        body = json.dumps(ENTRIES).encode() + b'\n'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, *args):
+        pass
+        
+        
+@pytest.fixture
+def crtsh():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CrtShHandler)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    
+    
+def test_second_fetch_is_served_from_the_cache(tmp_path, crtsh):
+    cache = ResponseCache(str(tmp_path / 'ct_cache'), max_age=3600, client=HTTPClient())
+    url = f"http://127.0.0.1:{crtsh.server_address[1]}/?q=example.com&output=json"
+    
+    first = list(iter_json_array(cache.stream(url)))
+    assert os.path.exists(cache.path(url))
+    second = list(iter_json_array(cache.stream(url)))
+    
+    assert first == second == ENTRIES
+    assert crtsh.requests == 1
+    
+    
+def test_expired_entry_is_fetched_again(tmp_path, crtsh):
+    cache = ResponseCache(str(tmp_path / 'ct_cache'), max_age=0, client=HTTPClient())
+    url = f"http://127.0.0.1:{crtsh.server_address[1]}/"
+    
+    list(iter_json_array(cache.stream(url)))
+    list(iter_json_array(cache.stream(url)))
+    
+    assert crtsh.requests == 2
+    
+    
+def test_abandoned_download_is_not_cached(tmp_path, crtsh):
+    cache = ResponseCache(str(tmp_path / 'ct_cache'), max_age=3600, client=HTTPClient())
+    url = f"http://127.0.0.1:{crtsh.server_address[1]}/"
+    
+    items = iter_json_array(cache.stream(url))
+    next(items)
+    items.close()
+    
+    assert os.listdir(tmp_path / 'ct_cache') == []
+    
+    
+def test_iter_json_array_handles_elements_split_across_chunks():
+    data = json.dumps([{'name': 'a.example.com'}, 'plain', 12345, [1, 2]]).encode()
+    
+    assert list(iter_json_array(data[i:i + 3] for i in range(0, len(data), 3))) == [
+        {'name': 'a.example.com'}, 'plain', 12345, [1, 2]]
+    
+    
+def test_iter_json_array_reads_past_the_closing_bracket():
+    read = []
+    
+    def chunks():
+        for chunk in (b'[1, 2]', b'\n', b''):
+            read.append(chunk)
+            yield chunk
+            
+    assert list(iter_json_array(chunks())) == [1, 2]
+    assert len(read) == 3
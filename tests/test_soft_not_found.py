@@ -0,0 +1,86 @@
+"""SoftNotFoundFilter baselines, exercised through AsyncHTTPEngine"""
+import asyncio
+import random
+
+from Tarantula import AsyncHTTPEngine, SoftNotFoundFilter, StandInHTTPServer
+
+
+CONFIG_PAGE = (b"<?php\n// Database settings\ndefine('DB_NAME', 'shop');\ndefine('DB_USER', 'shop');\n"
+               b"define('DB_HOST', 'localhost');\n$table_prefix = 'wp_';\n")
+
+
+class CatchAllHTTPServer(StandInHTTPServer):
+    """Stand-in whose /app/ directory answers 200 with an error page for any path"""
+    def data_received(self, data):
+        self.buffer += data
+        while b'\r\n\r\n' in self.buffer:
+            request, self.buffer = self.buffer.split(b'\r\n\r\n', 1)
+            method, path = request.split(b' ', 2)[:2]
+            if path == b'/app/config.php':
+                response = b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(CONFIG_PAGE), CONFIG_PAGE)
+            elif path.startswith(b'/app/'):
+                body = (b'<html><body><h1>Sorry</h1><p>The page %s could not be found on this server. '
+                        b'Please check the address or go back to the home page.</p><p>Request %d</p>'
+                        b'</body></html>' % (path, random.getrandbits(40)))
+                response = b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)
+            else:
+                response = self.FOUND if path.startswith(b'/hit') else self.NOT_FOUND
+            if method == b'HEAD':
+                response = response[:response.index(b'\r\n\r\n') + 4]
+            self.transport.write(response)
+            
+            
+def discover(paths, protocol_factory=CatchAllHTTPServer):
+    """Run paths through an engine with a soft-404 filter; returns (hits, engine)"""
+    async def run():
+        server = await asyncio.get_running_loop().create_server(protocol_factory, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        engine = AsyncHTTPEngine(concurrency=4, per_host=4, timeout=2, soft_not_found=SoftNotFoundFilter())
+        hits = []
+        
+        def handle(item, result):
+            if result is not None and result.status_code == 200:
+                hits.append(item[0].split(str(port), 1)[1])
+                
+        try:
+            await engine.run_queue([(f"http://127.0.0.1:{port}{path}",) for path in paths], handle)
+        finally:
+            server.close()
+        return sorted(hits), engine
+        
+    return asyncio.run(run())
+    
+    
+def test_catch_all_directory_is_filtered_but_real_files_are_kept():
+    hits, engine = discover(['/hit1', '/missing', '/app/backup.zip', '/app/admin', '/app/config.php'])
+    
+    assert hits == ['/app/config.php', '/hit1']
+    assert engine.stats['soft_404'] == 2
+    
+    
+def test_baselines_are_kept_per_directory():
+    _, engine = discover(['/hit1', '/app/admin', '/app/v1/users'])
+    
+    directories = sorted(key[2] for key in engine.soft_not_found.baselines)
+    assert directories == ['/', '/app/', '/app/v1/']
+    
+    
+def test_directory_key():
+    assert SoftNotFoundFilter.directory_key('https://example.com/admin/.env') == ('https', 'example.com', '/admin/')
+    assert SoftNotFoundFilter.directory_key('https://example.com:8443/admin') == ('https', 'example.com:8443', '/')
+    assert SoftNotFoundFilter.directory_key('https://example.com') == ('https', 'example.com', '/')
+    
+    
+def test_failed_baseline_is_retried_then_reported():
+    soft_not_found = SoftNotFoundFilter()
+    
+    async def run():
+        engine = AsyncHTTPEngine(timeout=1)
+        # Nothing listens on port 1: every probe fails
+        return [await soft_not_found.baseline(engine, 'http://127.0.0.1:1/admin/x') for _ in range(5)], engine
+        
+    baselines, engine = asyncio.run(run())
+    
+    assert baselines == [[]] * 5
+    assert engine.stats['requests'] == SoftNotFoundFilter.ATTEMPTS * len(SoftNotFoundFilter.PROBES)
+    assert soft_not_found.unavailable == {'http://127.0.0.1:1/admin/'}
@@ -0,0 +1,138 @@
+"""WildcardFilter: zone probing and dropping of wildcard answers"""
+import asyncio
+import socket
+
+import pytest
+
+from Tarantula import AsyncDNSEngine, DNSAnswer, StandInResolver, WildcardFilter, _ResolverEndpoint
+    
+    
+class ZoneResolver(StandInResolver):
+    """Answers the names in RECORDS, anything under *.wild.example.com with WILDCARD, the rest NXDOMAIN"""
+    RECORDS = {'www.example.com': '10.0.0.1', 'real.wild.example.com': '10.0.0.2'}
+    WILDCARD = '10.0.0.9'
+    
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self.names = []
+        
+    def datagram_received(self, data, addr):
+        question = _ResolverEndpoint.question(data)
+        labels, end = [], 0
+        while question[end]:
+            labels.append(question[end + 1:end + 1 + question[end]].decode().lower())
+            end += question[end] + 1
+        name = '.'.join(labels)
+        self.names.append(name)
+        
+        ip = self.RECORDS.get(name) or (self.WILDCARD if name.endswith('.wild.example.com') else None)
+        if ip:
+            answer = b'\xc0\x0c\x00\x01\x00\x01\x00\x00\x00\x3c\x00\x04' + socket.inet_aton(ip)
+            header = data[:2] + b'\x81\x80\x00\x01\x00\x01\x00\x00\x00\x00'
+        else:
+            answer = b''
+            header = data[:2] + b'\x81\x83\x00\x01\x00\x00\x00\x00\x00\x00'
+        self.transport.sendto(header + question + answer, addr)
+        
+        
+def resolve(names, wildcard_filter):
+    """Resolve names through a ZoneResolver; returns ({name: rcode}, names the resolver saw)"""
+    async def run():
+        transport, resolver = await asyncio.get_running_loop().create_datagram_endpoint(
+            ZoneResolver, local_addr=('127.0.0.1', 0))
+        port = transport.get_extra_info('sockname')[1]
+        engine = AsyncDNSEngine([f"127.0.0.1:{port}"], cache=None, rate_limit=100000,
+                                wildcard_filter=wildcard_filter)
+        try:
+            answers = {answer.name: answer.rcode async for answer in engine.resolve_stream(names)}
+            return answers, resolver.names
+        finally:
+            engine.close()
+            transport.close()
+            
+    return asyncio.run(run())
+    
+    
+class StubEngine:
+    """query() from a {zone: DNSAnswer kwargs} table; counts the queries"""
+    def __init__(self, zones):
+        self.zones = zones
+        self.queries = 0
+        
+    async def query(self, name, rdtype='A'):
+        self.queries += 1
+        await asyncio.sleep(0)
+        zone = name.split('.', 1)[1]
+        if zone in self.zones:
+            return DNSAnswer(name, rdtype, 'NOERROR', **self.zones[zone])
+        return DNSAnswer(name, rdtype, 'NXDOMAIN')
+        
+        
+def is_wildcard(wildcard_filter, engine, answer):
+    return asyncio.run(wildcard_filter.is_wildcard(answer, engine))
+    
+    
+@pytest.mark.parametrize('name, zones', [
+    ('www.example.com', ['example.com']),
+    ('a.b.dev.example.com', ['b.dev.example.com', 'dev.example.com', 'example.com']),
+    ('example.com', []),
+    ('www.other.org', ['other.org']),
+])
+def test_parent_zones_stop_at_the_apex(name, zones):
+    assert WildcardFilter('Example.com.').parent_zones(name) == zones
+    
+    
+def test_wildcard_answers_are_dropped_and_real_ones_kept():
+    wildcard_filter = WildcardFilter('example.com')
+    names = ['www.example.com', 'real.wild.example.com', 'fake1.wild.example.com', 'fake2.wild.example.com',
+             'missing.example.com']
+    
+    answers, _ = resolve(names, wildcard_filter)
+    
+    assert answers == {'www.example.com': 'NOERROR', 'real.wild.example.com': 'NOERROR',
+                       'fake1.wild.example.com': 'WILDCARD', 'fake2.wild.example.com': 'WILDCARD',
+                       'missing.example.com': 'NXDOMAIN'}
+    assert wildcard_filter.wildcard_zones == ['wild.example.com']
+    
+    
+def test_each_zone_is_probed_once():
+    wildcard_filter = WildcardFilter('example.com')
+    names = [f"host{i}.wild.example.com" for i in range(50)] + ['www.example.com']
+    
+    _, seen = resolve(names, wildcard_filter)
+    
+    probes = [name for name in seen if name not in names]
+    assert len(probes) == 2 * WildcardFilter.PROBES
+    assert sorted(name.split('.', 1)[1] for name in probes) == (
+        ['example.com'] * WildcardFilter.PROBES + ['wild.example.com'] * WildcardFilter.PROBES)
+        
+        
+def test_concurrent_checks_share_one_probe():
+    wildcard_filter = WildcardFilter('example.com')
+    engine = StubEngine({'example.com': {'records': ['10.0.0.9']}})
+    
+    async def run():
+        answers = [DNSAnswer(f"h{i}.example.com", 'A', 'NOERROR', ['10.0.0.9']) for i in range(20)]
+        return await asyncio.gather(*(wildcard_filter.is_wildcard(answer, engine) for answer in answers))
+        
+    assert all(asyncio.run(run()))
+    assert engine.queries == WildcardFilter.PROBES
+    
+    
+def test_cname_fingerprint_matches_rotating_ip_pools():
+    wildcard_filter = WildcardFilter('example.com')
+    engine = StubEngine({'example.com': {'records': ['10.0.0.9'], 'cnames': ['lb.cdn.test']}})
+    
+    assert is_wildcard(wildcard_filter, engine,
+                       DNSAnswer('x.example.com', 'A', 'NOERROR', ['10.0.0.77'], cnames=['lb.cdn.test']))
+    assert not is_wildcard(wildcard_filter, engine,
+                           DNSAnswer('y.example.com', 'A', 'NOERROR', ['10.0.0.77'], cnames=['y.cdn.test']))
+    assert not is_wildcard(wildcard_filter, engine,
+                           DNSAnswer('z.example.com', 'A', 'NOERROR', ['10.0.0.9', '10.0.0.10']))
+                           
+                           
+def test_no_wildcard_zones_without_wildcards():
+    wildcard_filter = WildcardFilter('example.com')
+    
+    assert not is_wildcard(wildcard_filter, StubEngine({}), DNSAnswer('www.example.com', 'A', 'NOERROR', ['10.0.0.1']))
+    assert wildcard_filter.wildcard_zones == []